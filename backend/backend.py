@@ -16,12 +16,27 @@ Date: January 2026
 import os
 import json
 import base64
-import tempfile
+import time
+import hashlib
 import logging
-from typing import Optional, List, Dict, Any
+import copy
+import threading
+import itertools
+from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from caching import TTLCache
+from semantic_cache import SemanticCache, normalize_text
+from event_rules import RuleExtraction, extract_event_context
+from inventory_index import InventoryIndex
+from image_preprocessing import prepare_vision_image
+from tts_cache import get_speech_cache, speech_cache_key
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -45,6 +60,28 @@ Sound like a helpful retail assistant in Melbourne or Sydney.
 Be enthusiastic but not over-the-top.
 """
 
+# Max concurrent TTS requests when synthesizing uncached speech segments
+TTS_MAX_PARALLEL = int(os.getenv("TTS_MAX_PARALLEL", "4"))
+
+# Function-calling loop limits - stop requesting tools after this many rounds or seconds
+MAX_TOOL_ROUNDS = int(os.getenv("MAX_TOOL_ROUNDS", "5"))
+TOOL_LOOP_TIMEOUT_SECONDS = float(os.getenv("TOOL_LOOP_TIMEOUT_SECONDS", "20"))
+TOOL_MAX_PARALLEL = int(os.getenv("TOOL_MAX_PARALLEL", "4"))
+TOOL_RESULT_TOKEN_BUDGET = int(os.getenv("TOOL_RESULT_TOKEN_BUDGET", "600"))  # Per tool message
+
+# Event-context cache - exact tier on normalized text, semantic tier on embedding distance
+EVENT_CACHE_ENABLED = os.getenv("EVENT_CACHE_ENABLED", "true").lower() == "true"
+EVENT_CACHE_MAX_ENTRIES = int(os.getenv("EVENT_CACHE_MAX_ENTRIES", "512"))
+EVENT_CACHE_TTL_SECONDS = float(os.getenv("EVENT_CACHE_TTL_SECONDS", "3600"))
+EVENT_CACHE_MAX_DISTANCE = float(os.getenv("EVENT_CACHE_MAX_DISTANCE", "0.12"))  # Cosine distance
+
+# Rule-based event parsing is trusted when event type, formality and gender all reach this confidence
+EVENT_RULES_ENABLED = os.getenv("EVENT_RULES_ENABLED", "true").lower() == "true"
+EVENT_RULES_MIN_CONFIDENCE = float(os.getenv("EVENT_RULES_MIN_CONFIDENCE", "0.7"))
+
+# Outfit bundles are chosen jointly from this many top-scoring candidates per slot
+BUNDLE_CANDIDATES_PER_SLOT = int(os.getenv("BUNDLE_CANDIDATES_PER_SLOT", "4"))
+
 # Demo Mode - For fallback during live presentations
 DEMO_MODE = os.getenv("DEMO_MODE", "false").lower() == "true"
 
@@ -453,66 +490,180 @@ def get_client():
 # Cache for embeddings
 _embedding_cache: Dict[str, List[float]] = {}
 
+EMBEDDING_DIMENSIONS = 256  # Using smaller dimension for efficiency
+
+
+def _mock_embedding(text: str) -> List[float]:
+    """Deterministic stand-in embedding for demo mode and API failures."""
+    hash_val = int(hashlib.md5(text.encode()).hexdigest(), 16)
+    return [(hash_val >> i) % 100 / 100.0 for i in range(EMBEDDING_DIMENSIONS)]
+
+
 def get_embedding(text: str) -> List[float]:
     """Get embedding for text using text-embedding-3-large."""
+    return get_embeddings_batch([text])[0]
+
+
+def get_embeddings_batch(texts: List[str]) -> List[List[float]]:
+    """Embed many texts with a single API call for everything not already cached."""
+    return embed_batch_with_status(texts)[0]
+
+
+def embed_batch_with_status(texts: List[str]) -> Tuple[List[List[float]], bool]:
+    """
+    Like get_embeddings_batch, but also returns whether every vector is real.
+    False means the API failed and mock vectors stood in, so callers shouldn't cache them.
+    """
     client = get_client()
     
-    # Check cache first
-    if text in _embedding_cache:
-        return _embedding_cache[text]
-    
     if client is None or DEMO_MODE:
-        # Return mock embedding for demo
-        import hashlib
-        hash_val = int(hashlib.md5(text.encode()).hexdigest(), 16)
-        mock_embedding = [(hash_val >> i) % 100 / 100.0 for i in range(256)]
-        return mock_embedding
+        # Return mock embeddings for demo
+        return [_mock_embedding(text) for text in texts], True
     
-    try:
-        response = client.embeddings.create(
-            model=EMBEDDING_MODEL,
-            input=text,
-            dimensions=256  # Using smaller dimension for efficiency
-        )
-        embedding = response.data[0].embedding
-        _embedding_cache[text] = embedding
-        return embedding
-    except Exception as e:
-        logger.error(f"Embedding error: {e}")
-        # Fallback to mock
-        import hashlib
-        hash_val = int(hashlib.md5(text.encode()).hexdigest(), 16)
-        return [(hash_val >> i) % 100 / 100.0 for i in range(256)]
+    missing = list(dict.fromkeys(text for text in texts if text not in _embedding_cache))
+    if missing:
+        try:
+            response = client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=missing,
+                dimensions=EMBEDDING_DIMENSIONS
+            )
+            for text, item in zip(missing, response.data):
+                _embedding_cache[text] = item.embedding
+        except Exception as e:
+            logger.error(f"Embedding error: {e}")
+            # Fallback to mock
+            return [_embedding_cache.get(text) or _mock_embedding(text) for text in texts], False
+    
+    return [_embedding_cache[text] for text in texts], True
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so dot products are cosine similarities."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def inventory_item_text(item: Dict) -> str:
+    """Rich text representation of an inventory item for embedding."""
+    return f"{item['name']} {item['description']} {item['category']} {' '.join(item['colors'])} {item['style']}"
+
+
+# Precomputed, L2-normalized embedding matrix for MOCK_INVENTORY (one row per item)
+_inventory_version = 0
+_inventory_index_version = 0  # Only bumped when fields InventoryIndex reads change
+_inventory_embeddings: Dict[str, Any] = {"version": None, "texts": None, "row": {}, "matrix": None}
+_inventory_embeddings_lock = threading.Lock()
+
+
+# Item fields InventoryIndex builds postings and vocabulary from
+INVENTORY_INDEXED_FIELDS = {"id", "name", "description", "category", "gender", "style", "colors", "sizes"}
+
+
+def invalidate_inventory_index(indexed: bool = True) -> None:
+    """
+    Mark inventory-derived indexes stale after MOCK_INVENTORY changes.
+    Pass indexed=False when no INVENTORY_INDEXED_FIELDS changed (stock,
+    price, ...), so the lookup index is kept.
+    """
+    global _inventory_version, _inventory_index_version
+    _inventory_version += 1
+    if indexed:
+        _inventory_index_version += 1
+
+
+def add_inventory_item(item: Dict[str, Any]) -> None:
+    """Add an item to the inventory and refresh derived indexes."""
+    MOCK_INVENTORY.append(item)
+    invalidate_inventory_index()
+
+
+def update_inventory_item(item_id: str, **fields) -> bool:
+    """Update fields (stock, price, ...) on an inventory item. Returns False if not found."""
+    for item in MOCK_INVENTORY:
+        if item['id'] == item_id:
+            item.update(fields)
+            invalidate_inventory_index(indexed=not INVENTORY_INDEXED_FIELDS.isdisjoint(fields))
+            return True
+    return False
+
 
+def _inventory_fingerprint() -> tuple:
+    # Version covers changes made through the helpers; length catches direct appends
+    return (_inventory_version, len(MOCK_INVENTORY))
 
-def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
-    """Calculate cosine similarity between two vectors."""
-    import math
-    dot_product = sum(a * b for a, b in zip(vec1, vec2))
-    norm1 = math.sqrt(sum(a * a for a in vec1))
-    norm2 = math.sqrt(sum(b * b for b in vec2))
-    if norm1 == 0 or norm2 == 0:
-        return 0.0
-    return dot_product / (norm1 * norm2)
+
+def get_inventory_embeddings() -> Dict[str, Any]:
+    """
+    Return the inventory embedding index, rebuilding it when the inventory changed.
+    The matrix is keyed on the embedded texts, so price/stock updates only
+    refresh the row map. All item texts are embedded with one batched call
+    (cached texts are free); mock fallback vectors are used but never cached.
+    """
+    fingerprint = _inventory_fingerprint()
+    if _inventory_embeddings["version"] == fingerprint:
+        return _inventory_embeddings
+
+    with _inventory_embeddings_lock:
+        if _inventory_embeddings["version"] != fingerprint:
+            texts = tuple(inventory_item_text(item) for item in MOCK_INVENTORY)
+            complete = True
+            if texts != _inventory_embeddings["texts"]:
+                vectors, complete = embed_batch_with_status(list(texts))
+                matrix = np.asarray(vectors, dtype=np.float32) if texts else np.zeros((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+                _inventory_embeddings.update(matrix=normalize_rows(matrix), texts=texts if complete else None)
+                logger.info(f"Inventory embedding index built: {matrix.shape[0]} items")
+            _inventory_embeddings.update(
+                row={item['id']: idx for idx, item in enumerate(MOCK_INVENTORY)},
+                version=fingerprint if complete else None  # Retry the embedding call next time
+            )
+    return _inventory_embeddings
+
+
+_inventory_lookup: Dict[str, Any] = {"version": None, "index": None}
+_inventory_lookup_lock = threading.Lock()
+
+
+def get_inventory_lookup() -> InventoryIndex:
+    """
+    Return the inventory lookup index (id map + postings), rebuilding it when
+    indexed fields changed. The index holds the live item dicts, so stock
+    and price updates are visible without a rebuild.
+    """
+    fingerprint = (_inventory_index_version, len(MOCK_INVENTORY))
+    if _inventory_lookup["version"] == fingerprint:
+        return _inventory_lookup["index"]
+
+    with _inventory_lookup_lock:
+        if _inventory_lookup["version"] != fingerprint:
+            _inventory_lookup.update(index=InventoryIndex(MOCK_INVENTORY), version=fingerprint)
+            logger.info(f"Inventory lookup index built: {len(MOCK_INVENTORY)} items")
+    return _inventory_lookup["index"]
 
 
 def semantic_search(query: str, items: List[Dict], top_k: int = 5) -> List[Dict]:
-    """Search items using semantic similarity."""
-    query_embedding = get_embedding(query)
-    
-    scored_items = []
-    for item in items:
-        # Create rich text representation of item
-        item_text = f"{item['name']} {item['description']} {item['category']} {' '.join(item['colors'])} {item['style']}"
-        item_embedding = get_embedding(item_text)
-        
-        score = cosine_similarity(query_embedding, item_embedding)
-        scored_items.append((score, item))
+    """Search items using semantic similarity against the precomputed inventory matrix."""
+    if not items:
+        return []
+
+    query_embedding = normalize_rows(np.asarray(get_embedding(query), dtype=np.float32))
+    index = get_inventory_embeddings()
+    
+    rows = [index["row"].get(item['id']) for item in items]
+    if any(row is None for row in rows):
+        # Items outside the indexed inventory - embed them on the fly in one batch
+        item_matrix = normalize_rows(np.asarray(
+            get_embeddings_batch([inventory_item_text(item) for item in items]), dtype=np.float32
+        ))
+    else:
+        item_matrix = index["matrix"][rows]
     
-    # Sort by score descending
-    scored_items.sort(key=lambda x: x[0], reverse=True)
+    # One matrix-vector product scores every candidate
+    scores = item_matrix @ query_embedding
+    top = np.argsort(-scores, kind="stable")[:top_k]
     
-    return [item for score, item in scored_items[:top_k]]
+    return [items[i] for i in top]
 
 
 # ============================================================================
@@ -527,34 +678,37 @@ def check_inventory(
     gender: Optional[str] = None
 ) -> Dict[str, Any]:
     """Check inventory for specific items."""
-    results = []
-    
-    for item in MOCK_INVENTORY:
-        # Check name match (fuzzy)
-        if item_name.lower() not in item['name'].lower() and item_name.lower() not in item['description'].lower():
-            continue
-        
-        # Apply filters
-        if category and item['category'] != category:
-            continue
-        if gender and item['gender'] not in [gender, 'unisex']:
-            continue
-        if color and not any(color.lower() in c.lower() for c in item['colors']):
-            continue
-        if size and size not in item['sizes']:
-            continue
-        
-        results.append({
+    lookup = get_inventory_lookup()
+    matches = lookup.search(item_name, category=category, color=color, size=size, gender=gender)
+    
+    # Nothing found - retry once with misspelled words corrected against the inventory vocabulary.
+    # The retry only runs on an empty result and is reported back, so any suggestion may be tried
+    correction = None
+    if not matches:
+        corrected_name, name_fixes = lookup.speller.correct(item_name, confident_only=False)
+        corrected_color, color_fixes = lookup.speller.correct(color, confident_only=False) if color else (color, [])
+        if name_fixes or color_fixes:
+            matches = lookup.search(corrected_name, category=category, color=corrected_color, size=size, gender=gender)
+            correction = {"item_name": corrected_name, "color": corrected_color, "corrections": name_fixes + color_fixes}
+            logger.info(f"check_inventory corrected '{item_name}' -> '{corrected_name}' ({len(matches)} matches)")
+    
+    results = [
+        {
             **item,
             "available": item['stock'] > 0,
             "location": f"Aisle {item['aisle']}, Bin {item['bin']}"
-        })
+        }
+        for item in matches
+    ]
     
-    return {
+    response = {
         "found": len(results) > 0,
         "items": results,
         "total_matches": len(results)
     }
+    if correction:
+        response["query_correction"] = correction
+    return response
 
 
 def find_similar_items(
@@ -616,9 +770,6 @@ def get_outfit_bundle(
             ("accessories",)
         ]
     
-    # Filter by gender
-    gender_items = [i for i in MOCK_INVENTORY if i['gender'] in [gender, 'unisex']]
-    
     # Filter by formality
     formality_map = {
         "casual": ["casual", "smart-casual"],
@@ -629,37 +780,63 @@ def get_outfit_bundle(
     }
     allowed_styles = formality_map.get(formality, ["smart-casual"])
     
-    selected_ids = set()
+    # Embed the occasion once and score the whole inventory in one pass
+    index = get_inventory_embeddings()
+    items = MOCK_INVENTORY
+    query_embedding = normalize_rows(np.asarray(
+        get_embedding(f"{occasion} {formality} {color_preference or ''}"), dtype=np.float32
+    ))
+    rows = np.array([index["row"][item['id']] for item in items], dtype=np.intp)
+    scores = index["matrix"][rows] @ query_embedding if len(items) else np.zeros(0, dtype=np.float32)
+    
+    categories = np.array([item['category'] for item in items])
+    prices = np.array([item['price'] for item in items], dtype=np.float64)
+    eligible = (
+        np.array([item['gender'] in (gender, 'unisex') for item in items], dtype=bool)
+        & np.isin(np.array([item['style'] for item in items]), allowed_styles)
+        & np.array([item['stock'] > 0 for item in items], dtype=bool)
+    )
+    if budget_max:
+        eligible &= prices <= budget_max
     
+    # Shortlist the best candidates per slot; None leaves the slot empty
+    slot_options = []
     for category_group in needed_categories:
-        # Skip bottoms if we already have a dress
-        if category_group in [("pants", "skirts")] and any(i['category'] == 'dresses' for i in bundle['items']):
+        mask = eligible & np.isin(categories, category_group)
+        candidates = np.flatnonzero(mask)
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")][:BUNDLE_CANDIDATES_PER_SLOT]
+        slot_options.append([None] + ranked.tolist())
+    
+    # Pick the combination covering the most slots, then the best total score,
+    # that fits the budget (a dress covers the bottoms slot)
+    best_choice, best_key = (), None
+    for choice in itertools.product(*slot_options):
+        picked = [pos for pos in choice if pos is not None]
+        if len(set(picked)) != len(picked):
+            continue
+        has_dress = any(categories[pos] == 'dresses' for pos in picked)
+        if has_dress and any(
+            pos is not None and set(group) == {"pants", "skirts"}
+            for pos, group in zip(choice, needed_categories)
+        ):
+            continue
+        if budget_max and prices[picked].sum() > budget_max:
             continue
         
-        # Find best matching item for this category
-        candidates = [
-            i for i in gender_items 
-            if i['category'] in category_group 
-            and i['id'] not in selected_ids
-            and i['style'] in allowed_styles
-            and i['stock'] > 0
-        ]
-        
-        if budget_max:
-            remaining_budget = budget_max - bundle['total_price']
-            candidates = [i for i in candidates if i['price'] <= remaining_budget]
-        
-        if candidates:
-            # Use semantic search to find best match for occasion
-            best_matches = semantic_search(f"{occasion} {formality} {color_preference or ''}", candidates, top_k=1)
-            if best_matches:
-                item = best_matches[0]
-                bundle['items'].append({
-                    **item,
-                    "location": f"Aisle {item['aisle']}, Bin {item['bin']}"
-                })
-                bundle['total_price'] += item['price']
-                selected_ids.add(item['id'])
+        covered = len(picked) + (1 if has_dress else 0)
+        key = (covered, float(scores[picked].sum()))
+        if best_key is None or key > best_key:
+            best_choice, best_key = choice, key
+    
+    for pos in best_choice:
+        if pos is None:
+            continue
+        item = items[pos]
+        bundle['items'].append({
+            **item,
+            "location": f"Aisle {item['aisle']}, Bin {item['bin']}"
+        })
+        bundle['total_price'] += item['price']
     
     # Generate styling notes
     bundle['styling_notes'] = f"This {formality} outfit is perfect for {occasion}. "
@@ -671,17 +848,17 @@ def get_outfit_bundle(
 
 def get_item_location(item_id: str) -> Dict[str, Any]:
     """Get the store location for an item."""
-    for item in MOCK_INVENTORY:
-        if item['id'] == item_id:
-            return {
-                "found": True,
-                "item_name": item['name'],
-                "aisle": item['aisle'],
-                "bin": item['bin'],
-                "directions": f"Head to Aisle {item['aisle']}, look for Bin {item['bin']}. The item should be clearly labeled.",
-                "stock": item['stock']
-            }
-    return {"found": False, "message": "Item not found in inventory"}
+    item = get_inventory_lookup().get(item_id)
+    if item is None:
+        return {"found": False, "message": "Item not found in inventory"}
+    return {
+        "found": True,
+        "item_name": item['name'],
+        "aisle": item['aisle'],
+        "bin": item['bin'],
+        "directions": f"Head to Aisle {item['aisle']}, look for Bin {item['bin']}. The item should be clearly labeled.",
+        "stock": item['stock']
+    }
 
 
 # Function dispatch map
@@ -692,6 +869,176 @@ FUNCTION_MAP = {
     "get_item_location": get_item_location
 }
 
+# Per-conversation memo of tool results, keyed by function name, inventory state + arguments
+_tool_memos = TTLCache(max_entries=512, ttl_seconds=1800)
+
+
+def get_tool_memo(conversation_id: Optional[str] = None) -> Dict[str, Any]:
+    """Get the tool-result memo for a conversation (a fresh one if no ID is given)."""
+    if conversation_id is None:
+        return {}
+    memo = _tool_memos.get(conversation_id)
+    if memo is None:
+        memo = {}
+        _tool_memos.set(conversation_id, memo)
+    return memo
+
+
+def tool_call_key(function_name: str, function_args: Dict[str, Any]) -> str:
+    """
+    Canonical memo key for a tool call. Tools read the inventory, so the key
+    includes its fingerprint: a stock or price change misses the memo.
+    """
+    return f"{function_name}:{_inventory_fingerprint()}:{json.dumps(function_args, sort_keys=True)}"
+
+
+def execute_tool_call(function_name: str, function_args: Dict[str, Any]) -> Any:
+    """Run one tool, turning unknown functions and failures into error results."""
+    if function_name not in FUNCTION_MAP:
+        return {"error": f"Unknown function: {function_name}"}
+    try:
+        return FUNCTION_MAP[function_name](**function_args)
+    except Exception as e:
+        logger.error(f"Function {function_name} failed: {e}")
+        return {"error": str(e)}
+
+
+def execute_tool_calls(tool_calls, memo: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Execute one assistant turn's tool calls concurrently.
+
+    Identical calls (same function and arguments) run once, and results
+    already in the conversation memo are reused. Returns one outcome per
+    tool call, in order, with the result and its timing.
+    """
+    outcomes = []
+    pending = {}
+    for tool_call in tool_calls:
+        function_name = tool_call.function.name
+        try:
+            function_args = json.loads(tool_call.function.arguments or "{}")
+        except json.JSONDecodeError as e:
+            function_args = None
+            error = {"error": f"Invalid arguments: {e}"}
+
+        key = tool_call_key(function_name, function_args) if function_args is not None else None
+        outcome = {"tool_call": tool_call, "function": function_name, "arguments": function_args, "key": key}
+        if function_args is None:
+            outcome.update(result=error, cached=False, duration_ms=0.0)
+        elif key in memo:
+            outcome.update(result=memo[key], cached=True, duration_ms=0.0)
+        else:
+            pending.setdefault(key, (function_name, function_args))
+        outcomes.append(outcome)
+
+    if pending:
+        def timed(call):
+            started = time.perf_counter()
+            value = execute_tool_call(*call)
+            return value, (time.perf_counter() - started) * 1000
+
+        with ThreadPoolExecutor(max_workers=min(TOOL_MAX_PARALLEL, len(pending))) as executor:
+            completed = dict(zip(pending, executor.map(timed, pending.values())))
+
+        first_run = set()
+        for outcome in outcomes:
+            if outcome.get("result") is None and outcome["key"] in completed:
+                value, duration_ms = completed[outcome["key"]]
+                # Only the first occurrence paid for the call; duplicates reuse it
+                cached = outcome["key"] in first_run
+                first_run.add(outcome["key"])
+                outcome.update(result=value, cached=cached, duration_ms=0.0 if cached else round(duration_ms, 2))
+                if not (isinstance(value, dict) and "error" in value):
+                    memo[outcome["key"]] = value
+
+    for outcome in outcomes:
+        logger.info(
+            f"Executed function: {outcome['function']}({outcome['arguments']}) "
+            f"in {outcome['duration_ms']:.1f}ms{' (memoized)' if outcome['cached'] else ''}"
+        )
+    return outcomes
+
+
+# ============================================================================
+# TOOL RESULT ENCODING (Compact payloads sent back to the model)
+# ============================================================================
+
+# Inventory fields the model actually uses when recommending (no descriptions,
+# size lists or materials - those only cost prompt tokens)
+TOOL_ITEM_FIELDS = ("id", "name", "category", "price", "style", "stock")
+TOOL_ITEM_MAX_COLORS = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for budgeting prompts."""
+    return (len(text) + 3) // 4
+
+
+def compact_tool_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Project an inventory item down to the fields the model needs."""
+    compact = {field: item[field] for field in TOOL_ITEM_FIELDS if field in item}
+    if item.get("colors"):
+        compact["colors"] = item["colors"][:TOOL_ITEM_MAX_COLORS]
+    if "aisle" in item and "bin" in item:
+        compact["location"] = f"Aisle {item['aisle']}, Bin {item['bin']}"
+    return compact
+
+
+def encode_tool_result(
+    function_result: Any,
+    sent_item_ids: set,
+    token_budget: int = TOOL_RESULT_TOKEN_BUDGET
+) -> tuple:
+    """
+    Encode a tool result compactly for the model.
+
+    Items are projected to TOOL_ITEM_FIELDS, items already sent earlier in the
+    conversation are reduced to an ID reference, and trailing items are
+    dropped until the message fits token_budget. Returns (content, stats).
+    """
+    full_tokens = estimate_tokens(json.dumps(function_result, default=str))
+
+    if isinstance(function_result, list):
+        payload, items = {}, function_result
+    elif isinstance(function_result, dict) and isinstance(function_result.get("items"), list):
+        payload, items = dict(function_result), function_result["items"]
+    else:
+        payload, items = function_result, None
+
+    if items is not None:
+        encoded_items = []
+        for item in items:
+            item_id = item.get("id") if isinstance(item, dict) else None
+            if item_id is not None and item_id in sent_item_ids:
+                encoded_items.append({"id": item_id, "see": "earlier"})
+            else:
+                encoded_items.append(compact_tool_item(item) if isinstance(item, dict) else item)
+
+        def render(kept):
+            body = dict(payload, items=encoded_items[:kept])
+            if kept < len(encoded_items):
+                body["omitted_items"] = len(encoded_items) - kept
+            return json.dumps(body, separators=(",", ":"), default=str)
+
+        kept = len(encoded_items)
+        content = render(kept)
+        while kept > 1 and estimate_tokens(content) > token_budget:
+            kept -= 1
+            content = render(kept)
+
+        sent_item_ids.update(
+            item["id"] for item in encoded_items[:kept] if isinstance(item, dict) and "id" in item
+        )
+    else:
+        content = json.dumps(payload, separators=(",", ":"), default=str)
+
+    sent_tokens = estimate_tokens(content)
+    return content, {
+        "full_tokens": full_tokens,
+        "sent_tokens": sent_tokens,
+        "saved_tokens": max(0, full_tokens - sent_tokens)
+    }
+
 
 # ============================================================================
 # SPEECH-TO-TEXT (gpt-4o-transcribe)
@@ -706,20 +1053,12 @@ def transcribe_audio_bytes(audio_bytes: bytes, filename: str = "audio.wav") -> s
         return "I'm looking for an outfit for a graduation ceremony next Saturday. It's outdoors and I want something elegant but comfortable."
     
     try:
-        # Create temp file for audio
-        with tempfile.NamedTemporaryFile(suffix=f".{filename.split('.')[-1]}", delete=False) as temp_file:
-            temp_file.write(audio_bytes)
-            temp_path = temp_file.name
-        
-        with open(temp_path, "rb") as audio_file:
-            response = client.audio.transcriptions.create(
-                model=TRANSCRIPTION_MODEL,
-                file=audio_file,
-                language="en"  # Can be auto-detected
-            )
-        
-        # Cleanup temp file
-        os.unlink(temp_path)
+        # Send the bytes straight from memory - the filename tells the API the audio format
+        response = client.audio.transcriptions.create(
+            model=TRANSCRIPTION_MODEL,
+            file=(filename or "audio.wav", audio_bytes),
+            language="en"  # Can be auto-detected
+        )
         
         logger.info(f"Transcription successful: {response.text[:50]}...")
         return response.text
@@ -740,6 +1079,36 @@ def transcribe_audio_file(file_path: str) -> str:
 # TEXT-TO-SPEECH (gpt-4o-mini-tts with Australian Accent)
 # ============================================================================
 
+def tts_instructions(use_australian_accent: bool) -> str:
+    """Accent steering instructions sent with every TTS request."""
+    return TTS_AUSTRALIAN_INSTRUCTIONS if use_australian_accent else "Speak naturally and clearly."
+
+
+def synthesize_speech(text: str, voice: str, instructions: str) -> bytes:
+    """Synthesize one utterance, serving repeats from the TTS cache."""
+    cache = get_speech_cache()
+    key = speech_cache_key(text, voice, TTS_MODEL, instructions)
+
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info(f"TTS cache hit: {text[:40]!r}")
+            return cached
+
+    response = get_client().audio.speech.create(
+        model=TTS_MODEL,
+        voice=voice,
+        input=text,
+        instructions=instructions,  # This is the key feature of gpt-4o-mini-tts!
+        response_format="mp3"
+    )
+
+    audio_bytes = response.content
+    if cache is not None:
+        cache.put(key, audio_bytes)
+    return audio_bytes
+
+
 def text_to_speech_bytes(
     text: str, 
     voice: str = TTS_VOICE,
@@ -753,18 +1122,7 @@ def text_to_speech_bytes(
         return b""
     
     try:
-        # Build instructions for Australian accent
-        instructions = TTS_AUSTRALIAN_INSTRUCTIONS if use_australian_accent else "Speak naturally and clearly."
-        
-        response = client.audio.speech.create(
-            model=TTS_MODEL,
-            voice=voice,
-            input=text,
-            instructions=instructions,  # This is the key feature of gpt-4o-mini-tts!
-            response_format="mp3"
-        )
-        
-        audio_bytes = response.content
+        audio_bytes = synthesize_speech(text, voice, tts_instructions(use_australian_accent))
         logger.info(f"TTS successful: Generated {len(audio_bytes)} bytes")
         return audio_bytes
         
@@ -773,6 +1131,28 @@ def text_to_speech_bytes(
         return b""
 
 
+def prewarm_speech_cache(
+    fragments: List[str],
+    voice: str = TTS_VOICE,
+    use_australian_accent: bool = True
+) -> int:
+    """Synthesize fixed speech fragments ahead of time. Returns how many were cached."""
+    if get_client() is None or DEMO_MODE or get_speech_cache() is None:
+        return 0
+
+    instructions = tts_instructions(use_australian_accent)
+    warmed = 0
+    for fragment in fragments:
+        try:
+            synthesize_speech(fragment.strip(), voice, instructions)
+            warmed += 1
+        except Exception as e:
+            logger.warning(f"TTS prewarm failed for {fragment[:40]!r}: {e}")
+
+    logger.info(f"TTS cache prewarmed with {warmed}/{len(fragments)} fragments")
+    return warmed
+
+
 def text_to_speech_file(text: str, output_path: str, **kwargs) -> bool:
     """Save TTS output to a file."""
     audio_bytes = text_to_speech_bytes(text, **kwargs)
@@ -811,6 +1191,9 @@ def analyze_clothing_image(
         }
     
     try:
+        # Downscale/re-encode locally so the vision request carries only what the model needs
+        prepared = prepare_vision_image(image_base64)
+
         response = client.chat.completions.create(
             model=GPT_MODEL,
             messages=[
@@ -832,8 +1215,8 @@ def analyze_clothing_image(
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_base64}",
-                                "detail": "high"
+                                "url": prepared.data_url,
+                                "detail": prepared.detail
                             }
                         }
                     ]
@@ -851,6 +1234,7 @@ def analyze_clothing_image(
         )
         
         analysis = json.loads(response.choices[0].message.content)
+        analysis["preprocessing"] = prepared.stats
         logger.info(f"Image analysis successful: {analysis.get('clothing_type', 'unknown')}")
         return analysis
         
@@ -868,13 +1252,72 @@ def analyze_clothing_image(
 # EVENT CONTEXT PARSING (Structured Outputs)
 # ============================================================================
 
-def parse_event_context(user_input: str) -> Dict[str, Any]:
-    """Parse event context from natural language using GPT-4o Structured Outputs."""
+# Words whose presence must match exactly before a semantically similar request
+# may reuse a cached context ("wedding outfit for him" vs "... for her")
+_GUARD_GENDER_WORDS = {
+    "men": "men", "man": "men", "male": "men", "mens": "men", "him": "men", "his": "men", "he": "men",
+    "husband": "men", "boyfriend": "men", "groom": "men",
+    "women": "women", "woman": "women", "female": "women", "womens": "women", "her": "women",
+    "she": "women", "wife": "women", "girlfriend": "women", "bride": "women", "ladies": "women",
+}
+_GUARD_COLOR_WORDS = {
+    "black", "white", "grey", "gray", "navy", "blue", "red", "green", "yellow", "pink", "purple",
+    "brown", "beige", "cream", "orange", "maroon", "gold", "silver", "emerald", "pastel", "neutral",
+}
+_GUARD_SEASON_WORDS = {"spring", "summer", "autumn", "fall", "winter"}
+
+_event_context_cache = SemanticCache(
+    embed=get_embedding,
+    max_entries=EVENT_CACHE_MAX_ENTRIES,
+    ttl_seconds=EVENT_CACHE_TTL_SECONDS,
+    max_distance=EVENT_CACHE_MAX_DISTANCE
+)
+
+
+def event_context_guard(user_input: str, extraction: Optional[RuleExtraction] = None) -> tuple:
+    """
+    Gender, colour, season and amount mentions that a cached context must
+    share, plus the rule-extracted occasion and formality ("casual wedding"
+    must not reuse "formal wedding").
+    """
+    words = normalize_text(user_input).split()
+    if extraction is None:
+        extraction = extract_event_context(user_input)
+    return (
+        tuple(sorted({_GUARD_GENDER_WORDS[w] for w in words if w in _GUARD_GENDER_WORDS})),
+        tuple(sorted({w for w in words if w in _GUARD_COLOR_WORDS or w in _GUARD_SEASON_WORDS})),
+        tuple(sorted({w for w in words if any(ch.isdigit() for ch in w)})),
+        extraction.context["event_type"],
+        extraction.context["formality_level"]
+    )
+
+
+def event_cache_stats() -> Dict[str, Any]:
+    """Per-tier hit metrics for the event-context cache."""
+    return _event_context_cache.stats()
+
+
+def parse_event_context_with_meta(user_input: str) -> tuple:
+    """
+    Parse event context, taking the cheapest path that is confident enough:
+    exact cache -> local rules -> semantic cache -> GPT-4o Structured Outputs.
+    Returns (context, meta) where meta reports the path, latency and, for the
+    rule path, per-field confidence.
+    """
+    started = time.perf_counter()
+    meta: Dict[str, Any] = {"path": None}
+
+    def finish(context: Dict[str, Any], path: str) -> tuple:
+        meta["path"] = path
+        meta["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        logger.info(f"Event context via {path} in {meta['latency_ms']}ms: {context.get('event_type', 'unknown')}")
+        return context, meta
+    
     client = get_client()
     
     if client is None or DEMO_MODE:
         logger.info("Demo mode: Returning mock event context")
-        return {
+        return finish({
             "event_type": "graduation ceremony",
             "formality_level": "smart-casual",
             "season": "spring",
@@ -886,7 +1329,25 @@ def parse_event_context(user_input: str) -> Dict[str, Any]:
             "style_notes": "Elegant but comfortable for standing/walking",
             "gender": "women",
             "specific_requirements": ["comfortable shoes", "sun-appropriate"]
-        }
+        }, "demo")
+    
+    # Rules are cheap; their occasion and formality also key the cache guard
+    extraction = extract_event_context(user_input)
+    guard, embedding = event_context_guard(user_input, extraction), None
+    if EVENT_CACHE_ENABLED:
+        cached = _event_context_cache.get_exact(user_input, guard)
+        if cached is not None:
+            return finish(copy.deepcopy(cached), "exact_cache")
+    
+    if EVENT_RULES_ENABLED:
+        meta["confidence"] = extraction.confidence
+        if extraction.is_confident(EVENT_RULES_MIN_CONFIDENCE):
+            return finish(extraction.context, "rules")
+    
+    if EVENT_CACHE_ENABLED:
+        cached, embedding = _event_context_cache.get_semantic(user_input, guard)
+        if cached is not None:
+            return finish(copy.deepcopy(cached), "semantic_cache")
     
     try:
         response = client.chat.completions.create(
@@ -920,13 +1381,14 @@ def parse_event_context(user_input: str) -> Dict[str, Any]:
         logger.info(f"Raw API response content: {raw_content[:200] if raw_content else 'EMPTY'}")
 
         context = json.loads(raw_content)
-        logger.info(f"Event context parsed: {context.get('event_type', 'unknown')}")
-        return context
+        if EVENT_CACHE_ENABLED:
+            _event_context_cache.set(user_input, copy.deepcopy(context), guard, embedding)
+        return finish(context, "llm")
         
     except Exception as e:
         logger.error(f"Event parsing error: {e}")
         # Return complete fallback with all required fields
-        return {
+        return finish({
             "event_type": "general occasion",
             "formality_level": "smart-casual",
             "season": "unknown",
@@ -938,7 +1400,12 @@ def parse_event_context(user_input: str) -> Dict[str, Any]:
             "style_notes": "",
             "gender": "unknown",
             "specific_requirements": []
-        }
+        }, "fallback")
+
+
+def parse_event_context(user_input: str) -> Dict[str, Any]:
+    """Parse event context from natural language (see parse_event_context_with_meta)."""
+    return parse_event_context_with_meta(user_input)[0]
 
 
 # ============================================================================
@@ -950,7 +1417,8 @@ def process_stylist_request(
     audio_bytes: Optional[bytes] = None,
     image_base64: Optional[str] = None,
     conversation_history: Optional[List[Dict]] = None,
-    return_audio: bool = True
+    return_audio: bool = True,
+    conversation_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Main entry point for processing stylist requests.
@@ -970,7 +1438,9 @@ def process_stylist_request(
         "image_analysis": None,
         "transcribed_input": None,
         "recommended_items": [],
-        "apis_used": []
+        "apis_used": [],
+        "tool_timings": [],
+        "tool_token_usage": {"full_tokens": 0, "sent_tokens": 0, "saved_tokens": 0}
     }
     
     # Step 1: Transcribe audio if provided
@@ -991,8 +1461,9 @@ def process_stylist_request(
         logger.info(f"Image analyzed: {result['image_analysis'].get('clothing_type', 'unknown')}")
     
     # Step 3: Parse event context
-    result["event_context"] = parse_event_context(user_input)
-    result["apis_used"].append("GPT-5 Structured Outputs (Event Parsing)")
+    result["event_context"], result["event_parsing"] = parse_event_context_with_meta(user_input)
+    if result["event_parsing"]["path"] in ("llm", "demo"):
+        result["apis_used"].append("GPT-5 Structured Outputs (Event Parsing)")
     
     # Step 4: Generate response with function calling
     if client is None or DEMO_MODE:
@@ -1001,7 +1472,7 @@ def process_stylist_request(
         result["recommended_items"] = generate_demo_recommendations(result["event_context"])
     else:
         # Full API response with function calling
-        result = generate_ai_response(client, user_input, result, conversation_history)
+        result = generate_ai_response(client, user_input, result, conversation_history, conversation_id)
     
     # Step 5: Generate audio response if requested
     if return_audio and result["text_response"]:
@@ -1017,9 +1488,16 @@ def generate_ai_response(
     client,
     user_input: str,
     result: Dict,
-    conversation_history: Optional[List[Dict]] = None
+    conversation_history: Optional[List[Dict]] = None,
+    conversation_id: Optional[str] = None
 ) -> Dict:
-    """Generate response using GPT-5 with function calling."""
+    """
+    Generate response using GPT-5 with function calling.
+
+    Tool calls from one assistant turn run concurrently, results are memoized
+    per conversation, and the loop stops requesting tools after
+    MAX_TOOL_ROUNDS rounds or TOOL_LOOP_TIMEOUT_SECONDS.
+    """
     
     # Build messages
     messages = [
@@ -1074,50 +1552,69 @@ def generate_ai_response(
         result["apis_used"].append("GPT-5 (Chat + Function Calling)")
         
         # Process any function calls
+        memo = get_tool_memo(conversation_id)
+        tool_timings = result.setdefault("tool_timings", [])
+        token_usage = result.setdefault("tool_token_usage", {"full_tokens": 0, "sent_tokens": 0, "saved_tokens": 0})
+        sent_item_ids = set()
+        loop_started = time.perf_counter()
+        rounds = 0
+
         while assistant_message.tool_calls:
+            rounds += 1
             # Add assistant message with tool calls
             messages.append(assistant_message)
             
-            # Execute each function call
-            for tool_call in assistant_message.tool_calls:
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-                
-                logger.info(f"Executing function: {function_name}({function_args})")
-                
-                # Execute the function
-                if function_name in FUNCTION_MAP:
-                    function_result = FUNCTION_MAP[function_name](**function_args)
-                    
-                    # Track semantic search usage
-                    if function_name == "find_similar_items":
-                        result["apis_used"].append("text-embedding-3-large (Semantic Search)")
-                else:
-                    function_result = {"error": f"Unknown function: {function_name}"}
+            # Execute this turn's function calls concurrently (memoized per conversation)
+            for outcome in execute_tool_calls(assistant_message.tool_calls, memo):
+                function_name = outcome["function"]
+                function_result = outcome["result"]
+                content, token_stats = encode_tool_result(function_result, sent_item_ids)
+                for key, value in token_stats.items():
+                    token_usage[key] += value
+                tool_timings.append({
+                    "round": rounds,
+                    "function": function_name,
+                    "duration_ms": outcome["duration_ms"],
+                    "cached": outcome["cached"],
+                    "tokens": token_stats["sent_tokens"]
+                })
+
+                # Track semantic search usage
+                if function_name == "find_similar_items" and not outcome["cached"]:
+                    result["apis_used"].append("text-embedding-3-large (Semantic Search)")
                 
                 # Add function result to messages
                 messages.append({
                     "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "content": json.dumps(function_result)
+                    "tool_call_id": outcome["tool_call"].id,
+                    "content": content
                 })
                 
                 # Track recommended items
                 if function_name == "get_outfit_bundle" and "items" in function_result:
                     result["recommended_items"].extend(function_result["items"])
                 elif function_name in ["check_inventory", "find_similar_items"]:
-                    items = function_result.get("items", function_result if isinstance(function_result, list) else [])
+                    items = function_result.get("items", []) if isinstance(function_result, dict) else function_result
                     result["recommended_items"].extend(items if isinstance(items, list) else [])
             
+            # Stop offering tools once the round or latency budget is spent
+            elapsed = time.perf_counter() - loop_started
+            capped = rounds >= MAX_TOOL_ROUNDS or elapsed >= TOOL_LOOP_TIMEOUT_SECONDS
+            if capped:
+                logger.warning(f"Tool loop capped after {rounds} rounds / {elapsed:.1f}s")
+                result["tool_loop_capped"] = True
+            
             # Get next response
             response = client.chat.completions.create(
                 model=GPT_MODEL,
                 messages=messages,
                 tools=STYLIST_TOOLS,
-                tool_choice="auto",
+                tool_choice="none" if capped else "auto",
                 max_completion_tokens=2000
             )
             assistant_message = response.choices[0].message
+            if capped:
+                break
         
         result["text_response"] = assistant_message.content
         
@@ -1309,7 +1806,7 @@ def health_check() -> Dict[str, Any]:
             test = client.embeddings.create(
                 model=EMBEDDING_MODEL,
                 input="test",
-                dimensions=256
+                dimensions=EMBEDDING_DIMENSIONS
             )
             status["api_test"] = "passed"
         except Exception as e:
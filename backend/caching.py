@@ -0,0 +1,117 @@
+"""
+RetailNext Smart Stylist - In-Memory Caches
+Small thread-safe caches shared by the API server and backend helpers
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# ============================================================================
+# TTL + LRU CACHE
+# ============================================================================
+
+class TTLCache:
+    """
+    Bounded LRU cache with optional time-to-live and weight limits.
+
+    Entries are evicted least-recently-used first once `max_entries` (or
+    `max_weight`, measured with `weigher`) is exceeded, and expire after
+    `ttl_seconds` when a TTL is set.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: Optional[float] = None,
+        max_weight: Optional[int] = None,
+        weigher: Optional[Callable[[Any], int]] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_weight = max_weight
+        self.weigher = weigher or (lambda value: 1)
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing/expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, weight, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or replace a value, evicting old entries if needed"""
+        weight = self.weigher(value)
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            self._data[key] = (value, weight, expires_at)
+            self._weight += weight
+
+            while self._data and (
+                len(self._data) > self.max_entries
+                or (self.max_weight is not None and self._weight > self.max_weight)
+            ):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove and return a value without counting a hit or miss"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def clear(self) -> None:
+        """Drop all entries (statistics are kept)"""
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[2] is None or entry[2] >= time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "weight": self._weight,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, weight, _ = self._data.pop(key)
+        self._weight -= weight
@@ -0,0 +1,169 @@
+"""
+RetailNext Smart Stylist - Catalog Clusters
+Mini-batch spherical k-means over the catalog embeddings, built once at
+startup, so the explore page can serve representative, labelled collections
+straight from memory
+"""
+
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+EXPLORE_CLUSTERS = int(os.getenv("EXPLORE_CLUSTERS", "12"))
+EXPLORE_REPRESENTATIVES = int(os.getenv("EXPLORE_REPRESENTATIVES", "6"))
+
+KMEANS_BATCH_SIZE = 256
+KMEANS_ITERATIONS = 100
+KMEANS_INIT_SAMPLE = 4096  # Rows k-means++ seeding draws from
+
+# Rows scored per chunk during assignment, bounding memory to CHUNK_ROWS x k
+CHUNK_ROWS = 8192
+
+# ============================================================================
+# MINI-BATCH K-MEANS
+# ============================================================================
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _kmeans_plus_plus(sample: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k-means++ seeding on cosine distance"""
+    centroids = [sample[rng.integers(len(sample))]]
+    distance = 1.0 - sample @ centroids[0]
+    for _ in range(1, k):
+        weights = np.clip(distance, 0, None) ** 2
+        total = weights.sum()
+        pick = rng.choice(len(sample), p=weights / total) if total > 0 else rng.integers(len(sample))
+        centroids.append(sample[pick])
+        distance = np.minimum(distance, 1.0 - sample @ sample[pick])
+    return np.array(centroids)
+
+
+def assign_clusters(matrix: np.ndarray, centroids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(label, cosine to its centroid) for every row, scored chunk by chunk"""
+    labels = np.empty(len(matrix), dtype=np.intp)
+    similarity = np.empty(len(matrix), dtype=np.float32)
+    for start in range(0, len(matrix), CHUNK_ROWS):
+        scores = matrix[start:start + CHUNK_ROWS] @ centroids.T
+        labels[start:start + CHUNK_ROWS] = scores.argmax(axis=1)
+        similarity[start:start + CHUNK_ROWS] = scores.max(axis=1)
+    return labels, similarity
+
+
+def minibatch_kmeans(
+    matrix: np.ndarray,
+    k: int,
+    batch_size: int = KMEANS_BATCH_SIZE,
+    iterations: int = KMEANS_ITERATIONS,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    Spherical mini-batch k-means (Sculley, 2010) on row-normalized vectors.
+    Each step touches one random batch, so memory stays O(batch x k) no
+    matter how large the catalog is. Returns unit-length centroids.
+    """
+    rng = np.random.default_rng(seed)
+    sample = matrix[rng.choice(len(matrix), size=min(len(matrix), KMEANS_INIT_SAMPLE), replace=False)]
+    centroids = _kmeans_plus_plus(sample, k, rng)
+    counts = np.zeros(k)
+
+    for _ in range(iterations):
+        batch = matrix[rng.integers(len(matrix), size=min(batch_size, len(matrix)))]
+        nearest = (batch @ centroids.T).argmax(axis=1)
+        for cluster in np.unique(nearest):
+            members = batch[nearest == cluster]
+            counts[cluster] += len(members)
+            rate = len(members) / counts[cluster]
+            centroids[cluster] = (1.0 - rate) * centroids[cluster] + rate * members.mean(axis=0)
+        centroids = _normalize(centroids)
+
+    return centroids
+
+# ============================================================================
+# CATALOG CLUSTERS
+# ============================================================================
+
+@dataclass
+class CatalogClusters:
+    """Cluster centroids plus per-cluster labels and representative rows"""
+    centroids: np.ndarray
+    labels: np.ndarray
+    clusters: List[Dict[str, Any]] = field(default_factory=list)
+    built_ms: float = 0.0
+
+    @classmethod
+    def build(
+        cls,
+        df: pd.DataFrame,
+        normalized_embeddings: np.ndarray,
+        k: int = EXPLORE_CLUSTERS,
+        representatives: int = EXPLORE_REPRESENTATIVES
+    ) -> "CatalogClusters":
+        start = time.perf_counter()
+        k = max(1, min(k, len(df)))
+        centroids = minibatch_kmeans(normalized_embeddings, k)
+        labels, similarity = assign_clusters(normalized_embeddings, centroids)
+        groups = df['groupId'].to_numpy() if 'groupId' in df.columns else None
+
+        clusters = []
+        for cluster in range(k):
+            members = np.flatnonzero(labels == cluster)
+            if len(members) == 0:
+                continue
+            members = members[np.argsort(-similarity[members], kind="stable")]
+
+            # Closest rows to the centroid, one per near-duplicate group
+            if groups is not None:
+                _, first = np.unique(groups[members], return_index=True)
+                members_distinct = members[np.sort(first)]
+            else:
+                members_distinct = members
+
+            rows = df.iloc[members]
+            usage = rows['usage'].mode()
+            article_types = rows['articleType'].value_counts()
+            colours = rows['baseColour'].mode()
+            article_type = article_types.index[0]
+            usage = usage.iloc[0] if len(usage) else ''
+            label = article_type if usage.lower() in article_type.lower() else f"{usage} {article_type}"
+
+            clusters.append({
+                "cluster_id": cluster,
+                "label": label,
+                "dominant_colour": colours.iloc[0] if len(colours) else None,
+                "size": int(len(members)),
+                "top_article_types": article_types.index[:3].tolist(),
+                "representative_rows": members_distinct[:representatives],
+                "representative_scores": similarity[members_distinct[:representatives]]
+            })
+
+        # Clusters sharing a label are told apart by their dominant colour
+        label_counts = pd.Series([cluster["label"] for cluster in clusters]).value_counts()
+        for cluster in clusters:
+            if label_counts[cluster["label"]] > 1 and cluster["dominant_colour"]:
+                cluster["label"] = f"{cluster['dominant_colour']} {cluster['label']}"
+
+        clusters.sort(key=lambda cluster: cluster["size"], reverse=True)
+
+        # Any label still shared is numbered, largest cluster first
+        seen: Dict[str, int] = {}
+        for cluster in clusters:
+            seen[cluster["label"]] = seen.get(cluster["label"], 0) + 1
+            if seen[cluster["label"]] > 1:
+                cluster["label"] = f"{cluster['label']} ({seen[cluster['label']]})"
+        built_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Catalog clusters built: {len(clusters)} clusters over {len(df)} items in {built_ms:.0f}ms")
+        return cls(centroids, labels, clusters, built_ms)
@@ -0,0 +1,150 @@
+"""
+RetailNext Smart Stylist - Catalog Facet Index
+Per-attribute bitmap indexes over the clothing catalog so filtered browsing
+and facet counts are computed from boolean array intersections instead of
+DataFrame copies and scans
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Catalog columns exposed as facets (request parameter name -> column)
+FACET_FIELDS = {
+    "gender": "gender",
+    "category": "masterCategory",
+    "sub_category": "subCategory",
+    "article_type": "articleType",
+    "color": "baseColour",
+    "season": "season",
+    "usage": "usage",
+    "price_band": "priceBand",
+}
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class CatalogIndex:
+    """
+    Bitmap index over a catalog DataFrame.
+
+    Every facet value owns a boolean row mask. Values within a facet are
+    OR-ed, facets are AND-ed. Facet counts are disjunctive: each facet is
+    counted against the other facets' filters, so selecting "Blue" still
+    shows how many items are "Black".
+    """
+
+    def __init__(self, df: pd.DataFrame, fields: Dict[str, str] = FACET_FIELDS):
+        self.df = df
+        self.size = len(df)
+        self.fields = {name: column for name, column in fields.items() if column in df.columns}
+        self.values: Dict[str, List[str]] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        self.bitmaps: Dict[str, Dict[str, np.ndarray]] = {}
+        self.prices = df['price'].to_numpy(dtype=np.float64) if 'price' in df.columns else None
+
+        for name, column in self.fields.items():
+            codes, uniques = pd.factorize(df[column])  # Missing values get code -1
+            values = [str(value) for value in uniques]
+            self.values[name] = values
+            self.codes[name] = codes
+            self.bitmaps[name] = {value: codes == code for code, value in enumerate(values)}
+
+        logger.info(f"Catalog facet index built: {self.size} rows, {len(self.fields)} facets")
+
+    def _field_mask(self, name: str, selected: Sequence[str], substring: bool = False) -> Tuple[np.ndarray, List[str]]:
+        """Union of the bitmaps for the selected values of one facet, and the values it covers"""
+        bitmaps = self.bitmaps[name]
+        if substring:
+            needles = [needle.lower() for needle in selected]
+            keys = [value for value in bitmaps if any(needle in value.lower() for needle in needles)]
+        else:
+            keys = [value for value in selected if value in bitmaps]
+
+        mask = np.zeros(self.size, dtype=bool)
+        for key in keys:
+            mask |= bitmaps[key]
+        return mask, keys
+
+    def value_mask(self, name: str, values: Sequence[str], substring: bool = False) -> np.ndarray:
+        """Rows whose facet value is any of values (all False for an unknown facet)"""
+        if name not in self.fields:
+            return np.zeros(self.size, dtype=bool)
+        return self._field_mask(name, values, substring=substring)[0]
+
+    def query(
+        self,
+        filters: Optional[Dict[str, Sequence[str]]] = None,
+        substring_fields: Sequence[str] = (),
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        base_mask: Optional[np.ndarray] = None
+    ) -> Dict[str, Any]:
+        """
+        Resolve filters to matching row positions plus facet counts.
+
+        filters maps facet name -> accepted values; facets named in
+        substring_fields match values case-insensitively by substring.
+        base_mask optionally restricts the rows before any facet applies.
+        Returns {"rows", "total", "facets"} where facets maps each facet to
+        [{"value", "count", "selected"}] sorted by count.
+        """
+        filters = {name: list(values) for name, values in (filters or {}).items() if values and name in self.fields}
+
+        base = np.ones(self.size, dtype=bool) if base_mask is None else base_mask.copy()
+        if self.prices is not None:
+            if min_price is not None:
+                base &= self.prices >= min_price
+            if max_price is not None:
+                base &= self.prices <= max_price
+
+        field_masks = {}
+        selected_values = {}
+        for name, values in filters.items():
+            field_masks[name], selected_values[name] = self._field_mask(
+                name, values, substring=name in substring_fields
+            )
+
+        matched = base.copy()
+        for mask in field_masks.values():
+            matched &= mask
+
+        facets = {}
+        for name in self.fields:
+            # Disjunctive counts: apply every filter except this facet's own
+            if name in field_masks:
+                scope = base.copy()
+                for other, mask in field_masks.items():
+                    if other != name:
+                        scope &= mask
+            else:
+                scope = matched
+
+            codes = self.codes[name][scope]
+            counts = np.bincount(codes[codes >= 0], minlength=len(self.values[name]))
+            selected = set(selected_values.get(name, []))
+            facets[name] = sorted(
+                (
+                    {"value": value, "count": int(count), "selected": value in selected}
+                    for value, count in zip(self.values[name], counts)
+                    if count > 0 or value in selected
+                ),
+                key=lambda facet: (-facet["count"], facet["value"])
+            )
+
+        rows = np.flatnonzero(matched)
+        return {"rows": rows, "total": int(rows.size), "facets": facets}
+
+    def records(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        """Catalog rows as plain dicts (missing values become None)"""
+        page = self.df.iloc[rows]
+        return page.astype(object).where(page.notna(), None).to_dict('records')
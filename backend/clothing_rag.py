@@ -7,12 +7,17 @@ Uses real clothing dataset with embeddings for semantic search
 import os
 import json
 import base64
+import hashlib
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
 import logging
 
+from image_preprocessing import prepare_vision_image, preprocess_image_bytes
+from near_duplicates import DEDUP_ENABLED, group_near_duplicates, collapse_groups
+from store_overlay import StoreOverlay, StoreOverlays
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -23,6 +28,32 @@ GPT_MODEL = os.getenv("OPENAI_GPT_MODEL", "gpt-4o")
 EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-large")
 EMBEDDING_DIMENSIONS = 256  # Smaller for efficiency
 
+# Cascade search: scan every row on a low-dimensional prefix of the normalized
+# vectors, then rescore the best candidates at full dimension
+SEARCH_CASCADE_ENABLED = os.getenv("SEARCH_CASCADE_ENABLED", "false").lower() == "true"
+CASCADE_PREFIX_DIMS = int(os.getenv("CASCADE_PREFIX_DIMS", "64"))
+CASCADE_CANDIDATES = int(os.getenv("CASCADE_CANDIDATES", "300"))
+
+# Multi-field embeddings: name, attribute and colour vectors stored next to the
+# searchText vector and fused per query with weights (no extra query-time calls)
+MULTI_FIELD_EMBEDDINGS = os.getenv("MULTI_FIELD_EMBEDDINGS", "false").lower() == "true"
+
+FIELD_GROUPS = {
+    "name": ["productDisplayName"],
+    "attributes": ["articleType", "subCategory", "masterCategory", "usage", "season", "gender"],
+    "color": ["baseColour"],
+}
+
+# Fusion weights over the searchText vector ("text") and each field group
+FIELD_WEIGHTS = {"text": 0.55, "name": 0.2, "attributes": 0.15, "color": 0.1}
+COLOR_QUERY_WEIGHTS = {"text": 0.35, "name": 0.1, "attributes": 0.15, "color": 0.4}
+TYPE_QUERY_WEIGHTS = {"text": 0.35, "name": 0.15, "attributes": 0.4, "color": 0.1}
+COLOR_TYPE_QUERY_WEIGHTS = {"text": 0.3, "name": 0.1, "attributes": 0.3, "color": 0.3}
+
+# MMR re-ranking considers this many top candidates per requested result
+MMR_POOL_FACTOR = 5
+MMR_MIN_POOL = 50
+
 # Image base URL
 IMAGE_BASE_URL = "https://raw.githubusercontent.com/openai/openai-cookbook/main/examples/data/sample_clothes/sample_images"
 
@@ -32,6 +63,38 @@ IMAGE_BASE_URL = "https://raw.githubusercontent.com/openai/openai-cookbook/main/
 
 _styles_df = None
 _embeddings_cache = None
+_field_embeddings_cache: Optional[Dict[str, np.ndarray]] = None
+_store_overlays: Optional[StoreOverlays] = None
+
+def catalog_snapshot() -> tuple:
+    """
+    Identifies the loaded catalog and its embeddings. Catalog stock is
+    derived from item ids, so it only changes with the catalog itself.
+    """
+    size = len(_styles_df) if _styles_df is not None else 0
+    return (id(_styles_df), size, id(_embeddings_cache))
+
+def get_store_overlay(store_id: Optional[str]) -> Optional[StoreOverlay]:
+    """Stock overlay for a store over the shared catalog (None when no store is given)"""
+    global _store_overlays
+
+    if not store_id:
+        return None
+    df = load_clothing_data()
+    if _store_overlays is None or _store_overlays.size != len(df):
+        _store_overlays = StoreOverlays(np.array([_item_hash(str(item_id)) for item_id in df['id']], dtype=np.uint64))
+    return _store_overlays.get(store_id)
+
+def store_overlay_stats() -> Optional[Dict[str, Any]]:
+    return _store_overlays.stats() if _store_overlays is not None else None
+
+def availability_mask(store_id: Optional[str], row_mask: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+    """Combine a row mask with a store's in-stock rows"""
+    overlay = get_store_overlay(store_id)
+    if overlay is None:
+        return row_mask
+    available = overlay.available()
+    return available if row_mask is None else row_mask & available
 
 def load_clothing_data() -> pd.DataFrame:
     """Load the clothing dataset from CSV"""
@@ -59,6 +122,13 @@ def load_clothing_data() -> pd.DataFrame:
             axis=1
         )
 
+        # Precompute retail price columns so catalog filters don't enrich per request
+        _styles_df['price'] = [
+            retail_price(str(item_id), article_type)
+            for item_id, article_type in zip(_styles_df['id'], _styles_df['articleType'])
+        ]
+        _styles_df['priceBand'] = _styles_df['price'].apply(price_band)
+
         return _styles_df
     except FileNotFoundError:
         logger.error(f"Could not find sample_styles.csv at {csv_path}")
@@ -97,6 +167,26 @@ def embed_texts_batch(texts: List[str], client) -> List[List[float]]:
         # Return mock embeddings as fallback
         return [[0.0] * EMBEDDING_DIMENSIONS for _ in texts]
 
+def _mock_embedding(text: str) -> List[float]:
+    hash_val = hash(text)
+    return [(hash_val >> i) % 100 / 100.0 for i in range(EMBEDDING_DIMENSIONS)]
+
+def _embed_corpus(texts: List[str], client, batch_size: int = 64, num_workers: int = 4) -> np.ndarray:
+    """Embed texts in parallel batches (hash-based mock embeddings without a client)"""
+    if client is None:
+        return np.array([_mock_embedding(text) for text in texts])
+
+    all_embeddings = []
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = [
+            executor.submit(embed_texts_batch, texts[i:i + batch_size], client)
+            for i in range(0, len(texts), batch_size)
+        ]
+        for i, future in enumerate(futures):
+            all_embeddings.extend(future.result())
+            logger.info(f"Processed batch {i+1}/{len(futures)}")
+    return np.array(all_embeddings)
+
 def generate_embeddings(df: pd.DataFrame, batch_size: int = 64, num_workers: int = 4) -> np.ndarray:
     """
     Generate embeddings for all products with parallel processing
@@ -111,55 +201,358 @@ def generate_embeddings(df: pd.DataFrame, batch_size: int = 64, num_workers: int
     if client is None:
         logger.warning("No OpenAI client - using mock embeddings")
         # Create mock embeddings based on text hash
-        embeddings = []
-        for text in df['searchText']:
-            hash_val = hash(text)
-            embedding = [(hash_val >> i) % 100 / 100.0 for i in range(EMBEDDING_DIMENSIONS)]
-            embeddings.append(embedding)
-        _embeddings_cache = np.array(embeddings)
+        _embeddings_cache = _embed_corpus(df['searchText'].tolist(), None)
         return _embeddings_cache
 
     texts = df['searchText'].tolist()
-    total = len(texts)
-    all_embeddings = []
-
-    logger.info(f"Generating embeddings for {total} items...")
+    logger.info(f"Generating embeddings for {len(texts)} items...")
 
     # Process in batches with parallel workers
-    with ThreadPoolExecutor(max_workers=num_workers) as executor:
-        futures = []
-        for i in range(0, total, batch_size):
-            batch = texts[i:i + batch_size]
-            future = executor.submit(embed_texts_batch, batch, client)
-            futures.append(future)
-
-        for i, future in enumerate(futures):
-            embeddings = future.result()
-            all_embeddings.extend(embeddings)
-            logger.info(f"Processed batch {i+1}/{len(futures)}")
-
-    _embeddings_cache = np.array(all_embeddings)
+    _embeddings_cache = _embed_corpus(texts, client, batch_size, num_workers)
     logger.info(f"Generated {len(_embeddings_cache)} embeddings")
 
     return _embeddings_cache
 
+def generate_field_embeddings(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Embed each FIELD_GROUPS group separately. Field values repeat heavily
+    (a few dozen colours), so only distinct texts are sent to the API.
+    """
+    global _field_embeddings_cache
+
+    if _field_embeddings_cache is not None:
+        return _field_embeddings_cache
+
+    client = get_openai_client()
+    field_embeddings = {}
+    for group, columns in FIELD_GROUPS.items():
+        texts = df[columns].fillna('').astype(str).agg(' '.join, axis=1).str.strip()
+        codes, uniques = pd.factorize(texts)
+        logger.info(f"Embedding {len(uniques)} distinct '{group}' texts for {len(df)} items")
+        field_embeddings[group] = _embed_corpus(list(uniques), client)[codes]
+
+    _field_embeddings_cache = field_embeddings
+    return _field_embeddings_cache
+
 # ============================================================================
 # SIMILARITY SEARCH (Based on Cookbook)
 # ============================================================================
 
-def cosine_similarity_manual(vec1: np.ndarray, vec2: np.ndarray) -> float:
+def embed_query(query: str) -> np.ndarray:
+    """Embed a search query (hash-based mock embedding when the API is unavailable)"""
+    client = get_openai_client()
+
+    if client:
+        try:
+            response = client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=query,
+                dimensions=EMBEDDING_DIMENSIONS
+            )
+            return np.array(response.data[0].embedding)
+        except Exception as e:
+            logger.error(f"Query embedding error: {e}")
+
+    return np.array(_mock_embedding(query))
+
+
+# Row-normalized copy of the catalog embeddings, so scoring is one matrix product
+_normalized_embeddings: Dict[str, Any] = {"source": None, "matrix": None, "prefix": None}
+
+def _get_normalized_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    if _normalized_embeddings["source"] is not embeddings:
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        _normalized_embeddings.update(source=embeddings, matrix=embeddings / norms, prefix=None)
+    return _normalized_embeddings["matrix"]
+
+
+def normalized_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """Cached row-normalized catalog embeddings, for indexes built outside this module"""
+    return _get_normalized_embeddings(embeddings)
+
+
+def _unit_prefix(vectors: np.ndarray, dims: int) -> np.ndarray:
+    """First dims components, re-normalized (text-embedding-3 vectors are truncatable)"""
+    prefix = np.ascontiguousarray(vectors[..., :dims])
+    norms = np.linalg.norm(prefix, axis=-1, keepdims=True)
+    return prefix / np.where(norms == 0, 1.0, norms)
+
+
+def _get_prefix_embeddings(embeddings: np.ndarray, dims: int) -> np.ndarray:
+    """Contiguous prefix matrix, so the coarse scan only reads dims columns per row"""
+    matrix = _get_normalized_embeddings(embeddings)
+    cached = _normalized_embeddings["prefix"]
+    if cached is None or cached.shape[1] != dims:
+        cached = _unit_prefix(matrix, dims)
+        _normalized_embeddings["prefix"] = cached
+    return cached
+
+
+# Stacked [text | name | attributes | color] matrix of row-normalized vectors
+_field_index: Dict[str, Any] = {"source": None, "matrix": None, "groups": None, "colors": None, "types": None}
+
+
+def _singulars(terms: set) -> set:
+    """Terms plus their naive singular forms ("watches" -> "watch", "shirts" -> "shirt")"""
+    return terms | {term[:-1] for term in terms if term.endswith('s')} | {term[:-2] for term in terms if term.endswith('es')}
+
+
+def _get_field_index(df: pd.DataFrame, embeddings: np.ndarray) -> Optional[Dict[str, Any]]:
+    """Build the stacked multi-field matrix once per catalog (None when disabled)"""
+    if not MULTI_FIELD_EMBEDDINGS:
+        return None
+    if _field_index["source"] is not embeddings:
+        field_embeddings = generate_field_embeddings(df)
+        groups = ["text"] + list(FIELD_GROUPS)
+        blocks = [_get_normalized_embeddings(embeddings)]
+        for group in FIELD_GROUPS:
+            vectors = field_embeddings[group]
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            blocks.append(vectors / np.where(norms == 0, 1.0, norms))
+        _field_index.update(
+            source=embeddings,
+            matrix=np.hstack(blocks),
+            groups=groups,
+            colors=set(df['baseColour'].dropna().str.lower()),
+            types=_singulars(set(df['articleType'].dropna().str.lower()) | set(df['subCategory'].dropna().str.lower()))
+        )
+    return _field_index
+
+
+def field_weights(query: str, colors: set, types: set) -> Dict[str, float]:
+    """Pick fusion weights from the catalog colours / article types a query mentions"""
+    words = query.lower().replace(',', ' ').split()
+    terms = set(words) | {" ".join(pair) for pair in zip(words, words[1:])}
+    terms = _singulars(terms)
+
+    has_color = bool(terms & colors)
+    has_type = bool(terms & types)
+    if has_color and has_type:
+        return COLOR_TYPE_QUERY_WEIGHTS
+    if has_color:
+        return COLOR_QUERY_WEIGHTS
+    if has_type:
+        return TYPE_QUERY_WEIGHTS
+    return FIELD_WEIGHTS
+
+
+def _fused_query(query: str, query_unit: np.ndarray, field_index: Dict[str, Any]) -> np.ndarray:
+    """Weighted copies of the query vector, one block per stacked field"""
+    weights = field_weights(query, field_index["colors"], field_index["types"])
+    return np.concatenate([weights[group] * query_unit for group in field_index["groups"]])
+
+
+def cascade_scores(
+    query_unit: np.ndarray,
+    embeddings: np.ndarray,
+    mask: np.ndarray,
+    score_boost: Optional[np.ndarray] = None,
+    prefix_dims: int = CASCADE_PREFIX_DIMS,
+    candidates: int = CASCADE_CANDIDATES,
+    fused: Optional[Tuple[np.ndarray, np.ndarray]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Calculate cosine similarity between two vectors
-    From cookbook implementation
+    Coarse-to-fine scoring. Every eligible row is scored on the prefix
+    matrix, and only the top candidates are rescored against the full
+    vectors (or the stacked multi-field matrix when fused is given).
+    Returns (candidate rows, full-dimension similarities).
     """
-    dot_product = np.dot(vec1, vec2)
-    norm1 = np.linalg.norm(vec1)
-    norm2 = np.linalg.norm(vec2)
+    matrix = _get_normalized_embeddings(embeddings)
+    prefix_dims = min(prefix_dims, matrix.shape[1])
+
+    coarse = _get_prefix_embeddings(embeddings, prefix_dims) @ _unit_prefix(query_unit, prefix_dims)
+    if score_boost is not None:
+        coarse = coarse + score_boost
 
-    if norm1 == 0 or norm2 == 0:
-        return 0.0
+    eligible = np.flatnonzero(mask)
+    if len(eligible) > candidates:
+        eligible = eligible[np.argpartition(-coarse[eligible], candidates - 1)[:candidates]]
+
+    if fused is not None:
+        stacked, fused_query = fused
+        return eligible, stacked[eligible] @ fused_query
+    return eligible, matrix[eligible] @ query_unit
+
+
+def cascade_recall(
+    queries: List[str],
+    df: pd.DataFrame,
+    embeddings: np.ndarray,
+    k: int = 10,
+    prefix_dims: int = CASCADE_PREFIX_DIMS,
+    candidates: int = CASCADE_CANDIDATES
+) -> Dict[str, Any]:
+    """
+    Measure cascade search against exact search: mean recall@k of the
+    cascade top-k versus the exact top-k, plus bytes read per query.
+    """
+    matrix = _get_normalized_embeddings(embeddings)
+    everything = np.ones(len(df), dtype=bool)
+    recalls = []
+
+    for query in queries:
+        query_embedding = embed_query(query)
+        query_norm = np.linalg.norm(query_embedding)
+        if query_norm == 0:
+            continue
+        query_unit = query_embedding / query_norm
+
+        exact = np.argsort(-(matrix @ query_unit), kind="stable")[:k]
+        rows, scores = cascade_scores(query_unit, embeddings, everything, None, prefix_dims, candidates)
+        approx = rows[np.argsort(-scores, kind="stable")[:k]]
+        recalls.append(len(np.intersect1d(exact, approx)) / max(len(exact), 1))
+
+    prefix_dims = min(prefix_dims, matrix.shape[1])
+    exact_bytes = matrix.nbytes
+    cascade_bytes = len(df) * prefix_dims * matrix.itemsize + min(candidates, len(df)) * matrix.shape[1] * matrix.itemsize
+    return {
+        "queries": len(recalls),
+        "k": k,
+        "prefix_dims": prefix_dims,
+        "candidates": candidates,
+        "recall_at_k": round(float(np.mean(recalls)), 4) if recalls else None,
+        "exact_bytes_per_query": int(exact_bytes),
+        "cascade_bytes_per_query": int(cascade_bytes),
+        "bandwidth_reduction": round(exact_bytes / cascade_bytes, 2) if cascade_bytes else None
+    }
+
+
+def rank_catalog(
+    query: str,
+    df: pd.DataFrame,
+    embeddings: np.ndarray,
+    threshold: float = 0.5,
+    gender_filter: Optional[str] = None,
+    article_type_exclude: Optional[List[str]] = None,
+    row_mask: Optional[np.ndarray] = None,
+    score_boost: Optional[np.ndarray] = None,
+    cascade: Optional[bool] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rank every catalog row against a query in one vectorized pass.
+    Returns (row positions, scores), best first, with the threshold, gender
+    and article-type filters already applied. row_mask restricts the rows
+    and score_boost is added to the similarity (the threshold applies to
+    the raw similarity).
+
+    With cascade (default SEARCH_CASCADE_ENABLED) the full-dimension pass is
+    replaced by cascade_scores, so at most CASCADE_CANDIDATES rows come back.
+    With MULTI_FIELD_EMBEDDINGS the similarity is the weighted fusion of the
+    searchText, name, attribute and colour vectors, in one matrix product.
+    """
+    query_embedding = embed_query(query)
+    query_norm = np.linalg.norm(query_embedding)
+    if query_norm == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0)
+    query_unit = query_embedding / query_norm
+
+    mask = np.ones(len(df), dtype=bool)
+
+    # Case-insensitive gender filter (Unisex matches any filter)
+    if gender_filter and gender_filter.lower() != 'unknown':
+        genders = df['gender'].fillna('').str.lower().to_numpy()
+        mask &= np.isin(genders, [gender_filter.lower(), 'unisex'])
+    if article_type_exclude:
+        mask &= ~df['articleType'].isin(article_type_exclude).to_numpy()
+    if row_mask is not None:
+        mask &= row_mask
+
+    field_index = _get_field_index(df, embeddings)
+    fused = (field_index["matrix"], _fused_query(query, query_unit, field_index)) if field_index else None
+
+    if SEARCH_CASCADE_ENABLED if cascade is None else cascade:
+        rows, similarities = cascade_scores(query_unit, embeddings, mask, score_boost, fused=fused)
+        keep = similarities >= threshold
+        rows, scores = rows[keep], similarities[keep]
+        if score_boost is not None:
+            scores = scores + score_boost[rows]
+        order = np.argsort(-scores, kind="stable")
+        rows, scores = rows[order], scores[order]
+        logger.info(f"Cascade ranked {len(rows)} items above threshold {threshold} for query: '{query[:50]}...'")
+        return rows, scores
+
+    if fused is not None:
+        scores = fused[0] @ fused[1]
+    else:
+        scores = _get_normalized_embeddings(embeddings) @ query_unit
+    mask &= scores >= threshold
+    if score_boost is not None:
+        scores = scores + score_boost
+
+    rows = np.flatnonzero(mask)
+    rows = rows[np.argsort(-scores[rows], kind="stable")]
+
+    logger.info(f"Ranked {len(rows)} items above threshold {threshold} for query: '{query[:50]}...'")
+    return rows, scores[rows]
+
+
+def mmr_rerank(
+    rows: np.ndarray,
+    scores: np.ndarray,
+    embeddings: np.ndarray,
+    diversity: float = 0.3,
+    pool_size: int = MMR_MIN_POOL
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Maximal marginal relevance re-ranking of the top pool_size candidates.
+
+    Each step picks argmax((1 - diversity) * relevance - diversity * max
+    similarity to anything already picked), updating the max-similarity
+    vector with one matrix-vector product per pick. diversity=0 keeps the
+    original order; rows beyond the pool keep their order after it.
+    """
+    pool = min(len(rows), pool_size)
+    if diversity <= 0 or pool < 2:
+        return rows, scores
+
+    candidates = _get_normalized_embeddings(embeddings)[rows[:pool]]
+    relevance = scores[:pool].astype(np.float64)
+    max_similarity = np.full(pool, -np.inf)
+    available = np.ones(pool, dtype=bool)
+    order = np.empty(pool, dtype=np.intp)
+
+    for step in range(pool):
+        if step == 0:
+            marginal = relevance.copy()
+        else:
+            marginal = (1.0 - diversity) * relevance - diversity * max_similarity
+        marginal[~available] = -np.inf
+        pick = int(np.argmax(marginal))
+        order[step] = pick
+        available[pick] = False
+        max_similarity = np.maximum(max_similarity, candidates @ candidates[pick])
+
+    reranked_rows = np.concatenate([rows[:pool][order], rows[pool:]])
+    reranked_scores = np.concatenate([scores[:pool][order], scores[pool:]])
+    return reranked_rows, reranked_scores
+
+
+def collapse_duplicates(df: pd.DataFrame, rows: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """One result per near-duplicate group (no-op when groups weren't built)"""
+    if 'groupId' not in df.columns:
+        return rows, scores
+    return collapse_groups(rows, scores, df['groupId'].to_numpy())
+
+
+def catalog_items(
+    df: pd.DataFrame,
+    rows: np.ndarray,
+    scores: np.ndarray,
+    store_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Materialize ranked catalog rows as enriched result items (store-scoped stock when store_id is given)"""
+    overlay = get_store_overlay(store_id)
+    page = df.iloc[rows]
+    records = page.astype(object).where(page.notna(), None).to_dict('records')  # NaN isn't valid JSON
+    results = []
+    for idx, score, item in zip(rows, scores, records):
+        item['similarity_score'] = float(score)
+
+        # Add retail value data (mock but realistic)
+        results.append(enrich_with_retail_data(item, overlay, int(idx)))
+    return results
 
-    return dot_product / (norm1 * norm2)
 
 def find_similar_items(
     query: str,
@@ -168,110 +561,100 @@ def find_similar_items(
     threshold: float = 0.5,
     top_k: int = 10,
     gender_filter: Optional[str] = None,
-    article_type_exclude: Optional[List[str]] = None
+    article_type_exclude: Optional[List[str]] = None,
+    diversity: float = 0.0,
+    collapse: bool = False,
+    store_id: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
     Find similar items using RAG with embeddings
     Based on cookbook's find_similar_items_with_rag
+    diversity > 0 applies MMR re-ranking to spread results across styles;
+    collapse keeps one item per near-duplicate group; store_id restricts
+    results to what that store has in stock
     """
-    client = get_openai_client()
-
-    # Generate query embedding
-    if client:
-        try:
-            response = client.embeddings.create(
-                model=EMBEDDING_MODEL,
-                input=query,
-                dimensions=EMBEDDING_DIMENSIONS
-            )
-            query_embedding = np.array(response.data[0].embedding)
-        except Exception as e:
-            logger.error(f"Query embedding error: {e}")
-            hash_val = hash(query)
-            query_embedding = np.array([(hash_val >> i) % 100 / 100.0 for i in range(EMBEDDING_DIMENSIONS)])
-    else:
-        hash_val = hash(query)
-        query_embedding = np.array([(hash_val >> i) % 100 / 100.0 for i in range(EMBEDDING_DIMENSIONS)])
+    if gender_filter:
+        logger.info(f"Applying gender filter: '{gender_filter}'")
 
-    # Calculate similarities
-    similarities = []
-    for idx, emb in enumerate(embeddings):
-        similarity = cosine_similarity_manual(query_embedding, emb)
-        if similarity >= threshold:
-            similarities.append((idx, similarity))
+    rows, scores = rank_catalog(
+        query, df, embeddings, threshold, gender_filter, article_type_exclude,
+        row_mask=availability_mask(store_id)
+    )
+    if collapse:
+        rows, scores = collapse_duplicates(df, rows, scores)
+    if diversity > 0:
+        rows, scores = mmr_rerank(rows, scores, embeddings, diversity, max(top_k * MMR_POOL_FACTOR, MMR_MIN_POOL))
+    results = catalog_items(df, rows[:top_k], scores[:top_k], store_id)
+
+    logger.info(f"Returning {len(results)} items after filtering")
+    return results
+
+
+# Price ranges by category (realistic retail pricing)
+PRICE_RANGES = {
+    'shirts': (45, 120),
+    'tshirts': (25, 65),
+    'trousers': (55, 150),
+    'jeans': (60, 180),
+    'dresses': (75, 250),
+    'jackets': (90, 350),
+    'blazers': (120, 400),
+    'shoes': (65, 220),
+    'sandals': (35, 95),
+    'heels': (70, 200),
+    'watches': (80, 500),
+    'bags': (45, 280),
+    'kurtas': (40, 120),
+    'tops': (30, 85),
+    'shorts': (35, 80),
+    'skirts': (40, 120),
+    'sweaters': (50, 150),
+    'sweatshirts': (45, 120),
+}
 
-    # Sort by similarity descending
-    similarities.sort(key=lambda x: x[1], reverse=True)
+# Price bands used for faceted filtering: (label, min inclusive, max exclusive)
+PRICE_BANDS = [
+    ("Under $50", 0, 50),
+    ("$50-$100", 50, 100),
+    ("$100-$200", 100, 200),
+    ("$200+", 200, float("inf")),
+]
 
-    logger.info(f"Found {len(similarities)} items above threshold {threshold} for query: '{query[:50]}...'")
-    if gender_filter:
-        logger.info(f"Applying gender filter: '{gender_filter}'")
 
-    # Get top k results
-    results = []
-    for idx, score in similarities[:top_k]:
-        item = df.iloc[idx].to_dict()
-
-        # Apply filters (case-insensitive gender comparison)
-        if gender_filter:
-            item_gender = item['gender'].lower() if item.get('gender') else ''
-            filter_gender = gender_filter.lower() if gender_filter else ''
-            # Skip if gender doesn't match (allow Unisex for any filter)
-            if item_gender not in [filter_gender, 'unisex'] and filter_gender != 'unknown':
-                continue
-        if article_type_exclude and item['articleType'] in article_type_exclude:
-            continue
+def _item_hash(item_id: str) -> int:
+    """Deterministic per-item seed for mock retail data"""
+    return int(hashlib.md5(item_id.encode()).hexdigest()[:8], 16)
 
-        item['similarity_score'] = float(score)
 
-        # Add retail value data (mock but realistic)
-        item = enrich_with_retail_data(item)
+def retail_price(item_id: str, article_type: str) -> int:
+    """Consistent mock retail price for an item, within its category's range"""
+    min_price, max_price = PRICE_RANGES.get(article_type.lower(), (40, 150))
+    return min_price + (_item_hash(item_id) % (max_price - min_price))
 
-        results.append(item)
 
-    logger.info(f"Returning {len(results[:top_k])} items after filtering")
-    return results[:top_k]
+def price_band(price: float) -> str:
+    """Label of the price band a price falls into"""
+    for label, low, high in PRICE_BANDS:
+        if low <= price < high:
+            return label
+    return PRICE_BANDS[-1][0]
 
 
-def enrich_with_retail_data(item: Dict[str, Any]) -> Dict[str, Any]:
+def enrich_with_retail_data(
+    item: Dict[str, Any],
+    overlay: Optional[StoreOverlay] = None,
+    row: Optional[int] = None
+) -> Dict[str, Any]:
     """
     Enrich item with retail-valuable data: price, location, stock
     This demonstrates value for both customers and store operations
+    With a store overlay, stock and shelf come from that store's arrays at row
     """
-    import hashlib
-
     # Generate deterministic but realistic price based on item attributes
     item_id = str(item.get('id', 0))
     article_type = item.get('articleType', 'Item').lower()
-
-    # Price ranges by category (realistic retail pricing)
-    price_ranges = {
-        'shirts': (45, 120),
-        'tshirts': (25, 65),
-        'trousers': (55, 150),
-        'jeans': (60, 180),
-        'dresses': (75, 250),
-        'jackets': (90, 350),
-        'blazers': (120, 400),
-        'shoes': (65, 220),
-        'sandals': (35, 95),
-        'heels': (70, 200),
-        'watches': (80, 500),
-        'bags': (45, 280),
-        'kurtas': (40, 120),
-        'tops': (30, 85),
-        'shorts': (35, 80),
-        'skirts': (40, 120),
-        'sweaters': (50, 150),
-        'sweatshirts': (45, 120),
-    }
-
-    # Get price range for this article type
-    min_price, max_price = price_ranges.get(article_type, (40, 150))
-
-    # Generate consistent price from item ID
-    hash_val = int(hashlib.md5(item_id.encode()).hexdigest()[:8], 16)
-    price = min_price + (hash_val % (max_price - min_price))
+    hash_val = _item_hash(item_id)
+    price = retail_price(item_id, article_type)
     item['price'] = price
 
     # Generate store location (Aisle + Rack format)
@@ -288,36 +671,40 @@ def enrich_with_retail_data(item: Dict[str, Any]) -> Dict[str, Any]:
     }
 
     aisle = aisle_map.get(gender, {}).get(category, 'A')
-    rack = (hash_val % 12) + 1  # Racks 1-12
-    shelf = (hash_val % 4) + 1  # Shelves 1-4
-
-    item['storeLocation'] = {
-        'aisle': f"Aisle {aisle}",
-        'rack': f"Rack {rack}",
-        'shelf': f"Shelf {shelf}",
-        'display': f"Aisle {aisle}, Rack {rack}"
-    }
+    if overlay is not None and row is not None:
+        # Store-scoped stock and shelf position from the overlay arrays
+        item.update(overlay.item_fields(row, aisle))
+    else:
+        rack = (hash_val % 12) + 1  # Racks 1-12
+        shelf = (hash_val % 4) + 1  # Shelves 1-4
+
+        item['storeLocation'] = {
+            'aisle': f"Aisle {aisle}",
+            'rack': f"Rack {rack}",
+            'shelf': f"Shelf {shelf}",
+            'display': f"Aisle {aisle}, Rack {rack}"
+        }
 
-    # Stock level (realistic distribution: most in stock, some low, few out)
-    stock_seed = (hash_val >> 8) % 100
-    if stock_seed < 70:  # 70% in stock
-        stock_qty = 5 + (hash_val % 20)  # 5-24 items
-        stock_status = 'in_stock'
-        stock_label = 'In Stock'
-    elif stock_seed < 90:  # 20% low stock
-        stock_qty = 1 + (hash_val % 4)  # 1-4 items
-        stock_status = 'low_stock'
-        stock_label = f'Only {stock_qty} left'
-    else:  # 10% out of stock (for demo realism)
-        stock_qty = 0
-        stock_status = 'out_of_stock'
-        stock_label = 'Out of Stock'
-
-    item['stock'] = {
-        'quantity': stock_qty,
-        'status': stock_status,
-        'label': stock_label
-    }
+        # Stock level (realistic distribution: most in stock, some low, few out)
+        stock_seed = (hash_val >> 8) % 100
+        if stock_seed < 70:  # 70% in stock
+            stock_qty = 5 + (hash_val % 20)  # 5-24 items
+            stock_status = 'in_stock'
+            stock_label = 'In Stock'
+        elif stock_seed < 90:  # 20% low stock
+            stock_qty = 1 + (hash_val % 4)  # 1-4 items
+            stock_status = 'low_stock'
+            stock_label = f'Only {stock_qty} left'
+        else:  # 10% out of stock (for demo realism)
+            stock_qty = 0
+            stock_status = 'out_of_stock'
+            stock_label = 'Out of Stock'
+
+        item['stock'] = {
+            'quantity': stock_qty,
+            'status': stock_status,
+            'label': stock_label
+        }
 
     # Add usage context for upselling
     usage = item.get('usage', 'Casual')
@@ -363,10 +750,12 @@ def get_pairing_suggestions(article_type: str, gender: str) -> List[str]:
 # IMAGE ANALYSIS (GPT-4o Vision)
 # ============================================================================
 
-def analyze_clothing_image(image_base64: str) -> Dict[str, Any]:
+def analyze_clothing_image(image_base64: Optional[str] = None, image_bytes: Optional[bytes] = None) -> Dict[str, Any]:
     """
     Analyze clothing image using GPT-4o vision
     Returns structured analysis of the clothing item
+
+    Pass raw image_bytes when available to skip a base64 round trip.
     """
     client = get_openai_client()
 
@@ -382,6 +771,12 @@ def analyze_clothing_image(image_base64: str) -> Dict[str, Any]:
         }
 
     try:
+        # Downscale/re-encode locally so the vision request carries only what the model needs
+        if image_bytes is not None:
+            prepared = preprocess_image_bytes(image_bytes)
+        else:
+            prepared = prepare_vision_image(image_base64)
+
         response = client.chat.completions.create(
             model=GPT_MODEL,
             messages=[
@@ -410,8 +805,8 @@ Use lowercase for article_type and base_colour values."""
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_base64}",
-                                "detail": "high"
+                                "url": prepared.data_url,
+                                "detail": prepared.detail
                             }
                         }
                     ]
@@ -431,7 +826,8 @@ Use lowercase for article_type and base_colour values."""
             "style_description": analysis.get("style_description") or analysis.get("styleDescription") or analysis.get("style") or "casual",
             "suggested_occasions": analysis.get("suggested_occasions") or analysis.get("suggestedOccasions") or analysis.get("occasions") or ["everyday"],
             "complementary_items": analysis.get("complementary_items") or analysis.get("complementaryItems") or analysis.get("matches") or [],
-            "gender": analysis.get("gender") or "Unisex"
+            "gender": analysis.get("gender") or "Unisex",
+            "preprocessing": prepared.stats
         }
 
         logger.info(f"Image analysis result: article_type={normalized['article_type']}, base_colour={normalized['base_colour']}, gender={normalized['gender']}")
@@ -524,6 +920,10 @@ def initialize_rag_system():
 
     embeddings = generate_embeddings(df)
 
+    # Group near-duplicate SKUs once, so search can collapse them per group
+    if DEDUP_ENABLED and 'groupId' not in df.columns:
+        df['groupId'] = group_near_duplicates(df, _get_normalized_embeddings(embeddings))
+
     logger.info(f"RAG system ready with {len(df)} items")
     return df, embeddings
 
@@ -531,32 +931,77 @@ def initialize_rag_system():
 # CONVENIENCE FUNCTIONS
 # ============================================================================
 
-def search_by_description(description: str, gender: Optional[str] = None, top_k: int = 5) -> List[Dict]:
-    """Search for items by natural language description"""
+def rank_by_description(
+    description: str,
+    gender: Optional[str] = None,
+    row_mask: Optional[np.ndarray] = None,
+    score_boost: Optional[np.ndarray] = None,
+    diversity: float = 0.0,
+    collapse: bool = False,
+    store_id: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Full ranked result set for a natural language description
+    (one per near-duplicate group with collapse, MMR-reranked when diversity > 0,
+    limited to a store's in-stock rows with store_id)
+    """
     df, embeddings = initialize_rag_system()
 
-    return find_similar_items(
+    rows, scores = rank_catalog(
         query=description,
         df=df,
         embeddings=embeddings,
         threshold=0.3,
-        top_k=top_k,
-        gender_filter=gender
+        gender_filter=gender,
+        row_mask=availability_mask(store_id, row_mask),
+        score_boost=score_boost
     )
+    if collapse:
+        rows, scores = collapse_duplicates(df, rows, scores)
+    if diversity > 0:
+        rows, scores = mmr_rerank(rows, scores, embeddings, diversity)
+    return rows, scores
+
+def search_by_description(
+    description: str,
+    gender: Optional[str] = None,
+    top_k: int = 5,
+    row_mask: Optional[np.ndarray] = None,
+    score_boost: Optional[np.ndarray] = None,
+    diversity: float = 0.0,
+    store_id: Optional[str] = None
+) -> List[Dict]:
+    """Search for items by natural language description, optionally masked/boosted per catalog row"""
+    df, embeddings = initialize_rag_system()
 
-def get_matching_items(image_base64: str, gender: str, top_k: int = 5, search_mode: str = "complementary") -> Dict[str, Any]:
+    rows, scores = rank_by_description(description, gender, row_mask, score_boost, diversity, store_id=store_id)
+    return catalog_items(df, rows[:top_k], scores[:top_k], store_id)
+
+def get_matching_items(
+    image_base64: Optional[str] = None,
+    gender: Optional[str] = None,
+    top_k: int = 5,
+    search_mode: str = "complementary",
+    analysis: Optional[Dict[str, Any]] = None,
+    diversity: float = 0.0,
+    store_id: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Get matching items for an uploaded clothing image
     Based on cookbook's approach
 
     Args:
-        image_base64: Base64 encoded image
+        image_base64: Base64 encoded image (not needed when analysis is given)
         gender: Gender filter (Men/Women/Unisex)
         top_k: Number of results to return
         search_mode: "similar" to find same type of item, "complementary" to find items that go with it
+        analysis: Previously computed image analysis (e.g. from an uploaded image_id)
+        diversity: MMR diversity weight (0 = pure relevance)
+        store_id: Only match items in stock at this store, with its stock levels
     """
-    # Analyze the image
-    analysis = analyze_clothing_image(image_base64)
+    # Analyze the image unless we already have an analysis for it
+    if analysis is None:
+        analysis = analyze_clothing_image(image_base64)
 
     # Use gender from image analysis if not provided or is default
     detected_gender = analysis.get('gender', 'Unisex')
@@ -584,7 +1029,9 @@ def get_matching_items(image_base64: str, gender: str, top_k: int = 5, search_mo
             threshold=0.3,
             top_k=top_k,
             gender_filter=gender,
-            article_type_exclude=[]  # Don't exclude - we WANT the same type
+            article_type_exclude=[],  # Don't exclude - we WANT the same type
+            diversity=diversity,
+            store_id=store_id
         )
 
     else:
@@ -604,7 +1051,9 @@ def get_matching_items(image_base64: str, gender: str, top_k: int = 5, search_mo
             threshold=0.3,
             top_k=top_k,
             gender_filter=gender,
-            article_type_exclude=[article_type] if article_type != 'clothing' else []
+            article_type_exclude=[article_type] if article_type != 'clothing' else [],
+            diversity=diversity,
+            store_id=store_id
         )
 
     # If no matches found, try a broader search
@@ -617,7 +1066,9 @@ def get_matching_items(image_base64: str, gender: str, top_k: int = 5, search_mo
             embeddings=embeddings,
             threshold=0.25,
             top_k=top_k,
-            gender_filter=gender
+            gender_filter=gender,
+            diversity=diversity,
+            store_id=store_id
         )
 
     return {
@@ -0,0 +1,229 @@
+"""
+RetailNext Smart Stylist - Rule-Based Event Context Extraction
+Fills EVENT_CONTEXT_SCHEMA fields from compiled keyword dictionaries, with a
+confidence per field, so clearly stated requests ("men's formal shirt for an
+interview") skip the structured-output LLM call
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Confidence levels assigned by the rules
+EXPLICIT = 0.95   # The field's value is stated outright
+INFERRED = 0.7    # Derived from another field (e.g. formality from event type)
+HINT = 0.6        # Suggestive but unreliable: a pronoun, a negated or conflicting cue
+WEAK = 0.5        # Default value, nothing in the text contradicts it
+
+# Fields that must reach the threshold before the rule result is trusted
+REQUIRED_FIELDS = ("event_type", "formality_level", "gender")
+
+
+def _compile(patterns: List[Tuple[str, Any]]) -> List[Tuple[Pattern, Any]]:
+    return [(re.compile(pattern, re.IGNORECASE), value) for pattern, value in patterns]
+
+
+# (pattern, (event_type, default formality)) - first match wins
+EVENT_PATTERNS = _compile([
+    (r"\bblack[- ]tie\b|\bgala\b|\bball\b", ("gala", "black-tie")),
+    (r"\bwedding\b|\bbride|\bgroom|\breception\b", ("wedding", "semi-formal")),
+    (r"\binterview", ("job interview", "business-casual")),
+    (r"\bgraduation\b", ("graduation ceremony", "smart-casual")),
+    (r"\bfuneral\b|\bmemorial\b", ("funeral", "formal")),
+    (r"\bcocktail", ("cocktail party", "semi-formal")),
+    (r"\bmeeting\b|\bconference\b|\bpresentation\b|\bclient\b", ("business meeting", "business-casual")),
+    (r"\boffice\b|\bworkplace\b|\bat work\b|\bfor work\b", ("office", "business-casual")),
+    (r"\bdate\b|\banniversary\b", ("date night", "smart-casual")),
+    (r"\bparty\b|\bbirthday\b|\bcelebration\b|\bclub", ("party", "smart-casual")),
+    (r"\bdinner\b|\brestaurant\b", ("dinner", "smart-casual")),
+    (r"\bbrunch\b|\blunch\b", ("brunch", "casual")),
+    (r"\bfestival\b|\bconcert\b|\bgig\b", ("festival", "casual")),
+    (r"\bbeach\b|\bpool\b", ("beach day", "very-casual")),
+    (r"\bgym\b|\bworkout\b|\brunning\b|\byoga\b|\btraining\b", ("workout", "very-casual")),
+    (r"\bholiday\b|\bvacation\b|\btrip\b|\btravel", ("holiday", "casual")),
+    (r"\bweekend\b|\beveryday\b|\bdaily\b|\berrands\b", ("casual outing", "casual")),
+])
+
+# Compound levels first so "smart casual" isn't read as "casual"; a level
+# already matched hides the shorter levels inside it
+FORMALITY_PATTERNS = _compile([
+    (r"\bblack[- ]tie\b", "black-tie"),
+    (r"\bsemi[- ]formal\b", "semi-formal"),
+    (r"\bbusiness[- ]casual\b", "business-casual"),
+    (r"\bsmart[- ]casual\b", "smart-casual"),
+    (r"\bvery casual\b|\brelaxed\b|\blaid[- ]back\b", "very-casual"),
+    (r"\bformal\b|\bdressy\b|\bsuit\b", "formal"),
+    (r"\bcasual\b", "casual"),
+])
+
+# A negation up to two words before a formality cue ("not going formal")
+NEGATION_BEFORE = re.compile(r"\b(?:not|no|never|without|avoid|nothing|don'?t|isn'?t)\W+(?:\w+\W+){0,2}$", re.IGNORECASE)
+
+# (pattern, gender, confidence). Pronouns and relationships often describe
+# someone other than the shopper ("a dress for my boyfriend's graduation"),
+# so they are only hints and leave the decision to the LLM
+GENDER_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), gender, confidence)
+    for pattern, gender, confidence in [
+        (r"\b(men|man|mens|men's|male|gents?|menswear)\b", "men", EXPLICIT),
+        (r"\b(women|woman|womens|women's|female|ladies|lady|womenswear)\b", "women", EXPLICIT),
+        (r"\b(him|his|he|husband|boyfriend|groom)\b", "men", HINT),
+        (r"\b(her|she|wife|girlfriend|bride)\b", "women", HINT),
+    ]
+]
+
+SEASON_PATTERNS = _compile([
+    (r"\bspring\b", "spring"),
+    (r"\bsummer\b", "summer"),
+    (r"\bautumn\b|\bfall\b", "autumn"),
+    (r"\bwinter\b", "winter"),
+])
+
+VENUE_PATTERNS = _compile([
+    (r"\boutdoors?\b|\bgarden\b|\bpark\b|\bbeach\b|\bvineyard\b", "outdoor"),
+    (r"\bindoors?\b|\bhall\b|\boffice\b|\brestaurant\b|\bchurch\b|\bballroom\b", "indoor"),
+])
+
+TIME_PATTERNS = _compile([
+    (r"\bmorning\b|\bbreakfast\b|\bbrunch\b", "morning"),
+    (r"\bafternoon\b|\blunch\b", "afternoon"),
+    (r"\bevening\b|\bdinner\b", "evening"),
+    (r"\bnight\b|\btonight\b", "night"),
+])
+
+WEATHER_PATTERN = re.compile(r"\b(rain\w*|cold|chilly|hot|warm|sunny|windy|humid|snow\w*)\b", re.IGNORECASE)
+
+COLOR_PATTERN = re.compile(
+    r"\b(navy blue|sky blue|off white|black(?![- ]tie)|white|grey|gray|navy|blue|red|green|yellow|pink|purple|"
+    r"brown|beige|cream|orange|maroon|gold|silver|emerald|olive|teal|burgundy|khaki|tan|pastel|neutral)s?\b",
+    re.IGNORECASE
+)
+
+BUDGET_KEYWORDS = _compile([
+    (r"\bcheap\b|\baffordable\b|\bbudget\b|\binexpensive\b|\bbargain\b", "budget-friendly"),
+    (r"\bluxury\b|\bdesigner\b|\bmoney is no object\b", "luxury"),
+    (r"\bpremium\b|\bhigh[- ]end\b|\bsplurge\b", "premium"),
+    (r"\bmid[- ]range\b|\bmoderate\b|\breasonabl", "moderate"),
+])
+BUDGET_AMOUNT_PATTERN = re.compile(r"\$\s?(\d+(?:\.\d+)?)|(\d+(?:\.\d+)?)\s?(?:dollars|bucks|aud)\b", re.IGNORECASE)
+
+# Upper bounds of each budget preference, by stated total amount
+BUDGET_AMOUNT_BANDS = [(100, "budget-friendly"), (250, "moderate"), (600, "premium")]
+
+# ============================================================================
+# EXTRACTION
+# ============================================================================
+
+@dataclass
+class RuleExtraction:
+    """An EVENT_CONTEXT_SCHEMA-shaped context with a confidence per field"""
+    context: Dict[str, Any]
+    confidence: Dict[str, float] = field(default_factory=dict)
+
+    def is_confident(self, threshold: float, required: Tuple[str, ...] = REQUIRED_FIELDS) -> bool:
+        return all(self.confidence.get(name, 0.0) >= threshold for name in required)
+
+
+def _first_match(patterns: List[Tuple[Pattern, Any]], text: str) -> Optional[Any]:
+    for pattern, value in patterns:
+        if pattern.search(text):
+            return value
+    return None
+
+
+def _extract_gender(text: str) -> Tuple[str, float]:
+    """Strongest gender cue; conflicting cues of equal strength mean unknown"""
+    found: Dict[str, float] = {}
+    for pattern, gender, confidence in GENDER_PATTERNS:
+        if pattern.search(text):
+            found[gender] = max(found.get(gender, 0.0), confidence)
+    if not found:
+        return "unknown", 0.0
+
+    ranked = sorted(found.items(), key=lambda pair: pair[1], reverse=True)
+    if len(ranked) > 1 and ranked[0][1] == ranked[1][1]:
+        return "unknown", 0.0
+    return ranked[0]
+
+
+def _extract_formality(text: str) -> Tuple[Optional[str], float]:
+    """
+    Stated formality level. Negated cues are ignored, and a negation or two
+    different levels in one request ("not formal, something casual") only
+    make the result a hint.
+    """
+    stated: List[Tuple[int, str]] = []
+    negated = False
+    taken: List[Tuple[int, int]] = []
+    for pattern, level in FORMALITY_PATTERNS:
+        for match in pattern.finditer(text):
+            if any(start < match.end() and match.start() < end for start, end in taken):
+                continue
+            taken.append(match.span())
+            if NEGATION_BEFORE.search(text[:match.start()]):
+                negated = True
+            else:
+                stated.append((match.start(), level))
+
+    if not stated:
+        return None, HINT if negated else 0.0
+    levels = {level for _, level in stated}
+    return min(stated)[1], HINT if negated or len(levels) > 1 else EXPLICIT
+
+
+def _extract_budget(text: str) -> Tuple[str, float]:
+    amounts = [float(a or b) for a, b in BUDGET_AMOUNT_PATTERN.findall(text)]
+    if amounts:
+        amount = max(amounts)
+        for limit, preference in BUDGET_AMOUNT_BANDS:
+            if amount <= limit:
+                return preference, EXPLICIT
+        return "luxury", EXPLICIT
+
+    preference = _first_match(BUDGET_KEYWORDS, text)
+    return (preference, EXPLICIT) if preference else ("unspecified", WEAK)
+
+
+def extract_event_context(text: str) -> RuleExtraction:
+    """Extract event context fields from text using the compiled dictionaries"""
+    context: Dict[str, Any] = {}
+    confidence: Dict[str, float] = {}
+
+    event = _first_match(EVENT_PATTERNS, text)
+    context["event_type"], confidence["event_type"] = (event[0], EXPLICIT) if event else ("general occasion", 0.0)
+
+    formality, formality_confidence = _extract_formality(text)
+    if formality:
+        context["formality_level"], confidence["formality_level"] = formality, formality_confidence
+    elif event:
+        # A negated level may be the event's default, so only trust it when nothing was negated
+        context["formality_level"] = event[1]
+        confidence["formality_level"] = HINT if formality_confidence else INFERRED
+    else:
+        context["formality_level"], confidence["formality_level"] = "smart-casual", 0.0
+
+    context["gender"], confidence["gender"] = _extract_gender(text)
+
+    for name, patterns in (("season", SEASON_PATTERNS), ("venue_type", VENUE_PATTERNS), ("time_of_day", TIME_PATTERNS)):
+        value = _first_match(patterns, text)
+        context[name], confidence[name] = (value, EXPLICIT) if value else ("unknown", WEAK)
+
+    weather = list(dict.fromkeys(match.lower() for match in WEATHER_PATTERN.findall(text)))
+    context["weather_consideration"] = ", ".join(weather)
+    confidence["weather_consideration"] = EXPLICIT if weather else WEAK
+
+    colors = list(dict.fromkeys(match.lower() for match in COLOR_PATTERN.findall(text)))
+    context["color_preferences"] = colors
+    confidence["color_preferences"] = EXPLICIT if colors else WEAK
+
+    context["budget_preference"], confidence["budget_preference"] = _extract_budget(text)
+
+    # Free-form fields are left for the LLM path to fill in
+    context["style_notes"], confidence["style_notes"] = "", WEAK
+    context["specific_requirements"], confidence["specific_requirements"] = [], WEAK
+
+    return RuleExtraction(context, confidence)
@@ -0,0 +1,175 @@
+"""
+RetailNext Smart Stylist - Vision Image Preprocessing
+Shrinks phone-camera photos before they are sent to the vision model:
+decode, strip metadata, trim plain borders, downscale and re-encode as JPEG
+"""
+
+import io
+import os
+import base64
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageChops, ImageFilter, ImageOps, ImageStat
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    logger.warning("Pillow not installed - vision images will be sent unprocessed")
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# "low" detail images are scaled to fit 512x512; "high" detail tiles the
+# image at up to 768px on the short side, so nothing larger is ever useful
+VISION_LOW_DETAIL_SIDE = 512
+VISION_HIGH_DETAIL_SHORT_SIDE = 768
+VISION_HIGH_DETAIL_LONG_SIDE = 1536
+
+# "auto" picks low/high per image from its texture; "low"/"high" force a level
+VISION_DETAIL = os.getenv("VISION_DETAIL", "auto").lower()
+VISION_EDGE_THRESHOLD = float(os.getenv("VISION_EDGE_THRESHOLD", "18.0"))
+VISION_JPEG_QUALITY = int(os.getenv("VISION_JPEG_QUALITY", "82"))
+
+# Minimum difference from the corner colour for a pixel to count as content
+BORDER_TRIM_TOLERANCE = 12
+
+# ============================================================================
+# PREPROCESSING
+# ============================================================================
+
+@dataclass
+class PreparedImage:
+    """A vision-ready image with the detail level to request and size stats"""
+    data: bytes
+    mime_type: str
+    detail: str
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{base64.b64encode(self.data).decode('utf-8')}"
+
+
+def _trim_uniform_border(image: "Image.Image") -> "Image.Image":
+    """Crop away plain background borders (e.g. a white studio backdrop)"""
+    background = Image.new(image.mode, image.size, image.getpixel((0, 0)))
+    diff = ImageChops.difference(image, background).convert("L")
+    diff = diff.point(lambda p: 255 if p > BORDER_TRIM_TOLERANCE else 0)
+    bbox = diff.getbbox()
+
+    if not bbox:
+        return image
+
+    # Only crop when it removes a meaningful amount, and keep a small margin
+    left, top, right, bottom = bbox
+    if (right - left) * (bottom - top) > 0.9 * image.width * image.height:
+        return image
+
+    margin = max(4, min(image.size) // 50)
+    return image.crop((
+        max(0, left - margin),
+        max(0, top - margin),
+        min(image.width, right + margin),
+        min(image.height, bottom + margin)
+    ))
+
+
+def _choose_detail(image: "Image.Image") -> str:
+    """Use high detail only for busy textures (prints, stripes, lace)"""
+    if VISION_DETAIL in ("low", "high"):
+        return VISION_DETAIL
+
+    thumbnail = image.convert("L")
+    thumbnail.thumbnail((256, 256))
+    edge_energy = ImageStat.Stat(thumbnail.filter(ImageFilter.FIND_EDGES)).mean[0]
+    return "high" if edge_energy >= VISION_EDGE_THRESHOLD else "low"
+
+
+def _target_size(width: int, height: int, detail: str) -> Tuple[int, int]:
+    """Largest size the vision model will actually look at for this detail level"""
+    if detail == "low":
+        scale = VISION_LOW_DETAIL_SIDE / max(width, height)
+    else:
+        scale = min(
+            VISION_HIGH_DETAIL_SHORT_SIDE / min(width, height),
+            VISION_HIGH_DETAIL_LONG_SIDE / max(width, height)
+        )
+    scale = min(scale, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def preprocess_image_bytes(data: bytes) -> PreparedImage:
+    """
+    Decode, strip metadata, crop and downscale an image for vision analysis.
+    Falls back to the original bytes at high detail if the image can't be decoded.
+    """
+    original_bytes = len(data)
+
+    if not PIL_AVAILABLE:
+        return PreparedImage(data, "image/jpeg", "high", {
+            "original_bytes": original_bytes,
+            "processed_bytes": original_bytes,
+            "bytes_saved": 0,
+            "skipped": "pillow_unavailable"
+        })
+
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            # Apply camera orientation before EXIF is dropped
+            image = ImageOps.exif_transpose(source)
+            original_size = image.size
+
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+
+            image = _trim_uniform_border(image)
+            detail = _choose_detail(image)
+
+            target = _target_size(image.width, image.height, detail)
+            if target != image.size:
+                image = image.resize(target, Image.LANCZOS)
+
+            # Re-encode without EXIF/ICC metadata
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=VISION_JPEG_QUALITY, optimize=True)
+            processed = buffer.getvalue()
+
+    except Exception as e:
+        logger.warning(f"Image preprocessing failed, sending original: {e}")
+        return PreparedImage(data, "image/jpeg", "high", {
+            "original_bytes": original_bytes,
+            "processed_bytes": original_bytes,
+            "bytes_saved": 0,
+            "skipped": "decode_failed"
+        })
+
+    processed_size = image.size
+
+    # Never make the payload bigger than what we were given
+    if len(processed) >= original_bytes:
+        processed = data
+        processed_size = original_size
+
+    stats = {
+        "original_bytes": original_bytes,
+        "processed_bytes": len(processed),
+        "bytes_saved": original_bytes - len(processed),
+        "original_size": list(original_size),
+        "processed_size": list(processed_size),
+        "detail": detail
+    }
+    logger.info(
+        f"Vision image preprocessed: {original_bytes} -> {len(processed)} bytes "
+        f"({original_size[0]}x{original_size[1]} -> {processed_size[0]}x{processed_size[1]}, detail={detail})"
+    )
+    return PreparedImage(processed, "image/jpeg", detail, stats)
+
+
+def prepare_vision_image(image_base64: str) -> PreparedImage:
+    """Preprocess a base64 image for a vision request"""
+    return preprocess_image_bytes(base64.b64decode(image_base64))
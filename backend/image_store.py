@@ -0,0 +1,72 @@
+"""
+RetailNext Smart Stylist - Uploaded Image Store
+Keeps each uploaded image and its vision analysis in memory so chat turns
+can reference the image by ID instead of re-sending base64 on every message
+"""
+
+import os
+import uuid
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from caching import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+IMAGE_STORE_MAX_IMAGES = int(os.getenv("IMAGE_STORE_MAX_IMAGES", "256"))
+IMAGE_STORE_MAX_BYTES = int(os.getenv("IMAGE_STORE_MAX_BYTES", str(128 * 1024 * 1024)))
+IMAGE_STORE_TTL_SECONDS = int(os.getenv("IMAGE_STORE_TTL_SECONDS", "3600"))
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+@dataclass
+class StoredImage:
+    """An uploaded image plus the analysis computed for it at upload time"""
+    image_id: str
+    data: bytes
+    content_type: str = "image/jpeg"
+    analysis: Optional[Dict[str, Any]] = None
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+
+_images = TTLCache(
+    max_entries=IMAGE_STORE_MAX_IMAGES,
+    ttl_seconds=IMAGE_STORE_TTL_SECONDS,
+    max_weight=IMAGE_STORE_MAX_BYTES,
+    weigher=lambda image: len(image.data)
+)
+
+
+def save_image(
+    data: bytes,
+    content_type: str = "image/jpeg",
+    analysis: Optional[Dict[str, Any]] = None
+) -> StoredImage:
+    """Store image bytes and return the record with its new image_id"""
+    image = StoredImage(
+        image_id=uuid.uuid4().hex,
+        data=data,
+        content_type=content_type or "image/jpeg",
+        analysis=analysis
+    )
+    _images.set(image.image_id, image)
+    logger.info(f"Stored image {image.image_id} ({len(data)} bytes)")
+    return image
+
+
+def get_image(image_id: str) -> Optional[StoredImage]:
+    """Look up a stored image, or None if unknown or expired"""
+    return _images.get(image_id)
+
+
+def image_store_stats() -> Dict[str, Any]:
+    """Return image store size and hit statistics"""
+    return _images.stats()
@@ -0,0 +1,143 @@
+"""
+RetailNext Smart Stylist - Inventory Lookup Index
+In-memory indexes over the store inventory so function-calling tools
+resolve lookups without scanning every item:
+- id hash map
+- character trigram postings for name/description/colour substring matches
+- per-attribute postings for category, gender and size
+- a spelling corrector over the inventory vocabulary
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from spelling import SpellingCorrector
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class InventoryIndex:
+    """
+    Immutable lookup index over a list of inventory item dicts.
+
+    Substring filters use trigram postings to find candidates and then
+    verify the exact substring on that (small) candidate set, so results
+    match a full linear scan exactly. Results keep inventory order.
+    """
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items = items
+        self.by_id: Dict[str, int] = {}
+        self._text_grams: Dict[str, Set[int]] = defaultdict(set)
+        self._colour_grams: Dict[str, Set[int]] = defaultdict(set)
+        self._category: Dict[str, Set[int]] = defaultdict(set)
+        self._gender: Dict[str, Set[int]] = defaultdict(set)
+        self._size: Dict[str, Set[int]] = defaultdict(set)
+        self._names: List[str] = []
+        self._descriptions: List[str] = []
+        self._colours: List[List[str]] = []
+
+        for pos, item in enumerate(items):
+            name = item.get('name', '').lower()
+            description = item.get('description', '').lower()
+            colours = [colour.lower() for colour in item.get('colors', [])]
+
+            self.by_id[item['id']] = pos
+            self._names.append(name)
+            self._descriptions.append(description)
+            self._colours.append(colours)
+
+            for gram in _trigrams(name) | _trigrams(description):
+                self._text_grams[gram].add(pos)
+            for colour in colours:
+                for gram in _trigrams(colour):
+                    self._colour_grams[gram].add(pos)
+
+            self._category[item.get('category')].add(pos)
+            self._gender[item.get('gender')].add(pos)
+            for size in item.get('sizes', []):
+                self._size[size].add(pos)
+
+        self.speller = SpellingCorrector.from_texts(
+            text
+            for item in items
+            for text in [item.get('name'), item.get('description'), item.get('category'), item.get('style')]
+            + list(item.get('colors', []))
+        )
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """O(1) lookup by item id"""
+        pos = self.by_id.get(item_id)
+        return self.items[pos] if pos is not None else None
+
+    @staticmethod
+    def _substring_candidates(postings: Dict[str, Set[int]], needle: str) -> Optional[Set[int]]:
+        """Positions that contain every trigram of needle (None = no constraint)"""
+        grams = _trigrams(needle)
+        if not grams:
+            return None
+        sets = sorted((postings.get(gram, set()) for gram in grams), key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+            if not result:
+                break
+        return result
+
+    def search(
+        self,
+        item_name: str,
+        category: Optional[str] = None,
+        color: Optional[str] = None,
+        size: Optional[str] = None,
+        gender: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Items whose name or description contains item_name, filtered by
+        category, gender (including unisex), colour substring and exact size.
+        """
+        name_query = item_name.lower()
+        color_query = color.lower() if color else None
+
+        constraints: List[Iterable[int]] = []
+        if category:
+            constraints.append(self._category.get(category, set()))
+        if gender:
+            constraints.append(self._gender.get(gender, set()) | self._gender.get('unisex', set()))
+        if size:
+            constraints.append(self._size.get(size, set()))
+        text_candidates = self._substring_candidates(self._text_grams, name_query)
+        if text_candidates is not None:
+            constraints.append(text_candidates)
+        if color_query:
+            colour_candidates = self._substring_candidates(self._colour_grams, color_query)
+            if colour_candidates is not None:
+                constraints.append(colour_candidates)
+
+        if constraints:
+            constraints.sort(key=len)
+            candidates = set(constraints[0])
+            for other in constraints[1:]:
+                candidates &= set(other)
+                if not candidates:
+                    return []
+        else:
+            candidates = range(len(self.items))
+
+        # Verify exact substring semantics on the narrowed candidate set
+        matches = []
+        for pos in sorted(candidates):
+            if name_query not in self._names[pos] and name_query not in self._descriptions[pos]:
+                continue
+            if color_query and not any(color_query in colour for colour in self._colours[pos]):
+                continue
+            matches.append(self.items[pos])
+        return matches
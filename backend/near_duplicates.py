@@ -0,0 +1,139 @@
+"""
+RetailNext Smart Stylist - Near-Duplicate Product Grouping
+Clusters SKUs that differ only in size or minor colour naming at index build
+time, so search can collapse them to one result per group. Only items of the
+same brand and colour family are compared, and every member must match its
+group's representative, so similar-looking products never chain together
+"""
+
+import os
+import re
+import logging
+from typing import Dict, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_MIN_COSINE = float(os.getenv("DEDUP_MIN_COSINE", "0.95"))
+DEDUP_MIN_JACCARD = float(os.getenv("DEDUP_MIN_JACCARD", "0.75"))
+
+# Rows per similarity chunk, bounding memory to CHUNK_ROWS x block size
+CHUNK_ROWS = 1024
+
+# Only rows sharing these attributes, their brand and colour family can be
+# duplicates of each other
+BLOCK_COLUMNS = ["articleType", "gender"]
+
+# Colour names folded into one family ("Navy Blue" and "Blue" are the same
+# product line); anything else is its own family by its last word
+COLOUR_FAMILIES = {
+    "navy blue": "blue", "turquoise blue": "blue", "teal": "blue",
+    "grey melange": "grey", "charcoal": "grey",
+    "off white": "white", "cream": "white",
+    "tan": "beige", "khaki": "beige",
+    "maroon": "red", "rust": "red",
+    "sea green": "green", "olive": "green",
+    "peach": "orange", "mustard": "yellow",
+    "lavender": "purple", "magenta": "purple",
+    "bronze": "gold",
+}
+
+SHINGLE_SIZE = 3
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# ============================================================================
+# GROUPING
+# ============================================================================
+
+def colour_family(colour: str) -> str:
+    colour = " ".join(_NON_WORD.sub(" ", str(colour).lower()).split())
+    return COLOUR_FAMILIES.get(colour, colour.rsplit(" ", 1)[-1])
+
+
+def product_brand(name: str) -> str:
+    """The brand is the first word of the display name ("Mr.Men ..." -> "mr")"""
+    words = _NON_WORD.sub(" ", str(name).lower()).split()
+    return words[0] if words else ""
+
+
+def block_keys(df: pd.DataFrame) -> pd.Series:
+    """Block key per row: BLOCK_COLUMNS plus brand and colour family"""
+    columns = df[BLOCK_COLUMNS].fillna('').astype(str)
+    columns["brand"] = df['productDisplayName'].map(product_brand)
+    columns["colourFamily"] = df['baseColour'].fillna('').map(colour_family)
+    return columns.agg('|'.join, axis=1)
+
+
+def name_shingles(name: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Character shingles of a normalized product name"""
+    text = _NON_WORD.sub(" ", str(name).lower()).strip()
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def group_near_duplicates(
+    df: pd.DataFrame,
+    normalized_embeddings: np.ndarray,
+    min_cosine: float = DEDUP_MIN_COSINE,
+    min_jaccard: float = DEDUP_MIN_JACCARD
+) -> np.ndarray:
+    """
+    Assign a group id per row. Within a block_keys block, rows are taken in
+    position order: a row not yet grouped leads a new group, and later rows
+    join it when their embedding cosine to the leader is at least
+    min_cosine and their name shingles overlap the leader's by at least
+    min_jaccard. Matching only the leader keeps A~B, B~C from pulling A and
+    C together. A group id is its leader's row position (the lowest).
+    """
+    groups = np.arange(len(df))
+    shingles: Dict[int, Set[str]] = {}
+    linked = 0
+
+    for block in pd.Series(np.arange(len(df))).groupby(block_keys(df).to_numpy()).agg(list):
+        if len(block) < 2:
+            continue
+        block = np.asarray(block)
+        vectors = normalized_embeddings[block]
+
+        for start in range(0, len(block), CHUNK_ROWS):
+            similarities = vectors[start:start + CHUNK_ROWS] @ vectors.T
+            # Pairs come out ordered by their first row, so every leader is
+            # settled before any later row could join it
+            left, right = np.nonzero(similarities >= min_cosine)
+            keep = right > left + start  # Each unordered pair once
+            for i, j in zip(block[left[keep] + start], block[right[keep]]):
+                if groups[i] != i or groups[j] != j:
+                    continue  # i already follows a leader, or j already joined one
+                for row in (i, j):
+                    if row not in shingles:
+                        shingles[row] = name_shingles(df['productDisplayName'].iat[row])
+                if jaccard(shingles[i], shingles[j]) >= min_jaccard:
+                    groups[j] = i
+                    linked += 1
+
+    logger.info(f"Near-duplicate grouping: {len(df)} items in {len(np.unique(groups))} groups ({linked} links)")
+    return groups
+
+
+def collapse_groups(rows: np.ndarray, scores: np.ndarray, groups: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep the best-ranked row of each group, preserving rank order"""
+    if len(rows) == 0:
+        return rows, scores
+    _, first = np.unique(groups[rows], return_index=True)
+    first.sort()
+    return rows[first], scores[first]
@@ -0,0 +1,84 @@
+"""
+RetailNext Smart Stylist - Cursor Pagination
+Resolved result sets (filtered rows, ranked search hits) are cached by a
+fingerprint of the query, and opaque cursors carry that fingerprint plus an
+offset, so every further page is a slice instead of a re-scan
+"""
+
+import os
+import json
+import base64
+import hashlib
+import binascii
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from caching import TTLCache
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", "300"))
+
+# ============================================================================
+# CURSORS
+# ============================================================================
+
+def query_fingerprint(kind: str, params: Dict[str, Any]) -> str:
+    """Stable fingerprint of a query's parameters"""
+    payload = json.dumps({"kind": kind, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(fingerprint: str, offset: int) -> str:
+    """Opaque cursor pointing at offset within a fingerprinted result set"""
+    return base64.urlsafe_b64encode(f"{fingerprint}:{offset}".encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> int:
+    """
+    Return the offset a cursor points at. Rejects malformed cursors and
+    cursors issued for a different query with 400.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        cursor_fingerprint, offset = raw.rsplit(":", 1)
+        offset = int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if cursor_fingerprint != fingerprint or offset < 0:
+        raise HTTPException(status_code=400, detail="Cursor does not match this query")
+    return offset
+
+
+def next_cursor(fingerprint: str, offset: int, page_size: int, total: int) -> Optional[str]:
+    """Cursor for the page after [offset, offset + page_size), or None at the end"""
+    end = offset + page_size
+    return encode_cursor(fingerprint, end) if page_size > 0 and end < total else None
+
+
+# ============================================================================
+# RESULT SET CACHE
+# ============================================================================
+
+class ResultSetCache:
+    """Short-lived cache of resolved result sets keyed by query fingerprint"""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES, ttl_seconds: int = RESULT_CACHE_TTL_SECONDS):
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def get_or_compute(self, fingerprint: str, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return (result set, cache hit) - computing and storing it on a miss"""
+        result = self._cache.get(fingerprint)
+        if result is not None:
+            return result, True
+        result = compute()
+        self._cache.set(fingerprint, result)
+        return result, False
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
@@ -0,0 +1,134 @@
+"""
+RetailNext Smart Stylist - Event Context Ranking Signals
+Maps a parsed event context onto catalog attributes (season, baseColour,
+price band, usage) as a hard row mask plus additive score boosts, applied in
+the same vectorized pass that scores the query embedding
+"""
+
+import logging
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from catalog_index import CatalogIndex
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SEASON_BOOST = 0.04
+COLOR_BOOST = 0.08
+USAGE_BOOST = 0.05
+PRICE_BOOST = 0.04
+VENUE_BOOST = 0.02
+
+# EVENT_CONTEXT_SCHEMA season -> catalog season
+SEASON_MAP = {"spring": "Spring", "summer": "Summer", "autumn": "Fall", "winter": "Winter"}
+
+# Colour words customers use -> catalog baseColour values (others match by substring)
+COLOR_SYNONYMS = {
+    "navy": ["Navy Blue"],
+    "gray": ["Grey", "Grey Melange", "Charcoal"],
+    "grey": ["Grey", "Grey Melange", "Charcoal"],
+    "emerald": ["Green", "Sea Green", "Teal"],
+    "burgundy": ["Maroon"],
+    "wine": ["Maroon"],
+    "neutral": ["Beige", "Cream", "Off White", "White", "Grey", "Tan", "Khaki", "Brown"],
+    "pastel": ["Lavender", "Peach", "Pink", "Sea Green", "Cream"],
+    "gold": ["Gold", "Mustard", "Bronze"],
+}
+
+# Formality level -> catalog usage values that suit it
+FORMALITY_USAGE = {
+    "black-tie": ["Formal"],
+    "formal": ["Formal"],
+    "semi-formal": ["Formal", "Smart Casual", "Ethnic"],
+    "business-casual": ["Formal", "Smart Casual"],
+    "smart-casual": ["Smart Casual", "Casual"],
+    "casual": ["Casual"],
+    "very-casual": ["Casual", "Sports"],
+}
+
+# Budget preference -> (hard price ceiling, price bands to boost)
+BUDGET_PRICE = {
+    "budget-friendly": (100, ["Under $50", "$50-$100"]),
+    "moderate": (200, ["$50-$100", "$100-$200"]),
+    "premium": (None, ["$100-$200", "$200+"]),
+    "luxury": (None, ["$200+"]),
+}
+
+# Relaxed outdoor settings favour practical, casual pieces
+OUTDOOR_CASUAL_USAGE = ["Casual", "Sports"]
+OUTDOOR_CASUAL_FORMALITY = {"very-casual", "casual", "smart-casual"}
+
+# ============================================================================
+# SIGNALS
+# ============================================================================
+
+def _catalog_colors(preferences: List[str]) -> Tuple[List[str], List[str]]:
+    """Split colour preferences into exact catalog values and substring needles"""
+    exact, needles = [], []
+    for preference in preferences:
+        key = preference.lower().strip()
+        if key in COLOR_SYNONYMS:
+            exact.extend(COLOR_SYNONYMS[key])
+        elif key:
+            needles.append(key)
+    return exact, needles
+
+
+def event_context_signals(
+    index: CatalogIndex,
+    event_context: Dict[str, Any],
+    min_rows: int = 1
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    Build (row_mask, score_boost, applied) for an event context.
+
+    Budget ceilings are hard masks; season, colour, usage and price band are
+    soft boosts. If the hard mask would leave fewer than min_rows rows it is
+    relaxed, so a strict budget never produces an empty recommendation.
+    """
+    mask = np.ones(index.size, dtype=bool)
+    boost = np.zeros(index.size, dtype=np.float32)
+    applied: Dict[str, Any] = {}
+
+    season = SEASON_MAP.get(str(event_context.get("season", "")).lower())
+    if season:
+        boost += SEASON_BOOST * index.value_mask("season", [season])
+        applied["season"] = season
+
+    exact_colors, color_needles = _catalog_colors(event_context.get("color_preferences") or [])
+    if exact_colors or color_needles:
+        color_mask = index.value_mask("color", exact_colors) | index.value_mask("color", color_needles, substring=True)
+        boost += COLOR_BOOST * color_mask
+        applied["colors"] = sorted(
+            value for value in index.values.get("color", []) if index.bitmaps["color"][value][color_mask].any()
+        )
+
+    formality = str(event_context.get("formality_level", "")).lower()
+    usages = FORMALITY_USAGE.get(formality)
+    if usages:
+        boost += USAGE_BOOST * index.value_mask("usage", usages)
+        applied["usage"] = usages
+
+    if str(event_context.get("venue_type", "")).lower() == "outdoor" and formality in OUTDOOR_CASUAL_FORMALITY:
+        boost += VENUE_BOOST * index.value_mask("usage", OUTDOOR_CASUAL_USAGE)
+        applied["venue_usage"] = OUTDOOR_CASUAL_USAGE
+
+    budget = BUDGET_PRICE.get(str(event_context.get("budget_preference", "")).lower())
+    if budget:
+        ceiling, bands = budget
+        boost += PRICE_BOOST * index.value_mask("price_band", bands)
+        applied["price_bands"] = bands
+        if ceiling is not None and index.prices is not None:
+            budget_mask = index.prices <= ceiling
+            if int(budget_mask.sum()) >= min_rows:
+                mask &= budget_mask
+                applied["max_price"] = ceiling
+            else:
+                applied["max_price_relaxed"] = ceiling
+
+    return mask, boost, applied
@@ -0,0 +1,168 @@
+"""
+RetailNext Smart Stylist - Semantic Response Cache
+Two-tier cache for LLM structured outputs: an exact tier keyed by normalized
+text, and a semantic tier that reuses a cached result when a new request's
+embedding is close enough to one already answered
+"""
+
+import re
+import time
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from caching import TTLCache
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+_NON_WORD = re.compile(r"[^a-z0-9$]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+class SemanticCache:
+    """
+    Exact + semantic two-tier cache.
+
+    The semantic tier keeps unit-normalized embeddings in one preallocated
+    matrix, so a lookup is a single matrix-vector product. An entry only
+    matches when its cosine distance is within max_distance and its guard
+    (e.g. gender/colour words mentioned) equals the request's. Both tiers
+    are bounded, expire after ttl_seconds and evict least-recently-used.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], List[float]],
+        max_entries: int = 512,
+        ttl_seconds: Optional[float] = 3600,
+        max_distance: float = 0.12
+    ):
+        self.embed = embed
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self.exact = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._valid = np.zeros(max_entries, dtype=bool)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._created = np.zeros(max_entries, dtype=np.float64)
+        self._values: List[Any] = [None] * max_entries
+        self._guards: List[Hashable] = [None] * max_entries
+
+        self.semantic_hits = 0
+        self.semantic_misses = 0
+        self.semantic_evictions = 0
+
+    def _unit(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embed(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get_exact(self, text: str, guard: Hashable = None) -> Any:
+        """Exact-tier lookup on normalized text (no embedding needed)"""
+        return self.exact.get((normalize_text(text), guard))
+
+    def get_semantic(self, text: str, guard: Hashable = None) -> Tuple[Any, np.ndarray]:
+        """
+        Semantic-tier lookup. Returns (value or None, request embedding);
+        pass the embedding to set() to avoid embedding the text twice.
+        """
+        embedding = self._unit(text)
+        now = time.monotonic()
+        with self._lock:
+            if self._matrix is None or not self._valid.any():
+                self.semantic_misses += 1
+                return None, embedding
+
+            live = self._valid.copy()
+            if self.ttl_seconds is not None:
+                live &= self._created >= now - self.ttl_seconds
+            live &= np.array([stored == guard for stored in self._guards], dtype=bool)
+
+            candidates = np.flatnonzero(live)
+            if candidates.size:
+                similarities = self._matrix[candidates] @ embedding
+                best = int(np.argmax(similarities))
+                if 1.0 - float(similarities[best]) <= self.max_distance:
+                    slot = int(candidates[best])
+                    self._last_used[slot] = now
+                    self.semantic_hits += 1
+                    value = self._values[slot]
+                    self.exact.set((normalize_text(text), guard), value)  # Repeat phrasings become exact hits
+                    return value, embedding
+
+            self.semantic_misses += 1
+            return None, embedding
+
+    def get(self, text: str, guard: Hashable = None) -> Tuple[Any, Optional[str], Optional[np.ndarray]]:
+        """
+        Look a request up in both tiers.
+        Returns (value, tier, embedding): tier is "exact", "semantic" or None,
+        and embedding is the request's embedding when one was computed.
+        """
+        value = self.get_exact(text, guard)
+        if value is not None:
+            return value, "exact", None
+        value, embedding = self.get_semantic(text, guard)
+        return value, ("semantic" if value is not None else None), embedding
+
+    def set(self, text: str, value: Any, guard: Hashable = None, embedding: Optional[np.ndarray] = None) -> None:
+        """Store a result in both tiers"""
+        self.exact.set((normalize_text(text), guard), value)
+        if embedding is None:
+            embedding = self._unit(text)
+
+        now = time.monotonic()
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, embedding.shape[0]), dtype=np.float32)
+
+            # Reuse an expired slot, then a free one, then evict the least recently used
+            expired = self._valid & (self._created < now - self.ttl_seconds) if self.ttl_seconds is not None else None
+            if expired is not None and expired.any():
+                slot = int(np.argmax(expired))
+            elif not self._valid.all():
+                slot = int(np.argmin(self._valid))
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.semantic_evictions += 1
+
+            self._matrix[slot] = embedding
+            self._valid[slot] = True
+            self._created[slot] = now
+            self._last_used[slot] = now
+            self._values[slot] = value
+            self._guards[slot] = guard
+
+    def clear(self) -> None:
+        self.exact.clear()
+        with self._lock:
+            self._valid[:] = False
+            self._values = [None] * self.max_entries
+            self._guards = [None] * self.max_entries
+
+    def stats(self) -> Dict[str, Any]:
+        exact = self.exact.stats()
+        semantic_lookups = self.semantic_hits + self.semantic_misses
+        total_lookups = exact["hits"] + exact["misses"]
+        return {
+            "exact": exact,
+            "semantic": {
+                "entries": int(self._valid.sum()),
+                "hits": self.semantic_hits,
+                "misses": self.semantic_misses,
+                "evictions": self.semantic_evictions,
+                "hit_ratio": round(self.semantic_hits / semantic_lookups, 4) if semantic_lookups else 0.0,
+                "max_distance": self.max_distance
+            },
+            "overall_hit_ratio": round((exact["hits"] + self.semantic_hits) / total_lookups, 4) if total_lookups else 0.0
+        }
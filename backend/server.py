@@ -5,31 +5,65 @@ Based on OpenAI Cookbook approach
 """
 
 import os
+import re
 import base64
 import json
 import logging
-from typing import Optional, List
+import time
+import threading
+from typing import Any, Optional, List, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 
 # Import our RAG implementation
 from clothing_rag import (
     initialize_rag_system,
     search_by_description,
+    rank_by_description,
+    catalog_items,
+    normalized_embeddings,
+    availability_mask,
+    store_overlay_stats,
     get_matching_items,
     create_outfit_bundle,
-    analyze_clothing_image
+    catalog_snapshot,
+    cascade_recall,
+    analyze_clothing_image,
+    SEARCH_CASCADE_ENABLED
+)
+from image_store import save_image, get_image, image_store_stats
+from tts_cache import get_speech_cache
+from catalog_index import CatalogIndex
+from catalog_clusters import CatalogClusters
+from suggest_index import PrefixIndex
+from spelling import SpellingCorrector
+from ranking_signals import event_context_signals
+from caching import TTLCache
+from semantic_cache import normalize_text
+from pagination import ResultSetCache, query_fingerprint, decode_cursor, next_cursor
+from speech_stream import start_speech_job, get_speech_job, split_sentences
+from uploads import (
+    read_upload_limited,
+    decode_base64_limited,
+    MAX_IMAGE_UPLOAD_BYTES,
+    MAX_AUDIO_UPLOAD_BYTES,
+    MAX_IMAGE_BASE64_CHARS
 )
 
 # Import original backend for TTS/STT
 from backend import (
     transcribe_audio_bytes,
     text_to_speech_bytes,
-    parse_event_context,
+    prewarm_speech_cache,
+    parse_event_context_with_meta,
+    event_cache_stats,
     get_client,
     GPT_MODEL,
     TRANSCRIPTION_MODEL,
@@ -42,10 +76,59 @@ from backend import (
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# ============================================================================
+# STYLIST SPEECH FRAGMENTS
+# ============================================================================
+
+# Chat speech is assembled from these fragments so the fixed ones are
+# synthesized once and served from the TTS cache on every later response
+SPEECH_GREETING = "G'day!"
+SPEECH_SIMILAR_ACTION = "Here are some similar items from our collection."
+SPEECH_COMPLEMENTARY_ACTION = "Let me find you some items that would pair perfectly with it."
+SPEECH_CLOSING = "Check out the recommendations panel for prices and store locations."
+FORMALITY_LEVELS = ["very-casual", "casual", "smart-casual", "business-casual", "semi-formal", "formal", "black-tie"]
+
+
+def formality_speech(formality: str) -> str:
+    return f"Let me find you some brilliant {formality} options."
+
+
+def item_count_speech(count: int) -> str:
+    return f"I've found {count} great items that would be perfect."
+
+
+def fixed_speech_fragments() -> List[str]:
+    """Every speech fragment that doesn't depend on the customer's request"""
+    return (
+        [SPEECH_GREETING, SPEECH_SIMILAR_ACTION, SPEECH_COMPLEMENTARY_ACTION, SPEECH_CLOSING]
+        + [formality_speech(level) for level in FORMALITY_LEVELS]
+        + [item_count_speech(count) for count in range(1, 9)]
+    )
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+# Keywords indicating user wants SIMILAR items (same type)
+SIMILAR_INTENT_KEYWORDS = [
+    "similar", "like this", "like that", "same", "matching",
+    "alternatives", "other options", "more like", "this style",
+    "do you have", "any other", "different color", "different colours",
+    "show me more", "similar to"
+]
+
+# Keywords indicating user wants COMPLEMENTARY items (go with it)
+COMPLEMENTARY_INTENT_KEYWORDS = [
+    "goes with", "go with", "pair with", "match with", "wear with",
+    "complement", "complete the look", "outfit", "what to wear",
+    "accessories for", "style with"
+]
+
+# One compiled alternation per intent instead of a keyword-by-keyword scan
+SIMILAR_INTENT_PATTERN = re.compile("|".join(map(re.escape, SIMILAR_INTENT_KEYWORDS)), re.IGNORECASE)
+COMPLEMENTARY_INTENT_PATTERN = re.compile("|".join(map(re.escape, COMPLEMENTARY_INTENT_KEYWORDS)), re.IGNORECASE)
+
+
 def detect_search_intent(message: str) -> str:
     """
     Detect whether user wants similar items or complementary items.
@@ -57,39 +140,38 @@ def detect_search_intent(message: str) -> str:
     if not message:
         return "complementary"  # Default when no message provided
 
-    message_lower = message.lower()
-
-    # Keywords indicating user wants SIMILAR items (same type)
-    similar_keywords = [
-        "similar", "like this", "like that", "same", "matching",
-        "alternatives", "other options", "more like", "this style",
-        "do you have", "any other", "different color", "different colours",
-        "show me more", "similar to"
-    ]
-
-    # Keywords indicating user wants COMPLEMENTARY items (go with it)
-    complementary_keywords = [
-        "goes with", "go with", "pair with", "match with", "wear with",
-        "complement", "complete the look", "outfit", "what to wear",
-        "accessories for", "style with"
-    ]
-
     # Check for similar intent first (more specific ask)
-    for keyword in similar_keywords:
-        if keyword in message_lower:
-            logger.info(f"Detected 'similar' intent from keyword: '{keyword}'")
-            return "similar"
+    match = SIMILAR_INTENT_PATTERN.search(message)
+    if match:
+        logger.info(f"Detected 'similar' intent from keyword: '{match.group(0).lower()}'")
+        return "similar"
 
     # Check for complementary intent
-    for keyword in complementary_keywords:
-        if keyword in message_lower:
-            logger.info(f"Detected 'complementary' intent from keyword: '{keyword}'")
-            return "complementary"
+    match = COMPLEMENTARY_INTENT_PATTERN.search(message)
+    if match:
+        logger.info(f"Detected 'complementary' intent from keyword: '{match.group(0).lower()}'")
+        return "complementary"
 
     # Default: if they're asking about a specific item type they uploaded, they likely want similar
     # e.g., "Do you have any mens shirts" when uploading a shirt
     return "similar"
 
+
+def resolve_image_analysis(image_id: str) -> dict:
+    """
+    Return the stored analysis for an uploaded image, analyzing it on first use.
+
+    Raises 404 if the image_id is unknown or has expired from the store.
+    """
+    stored = get_image(image_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired image_id: {image_id}")
+
+    if stored.analysis is None:
+        stored.analysis = analyze_clothing_image(image_bytes=stored.data)
+
+    return stored.analysis
+
 # ============================================================================
 # INITIALIZE RAG SYSTEM
 # ============================================================================
@@ -98,6 +180,62 @@ logger.info("Initializing clothing RAG system...")
 STYLES_DF, EMBEDDINGS = initialize_rag_system()
 logger.info(f"Loaded {len(STYLES_DF) if STYLES_DF is not None else 0} clothing items")
 
+# Catalog-derived indexes; all None when the dataset failed to load (endpoints answer 503)
+CATALOG_INDEX = None
+SUGGEST_INDEX = None
+SPELLING = None
+CATALOG_CLUSTERS = None
+EXPLORE_COLLECTIONS = None
+CASCADE_RECALL = None
+
+if STYLES_DF is not None:
+    CATALOG_INDEX = CatalogIndex(STYLES_DF)
+    SUGGEST_INDEX = PrefixIndex.from_catalog(STYLES_DF)
+    SPELLING = SpellingCorrector.from_texts(
+        text
+        for column in ["productDisplayName", "articleType", "baseColour", "subCategory", "masterCategory", "usage", "season"]
+        for text in STYLES_DF[column]
+    )
+
+    # Explore collections: k-means clusters with representative items, built once
+    CATALOG_CLUSTERS = CatalogClusters.build(STYLES_DF, normalized_embeddings(EMBEDDINGS))
+    EXPLORE_COLLECTIONS = [
+        {
+            "cluster_id": cluster["cluster_id"],
+            "label": cluster["label"],
+            "size": cluster["size"],
+            "top_article_types": cluster["top_article_types"],
+            "items": catalog_items(STYLES_DF, cluster["representative_rows"], cluster["representative_scores"])
+        }
+        for cluster in CATALOG_CLUSTERS.clusters
+    ]
+
+    # Cascade search trades exactness for bandwidth; measure what it costs in
+    # recall on the collection labels, which span the catalog
+    if SEARCH_CASCADE_ENABLED:
+        CASCADE_RECALL = cascade_recall([cluster["label"] for cluster in CATALOG_CLUSTERS.clusters], STYLES_DF, EMBEDDINGS)
+        logger.info(
+            f"Search cascade: recall@{CASCADE_RECALL['k']} {CASCADE_RECALL['recall_at_k']} over {CASCADE_RECALL['queries']} queries, "
+            f"{CASCADE_RECALL['bandwidth_reduction']}x less data read per query"
+        )
+
+
+def require_catalog(index: Any) -> Any:
+    """Return a catalog-derived index, or fail with 503 when the catalog isn't loaded"""
+    if index is None:
+        raise HTTPException(status_code=503, detail="Clothing catalog is not loaded")
+    return index
+
+# Resolved inventory filters and ranked search hits, reused across pages
+INVENTORY_RESULTS = ResultSetCache()
+SEARCH_RESULTS = ResultSetCache()
+
+# Outfit bundles by normalized request, valid for the catalog snapshot they were built from
+OUTFIT_CACHE_MAX_ENTRIES = int(os.getenv("OUTFIT_CACHE_MAX_ENTRIES", "512"))
+OUTFIT_CACHE_TTL_SECONDS = int(os.getenv("OUTFIT_CACHE_TTL_SECONDS", "900"))
+OUTFIT_BUNDLES = TTLCache(max_entries=OUTFIT_CACHE_MAX_ENTRIES, ttl_seconds=OUTFIT_CACHE_TTL_SECONDS)
+_outfit_snapshot = None
+
 # ============================================================================
 # FASTAPI APP
 # ============================================================================
@@ -124,13 +262,20 @@ app.add_middleware(
 class ChatRequest(BaseModel):
     message: str = Field(..., description="User's message")
     conversation_history: Optional[List[dict]] = Field(default=[], description="Chat history")
-    image_base64: Optional[str] = Field(default=None, description="Base64 image")
+    image_base64: Optional[str] = Field(default=None, max_length=MAX_IMAGE_BASE64_CHARS, description="Base64 image")
+    image_id: Optional[str] = Field(default=None, description="ID returned by /api/upload-image")
     return_audio: bool = Field(default=False, description="Return audio response")
+    diversity: float = Field(default=0.0, ge=0.0, le=1.0, description="MMR diversity weight for recommended items")
+    store_id: Optional[str] = Field(default=None, max_length=64, description="Recommend only items in stock at this store")
 
 class SearchRequest(BaseModel):
     query: str = Field(..., description="Search query")
     gender: Optional[str] = Field(default=None, description="Gender filter")
-    top_k: int = Field(default=8, description="Number of results")
+    top_k: int = Field(default=8, description="Number of results (page size)")
+    cursor: Optional[str] = Field(default=None, description="next_cursor from a previous page")
+    diversity: float = Field(default=0.0, ge=0.0, le=1.0, description="MMR diversity weight (0 = pure relevance)")
+    collapse_duplicates: bool = Field(default=False, description="One result per near-duplicate product group")
+    store_id: Optional[str] = Field(default=None, max_length=64, description="Only items in stock at this store")
 
 class OutfitRequest(BaseModel):
     occasion: str = Field(..., description="Occasion or event")
@@ -175,6 +320,21 @@ async def health():
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/api/cache-stats")
+async def cache_stats():
+    """Hit ratios and sizes for the server's caches"""
+    speech_cache = get_speech_cache()
+    return {
+        "event_context": event_cache_stats(),
+        "inventory_results": INVENTORY_RESULTS.stats(),
+        "search_results": SEARCH_RESULTS.stats(),
+        "outfit_bundles": OUTFIT_BUNDLES.stats(),
+        "speech": speech_cache.stats() if speech_cache else None,
+        "images": image_store_stats(),
+        "store_overlays": store_overlay_stats(),
+        "search_cascade": CASCADE_RECALL
+    }
+
 # ============================================================================
 # SEARCH & DISCOVERY
 # ============================================================================
@@ -184,39 +344,98 @@ async def search_items(request: SearchRequest):
     """
     Search clothing items using semantic RAG search
     """
+    spelling = require_catalog(SPELLING)
     try:
-        results = search_by_description(
-            description=request.query,
-            gender=request.gender,
-            top_k=request.top_k
+        # Fix confident typos against the catalog vocabulary before spending an embedding
+        # call; weaker suggestions are only offered back as "did you mean"
+        query, corrections = spelling.correct(request.query)
+        applied = any(correction["applied"] for correction in corrections)
+        suggested = any(not correction["applied"] for correction in corrections)
+
+        fingerprint = query_fingerprint("search", {
+            "query": query, "gender": request.gender, "diversity": request.diversity,
+            "collapse": request.collapse_duplicates, "store_id": request.store_id
+        })
+        offset = decode_cursor(request.cursor, fingerprint) if request.cursor else 0
+
+        # Rank once per query; later pages slice the cached ranking
+        (rows, scores), cached = SEARCH_RESULTS.get_or_compute(
+            fingerprint,
+            lambda: rank_by_description(
+                query, gender=request.gender, diversity=request.diversity,
+                collapse=request.collapse_duplicates, store_id=request.store_id
+            )
         )
 
+        page_size = max(request.top_k, 0)
+        end = offset + page_size
+        results = catalog_items(STYLES_DF, rows[offset:end], scores[offset:end], store_id=request.store_id)
+
         return {
             "query": request.query,
+            "corrected_query": query if applied else None,
+            "did_you_mean": spelling.did_you_mean(request.query) if suggested else None,
+            "corrections": corrections,
             "results": results,
-            "count": len(results)
+            "count": len(results),
+            "total": len(rows),
+            "next_cursor": next_cursor(fingerprint, offset, page_size, len(rows)),
+            "cached": cached
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Search error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def outfit_cache_key(request: OutfitRequest) -> tuple:
+    """
+    Normalize an outfit request so equivalent phrasings share a cache entry.
+    The bundle is built from these normalized fields, so the key covers
+    everything the search sees.
+    """
+    colors = normalize_text(request.color_preference or "").replace(" and ", " ").split()
+    return (
+        normalize_text(request.occasion),
+        request.gender.strip().lower(),
+        request.formality.strip().lower(),
+        " ".join(sorted(set(colors))),
+        request.max_items
+    )
+
+
 @app.post("/api/outfit-bundle")
 async def generate_outfit(request: OutfitRequest):
     """
     Generate complete outfit recommendation
     """
+    require_catalog(STYLES_DF)
     try:
+        # A new catalog snapshot invalidates every cached bundle
+        global _outfit_snapshot
+        snapshot = catalog_snapshot()
+        if snapshot != _outfit_snapshot:
+            OUTFIT_BUNDLES.clear()
+            _outfit_snapshot = snapshot
+
+        key = outfit_cache_key(request)
+        cached = OUTFIT_BUNDLES.get(key)
+        if cached is not None:
+            return cached
+
+        occasion, gender, formality, colors, max_items = key
         outfit = create_outfit_bundle(
-            occasion=request.occasion,
-            gender=request.gender,
+            occasion=occasion,
+            gender=gender,
             df=STYLES_DF,
             embeddings=EMBEDDINGS,
-            formality=request.formality,
-            color_preference=request.color_preference,
-            max_items=request.max_items
+            formality=formality,
+            color_preference=colors or None,
+            max_items=max_items
         )
 
+        OUTFIT_BUNDLES.set(key, outfit)
         return outfit
 
     except Exception as e:
@@ -227,22 +446,49 @@ async def generate_outfit(request: OutfitRequest):
 # VISION & IMAGE ANALYSIS
 # ============================================================================
 
+@app.post("/api/upload-image")
+async def upload_image(image: UploadFile = File(...)):
+    """
+    Store an uploaded clothing image and analyze it once.
+    Returns an image_id that chat and analyze requests can reference.
+    """
+    try:
+        image_bytes = await read_upload_limited(image, MAX_IMAGE_UPLOAD_BYTES, kind="Image")
+        analysis = analyze_clothing_image(image_bytes=image_bytes)
+        stored = save_image(image_bytes, content_type=image.content_type, analysis=analysis)
+
+        return {
+            "image_id": stored.image_id,
+            "analysis": analysis,
+            "size_bytes": len(image_bytes)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Image upload error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/analyze-image")
 async def analyze_image(
     image: UploadFile = File(...),
-    gender: str = Form("Women")
+    gender: str = Form("Women"),
+    diversity: float = Form(0.0, ge=0.0, le=1.0),
+    store_id: Optional[str] = Form(None, max_length=64)
 ):
     """
     Analyze uploaded clothing image and find matching items
     """
+    require_catalog(STYLES_DF)
     try:
-        image_bytes = await image.read()
-        image_base64 = base64.b64encode(image_bytes).decode('utf-8')
+        image_bytes = await read_upload_limited(image, MAX_IMAGE_UPLOAD_BYTES, kind="Image")
 
         result = get_matching_items(
-            image_base64=image_base64,
             gender=gender,
-            top_k=8
+            top_k=8,
+            analysis=analyze_clothing_image(image_bytes=image_bytes),
+            diversity=diversity,
+            store_id=store_id
         )
 
         return {
@@ -251,23 +497,40 @@ async def analyze_image(
             "count": len(result["matching_items"])
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Image analysis error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/analyze-image-base64")
 async def analyze_image_base64(
-    image_base64: str = Form(...),
-    gender: str = Form("Women")
+    image_base64: Optional[str] = Form(None, max_length=MAX_IMAGE_BASE64_CHARS),
+    image_id: Optional[str] = Form(None),
+    gender: str = Form("Women"),
+    diversity: float = Form(0.0, ge=0.0, le=1.0),
+    store_id: Optional[str] = Form(None, max_length=64)
 ):
     """
-    Analyze base64 image and find matching items
+    Analyze base64 image (or a previously uploaded image_id) and find matching items
     """
+    if not image_base64 and not image_id:
+        raise HTTPException(status_code=422, detail="Provide image_base64 or image_id")
+    require_catalog(STYLES_DF)
+
     try:
+        if image_id:
+            analysis = resolve_image_analysis(image_id)
+        else:
+            image_bytes = decode_base64_limited(image_base64, MAX_IMAGE_UPLOAD_BYTES)
+            analysis = analyze_clothing_image(image_bytes=image_bytes)
+
         result = get_matching_items(
-            image_base64=image_base64,
             gender=gender,
-            top_k=8
+            top_k=8,
+            analysis=analysis,
+            diversity=diversity,
+            store_id=store_id
         )
 
         return {
@@ -276,6 +539,8 @@ async def analyze_image_base64(
             "count": len(result["matching_items"])
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Image analysis error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -284,129 +549,250 @@ async def analyze_image_base64(
 # CHAT (ORCHESTRATION)
 # ============================================================================
 
-@app.post("/api/chat")
-async def chat(request: ChatRequest):
+def compose_chat_response(result: dict) -> Tuple[str, List[str]]:
     """
-    Main chat endpoint - orchestrates all AI capabilities
+    Build the chat text response and its speech fragments from the stage results.
+    Speech omits the item list for cleaner audio.
     """
-    try:
-        result = {
-            "text_response": "",
-            "audio_response_base64": None,
-            "event_context": None,
-            "image_analysis": None,
-            "recommended_items": [],
-            "apis_used": [],
-            "search_mode": None
-        }
-
-        # Parse event context if present
-        event_context = None
-        if request.message:
-            event_context = parse_event_context(request.message)
-            result["event_context"] = event_context
-            result["apis_used"].append("GPT-4o (Event Parsing)")
-
-        # Analyze image if provided
-        if request.image_base64:
-            gender = event_context.get("gender", "Women") if event_context else "Women"
-
-            # Detect user intent: do they want similar items or complementary items?
-            search_mode = detect_search_intent(request.message)
-            result["search_mode"] = search_mode
-
-            match_result = get_matching_items(
-                image_base64=request.image_base64,
-                gender=gender,
-                top_k=6,
-                search_mode=search_mode
-            )
-            result["image_analysis"] = match_result["analysis"]
-            result["recommended_items"] = match_result["matching_items"]
-            result["apis_used"].append("GPT-4o (Vision)")
-            result["apis_used"].append("text-embedding-3-large (RAG)")
-
-        # Search for items based on query
-        elif request.message and event_context:
-            query = f"{event_context.get('event_type', '')} {event_context.get('formality_level', '')} {event_context.get('gender', '')}"
-
-            items = search_by_description(
-                description=query,
-                gender=event_context.get("gender"),
-                top_k=8
+    response_parts = []
+    speech_parts = []
+    event_context = result["event_context"]
+
+    # Handle image upload response differently
+    if result["image_analysis"]:
+        analysis = result["image_analysis"]
+        article_type = analysis.get("article_type", "item")
+        base_colour = analysis.get("base_colour", "")
+        style = analysis.get("style_description", "")
+        search_mode = result.get("search_mode", "complementary")
+
+        intro = f"G'day! I can see you've uploaded a {base_colour} {article_type}. "
+        if style:
+            intro += f"Nice {style} piece! "
+
+        # Adjust message based on search mode
+        if search_mode == "similar":
+            action = "Here are some similar items from our collection."
+        else:
+            action = "Let me find you some items that would pair perfectly with it."
+
+        response_parts.append(intro + action)
+        speech_parts.append(SPEECH_GREETING)
+        speech_parts.append(f"I can see you've uploaded a {base_colour} {article_type}.")
+        if style:
+            speech_parts.append(f"Nice {style} piece!")
+        speech_parts.append(action)
+
+    elif event_context:
+        event_type = event_context.get("event_type", "")
+        formality = event_context.get("formality_level", "casual")
+        # Only mention event type if it's meaningful (not empty, unknown, or generic)
+        speech_parts.append(SPEECH_GREETING)
+        if event_type and event_type.lower() not in ["unknown", "occasion", ""]:
+            intro = f"G'day! Perfect - a {event_type}! Let me find you some brilliant {formality} options."
+            speech_parts.append(f"Perfect - a {event_type}!")
+        else:
+            intro = f"G'day! Let me find you some brilliant {formality} options."
+        speech_parts.append(formality_speech(formality))
+        response_parts.append(intro)
+
+    if result["recommended_items"]:
+        count_msg = f"\nI've found {len(result['recommended_items'])} great items that would be perfect:"
+        response_parts.append(count_msg)
+        speech_parts.append(item_count_speech(len(result['recommended_items'])))
+
+        # Add item list to text response only (not to speech)
+        for i, item in enumerate(result["recommended_items"][:5], 1):
+            response_parts.append(
+                f"\n{i}. **{item['productDisplayName']}** ({item['baseColour']} {item['articleType']})"
             )
 
-            result["recommended_items"] = items
-            result["apis_used"].append("text-embedding-3-large (RAG)")
+        closing = "\n\nCheck out the recommendations panel for prices and store locations. Would you like me to create a complete outfit from these?"
+        response_parts.append(closing)
+        speech_parts.append(SPEECH_CLOSING)
 
-        # Generate response text
-        response_parts = []
-        speech_parts = []  # Separate text for TTS (without item list)
+    text_response = "".join(response_parts) or "How can I help you find the perfect outfit today?"
+    return text_response, speech_parts
 
-        # Handle image upload response differently
-        if result["image_analysis"]:
-            analysis = result["image_analysis"]
-            article_type = analysis.get("article_type", "item")
-            base_colour = analysis.get("base_colour", "")
-            style = analysis.get("style_description", "")
-            search_mode = result.get("search_mode", "complementary")
 
-            intro = f"G'day! I can see you've uploaded a {base_colour} {article_type}. "
-            if style:
-                intro += f"Nice {style} piece! "
+def run_chat_stages(request: ChatRequest) -> Iterator[Tuple[str, dict]]:
+    """
+    Run the chat pipeline, yielding (stage, payload) as each stage completes:
+    intent, image_analysis, items, text, audio and finally done (full result;
+    the stream endpoint sends only done_summary of it).
 
-            # Adjust message based on search mode
-            if search_mode == "similar":
-                action = "Here are some similar items from our collection."
-            else:
-                action = "Let me find you some items that would pair perfectly with it."
+    Event parsing and image analysis don't depend on each other, so they run
+    concurrently and are yielded in whichever order they finish.
+    """
+    result = {
+        "text_response": "",
+        "audio_url": None,
+        "event_context": None,
+        "event_parsing": None,
+        "image_analysis": None,
+        "recommended_items": [],
+        "ranking_signals": None,
+        "apis_used": [],
+        "search_mode": None
+    }
+    has_image = bool(request.image_id or request.image_base64)
+
+    # Detect user intent: do they want similar items or complementary items?
+    if has_image:
+        result["search_mode"] = detect_search_intent(request.message)
 
-            response_parts.append(intro + action)
-            speech_parts.append(intro + action)
+    # Parse event context and analyze the image (uploaded images are analyzed once and reused)
+    event_context = None
+    stored_analysis = resolve_image_analysis(request.image_id) if request.image_id else None
+    if stored_analysis is not None:
+        result["image_analysis"] = stored_analysis
+        yield "image_analysis", {"image_analysis": stored_analysis}
 
-        elif event_context:
-            event_type = event_context.get("event_type", "")
-            formality = event_context.get("formality_level", "casual")
-            # Only mention event type if it's meaningful (not empty, unknown, or generic)
-            if event_type and event_type.lower() not in ["unknown", "occasion", ""]:
-                intro = f"G'day! Perfect - a {event_type}! Let me find you some brilliant {formality} options."
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pending = {}
+        if request.message:
+            pending[executor.submit(parse_event_context_with_meta, request.message)] = "intent"
+        if has_image and stored_analysis is None:
+            pending[executor.submit(analyze_clothing_image, request.image_base64)] = "image_analysis"
+
+        for future in as_completed(pending):
+            if pending[future] == "intent":
+                event_context, result["event_parsing"] = future.result()
+                result["event_context"] = event_context
+                yield "intent", {
+                    "event_context": event_context,
+                    "event_parsing": result["event_parsing"],
+                    "search_mode": result["search_mode"]
+                }
             else:
-                intro = f"G'day! Let me find you some brilliant {formality} options."
-            response_parts.append(intro)
-            speech_parts.append(intro)
-
-        if result["recommended_items"]:
-            count_msg = f"\nI've found {len(result['recommended_items'])} great items that would be perfect:"
-            response_parts.append(count_msg)
-            speech_parts.append(f" I've found {len(result['recommended_items'])} great items that would be perfect.")
-
-            # Add item list to text response only (not to speech)
-            for i, item in enumerate(result["recommended_items"][:5], 1):
-                response_parts.append(
-                    f"\n{i}. **{item['productDisplayName']}** ({item['baseColour']} {item['articleType']})"
-                )
-
-            closing = "\n\nCheck out the recommendations panel for prices and store locations. Would you like me to create a complete outfit from these?"
-            response_parts.append(closing)
-            speech_parts.append(" Check out the recommendations panel for prices and store locations.")
-
-        result["text_response"] = "".join(response_parts) or "How can I help you find the perfect outfit today?"
-
-        # Generate audio if requested - use speech_parts (without item list) for cleaner audio
-        if request.return_audio:
-            speech_text = "".join(speech_parts) if speech_parts else result["text_response"]
-            if speech_text:
-                audio_bytes = text_to_speech_bytes(speech_text)
-                if audio_bytes:
-                    result["audio_response_base64"] = base64.b64encode(audio_bytes).decode('utf-8')
-                    result["apis_used"].append("gpt-4o-mini-tts (Australian TTS)")
+                result["image_analysis"] = future.result()
+                yield "image_analysis", {"image_analysis": result["image_analysis"]}
+
+    if event_context is not None and result["event_parsing"]["path"] in ("llm", "demo"):
+        result["apis_used"].append("GPT-4o (Event Parsing)")
+
+    catalog_ready = STYLES_DF is not None
+
+    if has_image and stored_analysis is None:
+        result["apis_used"].append("GPT-4o (Vision)")
+
+    if has_image and catalog_ready:
+        gender = event_context.get("gender", "Women") if event_context else "Women"
+        match_result = get_matching_items(
+            gender=gender,
+            top_k=6,
+            search_mode=result["search_mode"],
+            analysis=result["image_analysis"],
+            diversity=request.diversity,
+            store_id=request.store_id
+        )
+        result["image_analysis"] = match_result["analysis"]
+        result["recommended_items"] = match_result["matching_items"]
+        result["apis_used"].append("text-embedding-3-large (RAG)")
+
+    # Search for items based on query
+    elif request.message and event_context and catalog_ready:
+        query = f"{event_context.get('event_type', '')} {event_context.get('formality_level', '')} {event_context.get('gender', '')}"
+
+        # Season, colours, budget, formality and venue become masks/boosts in the same scoring pass
+        row_mask, score_boost, result["ranking_signals"] = event_context_signals(
+            CATALOG_INDEX, event_context, min_rows=8
+        )
+        items = search_by_description(
+            description=query,
+            gender=event_context.get("gender"),
+            top_k=8,
+            row_mask=row_mask,
+            score_boost=score_boost,
+            diversity=request.diversity,
+            store_id=request.store_id
+        )
+
+        result["recommended_items"] = items
+        result["apis_used"].append("text-embedding-3-large (RAG)")
+
+    yield "items", {"recommended_items": result["recommended_items"]}
+
+    # Generate response text
+    result["text_response"], speech_parts = compose_chat_response(result)
+    yield "text", {"text_response": result["text_response"]}
+
+    # Generate audio if requested - use speech_parts (without item list) for cleaner audio.
+    # Sentences are synthesized in the background and streamed from audio_url,
+    # so the client can start playback as soon as the first one is ready.
+    if request.return_audio:
+        job = start_speech_job(speech_parts or [result["text_response"]])
+        if job is not None:
+            result["audio_url"] = f"/api/audio/{job.audio_id}"
+            result["apis_used"].append("gpt-4o-mini-tts (Australian TTS)")
+        yield "audio", {"audio_url": result["audio_url"]}
+
+    yield "done", result
+
+
+def done_summary(result: dict) -> dict:
+    """
+    Final stream payload: only what no earlier stage carried, plus counts,
+    so the stream doesn't resend items, text and audio
+    """
+    return {
+        "apis_used": result["apis_used"],
+        "ranking_signals": result["ranking_signals"],
+        "item_count": len(result["recommended_items"]),
+        "has_audio": result["audio_url"] is not None
+    }
+
+
+def format_sse(event: str, payload: dict) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n"
+
+
+@app.post("/api/chat")
+async def chat(request: ChatRequest):
+    """
+    Main chat endpoint - orchestrates all AI capabilities
+    """
+    try:
+        result = None
+        for stage, payload in run_chat_stages(request):
+            if stage == "done":
+                result = payload
 
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Chat error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint - same pipeline as /api/chat, delivered as
+    Server-Sent Events so the kiosk can render each stage as soon as it's ready
+    """
+    # Fail fast (with a real status code) before the stream starts
+    if request.image_id and get_image(request.image_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired image_id: {request.image_id}")
+
+    def event_stream():
+        try:
+            for stage, payload in run_chat_stages(request):
+                yield format_sse(stage, done_summary(payload) if stage == "done" else payload)
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield format_sse("error", {"detail": str(e)})
+
+    # Sync generators are iterated in the threadpool, so blocking stages don't stall the event loop
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ============================================================================
 # VOICE
 # ============================================================================
@@ -415,13 +801,15 @@ async def chat(request: ChatRequest):
 async def transcribe(audio: UploadFile = File(...)):
     """Transcribe audio to text"""
     try:
-        audio_bytes = await audio.read()
+        audio_bytes = await read_upload_limited(audio, MAX_AUDIO_UPLOAD_BYTES, kind="Audio")
         transcript = transcribe_audio_bytes(audio_bytes, audio.filename)
 
         return {
             "transcript": transcript,
             "model": TRANSCRIPTION_MODEL
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Transcription error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -450,49 +838,208 @@ async def text_to_speech(request: TTSRequest):
         logger.error(f"TTS error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/tts/stream")
+async def text_to_speech_stream(request: TTSRequest):
+    """
+    Convert text to speech, streaming MP3 audio sentence by sentence.
+    The X-Audio-Id header names the audio for later /api/audio range requests.
+    """
+    job = start_speech_job(split_sentences(request.text), use_australian_accent=request.use_australian_accent)
+    if job is None:
+        return Response(status_code=204)
+
+    return StreamingResponse(
+        job.iter_audio(),
+        media_type="audio/mpeg",
+        headers={"X-Audio-Id": job.audio_id, "Cache-Control": "no-store"}
+    )
+
+def audio_range_response(audio: bytes, range_header: Optional[str]) -> Response:
+    """Serve complete audio, honouring a single 'bytes=' Range request"""
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": "private, max-age=600"}
+    total = len(audio)
+
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return Response(audio, media_type="audio/mpeg", headers=headers)
+
+    start_text, _, end_text = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = min(int(end_text), total - 1) if end_text else total - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(0, total - int(end_text))
+            end = total - 1
+    except ValueError:
+        return Response(audio, media_type="audio/mpeg", headers=headers)
+
+    if start >= total or start > end:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{total}"})
+
+    headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+    return Response(audio[start:end + 1], status_code=206, media_type="audio/mpeg", headers=headers)
+
+def is_open_ended_range(range_header: Optional[str]) -> bool:
+    """True for no Range or 'bytes=N-', which a full streamed body satisfies"""
+    if not range_header:
+        return True
+    spec = range_header[len("bytes="):].strip() if range_header.startswith("bytes=") else ""
+    start, dash, end = spec.partition("-")
+    return bool(dash) and start.isdigit() and not end
+
+@app.get("/api/audio/{audio_id}")
+async def get_audio(audio_id: str, request: Request):
+    """
+    Stream synthesized speech for a chat or TTS response.
+    While synthesis is in progress, sentences are streamed as they finish -
+    including for the open-ended 'bytes=0-' ranges <audio> elements send.
+    Finished audio, and bounded ranges, are served with byte-range support.
+    """
+    job = get_speech_job(audio_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired audio_id")
+
+    range_header = request.headers.get("range")
+    if job.done or not is_open_ended_range(range_header):
+        audio = await run_in_threadpool(job.audio_bytes)
+        return audio_range_response(audio, range_header)
+
+    # The total length isn't known yet, so answer the open-ended range with
+    # the whole stream (a 200 is always a valid answer to a Range request)
+
+    return StreamingResponse(
+        job.iter_audio(),
+        media_type="audio/mpeg",
+        headers={"Cache-Control": "no-store"}
+    )
+
 # ============================================================================
 # INVENTORY
 # ============================================================================
 
+@app.get("/api/suggest")
+async def suggest(q: str = "", limit: int = 8):
+    """
+    Typeahead completions for a partial query: product names, article
+    types, colours and brands, ranked by catalog popularity.
+    Served from an in-memory prefix index - no embedding calls.
+    """
+    suggest_index = require_catalog(SUGGEST_INDEX)
+    started = time.perf_counter()
+    suggestions = suggest_index.suggest(q, limit=min(max(limit, 0), 20))
+    return {
+        "query": q,
+        "suggestions": suggestions,
+        "took_ms": round((time.perf_counter() - started) * 1000, 3)
+    }
+
+
+def split_values(value: Optional[str]) -> List[str]:
+    """Split a comma-separated multi-select query parameter"""
+    return [part.strip() for part in value.split(",") if part.strip()] if value else []
+
+
 @app.get("/api/inventory")
 async def get_inventory(
     gender: Optional[str] = None,
     article_type: Optional[str] = None,
     color: Optional[str] = None,
-    limit: int = 50
+    category: Optional[str] = None,
+    sub_category: Optional[str] = None,
+    season: Optional[str] = None,
+    usage: Optional[str] = None,
+    price_band: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    offset: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    include_facets: bool = True,
+    store_id: Optional[str] = None
 ):
-    """Get inventory items with filters"""
+    """
+    Faceted catalog browsing. Every filter accepts comma-separated values
+    (OR within a filter, AND across filters); color matches by substring.
+    Returns the requested page plus counts for every facet value, and a
+    next_cursor to pass back (with the same filters) for the following page.
+    With store_id, only rows in stock at that store are counted and returned.
+    """
+    catalog_index = require_catalog(CATALOG_INDEX)
     try:
-        df = STYLES_DF.copy()
-
-        if gender:
-            df = df[df['gender'].isin([gender, 'Unisex'])]
-        if article_type:
-            df = df[df['articleType'] == article_type]
-        if color:
-            df = df[df['baseColour'].str.contains(color, case=False, na=False)]
-
-        items = df.head(limit).to_dict('records')
-
-        # Add mock prices
-        for item in items:
-            if 'price' not in item:
-                item['price'] = int(item['id']) % 200 + 30
-
-        return {
+        started = time.perf_counter()
+
+        genders = split_values(gender)
+        if genders:
+            genders.append('Unisex')
+
+        filters = {
+            "gender": genders,
+            "article_type": split_values(article_type),
+            "color": split_values(color),
+            "category": split_values(category),
+            "sub_category": split_values(sub_category),
+            "season": split_values(season),
+            "usage": split_values(usage),
+            "price_band": split_values(price_band),
+        }
+        fingerprint = query_fingerprint("inventory", {
+            "filters": filters, "min_price": min_price, "max_price": max_price, "store_id": store_id
+        })
+        offset = decode_cursor(cursor, fingerprint) if cursor else max(offset, 0)
+
+        result, _ = INVENTORY_RESULTS.get_or_compute(fingerprint, lambda: catalog_index.query(
+            filters=filters,
+            substring_fields=("color",),
+            min_price=min_price,
+            max_price=max_price,
+            base_mask=availability_mask(store_id)
+        ))
+
+        page_size = max(limit, 0)
+        items = catalog_index.records(result["rows"][offset:offset + page_size])
+
+        response = {
             "items": items,
             "count": len(items),
-            "total_in_dataset": len(STYLES_DF)
+            "total": result["total"],
+            "offset": offset,
+            "next_cursor": next_cursor(fingerprint, offset, page_size, result["total"]),
+            "total_in_dataset": len(STYLES_DF),
+            "took_ms": round((time.perf_counter() - started) * 1000, 3)
         }
+        if include_facets:
+            response["facets"] = result["facets"]
+        return response
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Inventory error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/explore")
+async def explore(limit: int = 12, items_per_cluster: int = 6):
+    """Representative collections from the precomputed catalog clusters"""
+    require_catalog(CATALOG_CLUSTERS)
+    items_per_cluster = max(0, items_per_cluster)
+    collections = [
+        {**collection, "items": collection["items"][:items_per_cluster]}
+        for collection in EXPLORE_COLLECTIONS[:max(0, limit)]
+    ]
+    return {
+        "collections": collections,
+        "count": len(collections),
+        "total_clusters": len(EXPLORE_COLLECTIONS),
+        "built_ms": round(CATALOG_CLUSTERS.built_ms, 1)
+    }
+
+
 @app.get("/api/trending")
 async def get_trending(limit: int = 6):
     """Get trending/featured products for the homepage"""
+    require_catalog(STYLES_DF)
     try:
         # Sample random products to simulate trending items
         df = STYLES_DF.sample(n=min(limit, len(STYLES_DF)))
@@ -549,6 +1096,9 @@ async def startup_event():
     logger.info(f"Demo Mode: {DEMO_MODE}")
     logger.info("=" * 60)
 
+    # Synthesize the fixed stylist phrases in the background so chat audio hits the cache
+    threading.Thread(target=prewarm_speech_cache, args=(fixed_speech_fragments(),), daemon=True).start()
+
 # ============================================================================
 # MAIN
 # ============================================================================
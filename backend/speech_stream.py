@@ -0,0 +1,122 @@
+"""
+RetailNext Smart Stylist - Streamed Speech Delivery
+Splits a response into sentences, synthesizes them in a pipeline and serves
+the MP3 as it is produced, so playback starts after the first sentence
+"""
+
+import re
+import os
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
+
+from caching import TTLCache
+from tts_cache import strip_id3v2
+from backend import (
+    synthesize_speech,
+    tts_instructions,
+    get_client,
+    DEMO_MODE,
+    TTS_VOICE,
+    TTS_MAX_PARALLEL
+)
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SPEECH_JOB_TTL_SECONDS = int(os.getenv("SPEECH_JOB_TTL_SECONDS", "600"))
+SPEECH_JOB_MAX_JOBS = int(os.getenv("SPEECH_JOB_MAX_JOBS", "256"))
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+# Shared across jobs so concurrent chats can't oversubscribe the TTS API
+_tts_executor = ThreadPoolExecutor(max_workers=TTS_MAX_PARALLEL, thread_name_prefix="tts")
+
+# ============================================================================
+# SENTENCE PIPELINE
+# ============================================================================
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences for incremental synthesis"""
+    return [sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+class SpeechJob:
+    """
+    Speech for one response, synthesized sentence by sentence.
+
+    All sentences are submitted to the shared TTS pool up front; audio is
+    yielded in order as each sentence completes, and the joined MP3 is kept
+    once finished so range requests and replays can be served directly.
+    """
+
+    def __init__(self, sentences: List[str], voice: str, instructions: str):
+        self.audio_id = uuid.uuid4().hex
+        self.sentences = sentences
+        self._futures = [
+            _tts_executor.submit(synthesize_speech, sentence, voice, instructions)
+            for sentence in sentences
+        ]
+        self._audio: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return all(future.done() for future in self._futures)
+
+    def iter_audio(self) -> Iterator[bytes]:
+        """Yield MP3 chunks in sentence order as soon as each is synthesized"""
+        emitted_header = False
+        for sentence, future in zip(self.sentences, self._futures):
+            try:
+                audio = future.result()
+            except Exception as e:
+                logger.error(f"TTS error for sentence {sentence[:40]!r}: {e}")
+                continue
+            if not audio:
+                continue
+            yield audio if not emitted_header else strip_id3v2(audio)
+            emitted_header = True
+
+    def audio_bytes(self) -> bytes:
+        """Block until every sentence is synthesized and return the full MP3"""
+        with self._lock:
+            if self._audio is None:
+                self._audio = b"".join(self.iter_audio())
+            return self._audio
+
+
+_jobs = TTLCache(max_entries=SPEECH_JOB_MAX_JOBS, ttl_seconds=SPEECH_JOB_TTL_SECONDS)
+
+
+def start_speech_job(
+    segments: List[str],
+    voice: str = TTS_VOICE,
+    use_australian_accent: bool = True
+) -> Optional[SpeechJob]:
+    """
+    Start synthesizing speech fragments sentence by sentence.
+    Returns None when TTS is unavailable (demo mode or no API key).
+    """
+    if get_client() is None or DEMO_MODE:
+        logger.info("Demo mode: Skipping speech synthesis")
+        return None
+
+    sentences = [sentence for segment in segments if segment for sentence in split_sentences(segment)]
+    if not sentences:
+        return None
+
+    job = SpeechJob(sentences, voice, tts_instructions(use_australian_accent))
+    _jobs.set(job.audio_id, job)
+    logger.info(f"Speech job {job.audio_id} started with {len(sentences)} sentences")
+    return job
+
+
+def get_speech_job(audio_id: str) -> Optional[SpeechJob]:
+    """Look up a speech job by its audio_id"""
+    return _jobs.get(audio_id)
@@ -0,0 +1,235 @@
+"""
+RetailNext Smart Stylist - Query Spelling Correction
+Symmetric-delete spelling correction over catalog vocabulary, so typos like
+"shrit" or "navey blazer" are fixed locally before lexical matching or an
+embedding call. Only high-confidence corrections rewrite a query; the rest
+are returned as "did you mean" suggestions
+"""
+
+import os
+import re
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+MIN_CORRECTABLE_LENGTH = 4  # Shorter tokens are too ambiguous to correct
+MAX_EDIT_DISTANCE = 2
+MAX_MEMO_ENTRIES = 10000
+
+# A suggestion only rewrites the query when the typed word is long enough
+# to be unambiguous, is not a dictionary word, and the candidate is frequent
+# in the catalog (the typed word never appears in it) and clearly beats any
+# equally close alternative. Two-edit corrections ("sandles" -> "sandals")
+# also need the candidate to be the only one in reach, common in the catalog
+# and to share the typed word's opening letters. Everything else is just a
+# suggestion.
+MIN_AUTOCORRECT_LENGTH = 5
+MIN_CANDIDATE_COUNT = 3
+MIN_CANDIDATE_MARGIN = 2.0  # Best candidate count vs the runner-up at the same distance
+MIN_DISTANT_CANDIDATE_COUNT = 20  # Catalog count a two-edit candidate needs
+MIN_DISTANT_SHARED_PREFIX = 3     # Leading letters a two-edit candidate must share
+
+# Optional word list (one word per line); listed words are never rewritten
+SPELLING_DICTIONARY = os.getenv("SPELLING_DICTIONARY", "/usr/share/dict/words")
+
+# Everyday query words that are never "corrected" into catalog terms
+COMMON_QUERY_WORDS = {
+    "a", "an", "and", "any", "are", "as", "at", "be", "best", "but", "can", "do", "does",
+    "for", "from", "get", "good", "got", "have", "help", "i", "in", "is", "it", "like",
+    "looking", "me", "my", "need", "of", "on", "or", "something", "some", "that", "the",
+    "this", "to", "want", "wear", "what", "where", "which", "with", "would", "you", "your",
+    "outfit", "outfits", "wedding", "party", "office", "work", "date", "night", "dinner",
+    "beach", "holiday", "interview", "meeting", "guest", "event", "weekend", "brunch",
+    "size", "colour", "color", "style", "match", "matching", "under", "over", "cheap",
+    "elegant", "classic", "modern", "stylish", "comfortable", "warm", "light", "vintage",
+    "trendy", "cute", "cool", "simple", "plain", "bright", "dark", "pastel", "smart", "look",
+}
+
+# Real fashion and occasion words the catalog may never mention; they are
+# never auto-corrected into a similar-looking catalog word
+FASHION_WORDS = {
+    "floral", "maxi", "midi", "mini", "chinos", "chino", "attire", "funeral", "gown", "blouse",
+    "cardigan", "blazer", "tuxedo", "linen", "denim", "satin", "silk", "velvet", "chiffon",
+    "lace", "tweed", "corduroy", "suede", "loafers", "brogues", "oxfords", "stilettos",
+    "pumps", "wedges", "espadrilles", "jumpsuit", "romper", "culottes", "palazzo", "kimono",
+    "poncho", "cape", "waistcoat", "cummerbund", "bowtie", "pleated", "ruffled",
+    "sequin", "sequined", "embroidered", "paisley", "gingham", "houndstooth", "plaid",
+    "tartan", "polka", "boho", "preppy", "chic", "festive", "cocktail", "prom", "gala",
+    "graduation", "baptism", "christening", "memorial", "ceremony", "reception", "picnic",
+}
+
+_WORD = re.compile(r"[A-Za-z]+")
+
+
+def load_dictionary(path: Optional[str] = SPELLING_DICTIONARY) -> Set[str]:
+    """FASHION_WORDS plus lowercased words from a word-list file, if one is available"""
+    words = set(FASHION_WORDS)
+    if not path or not os.path.exists(path):
+        return words
+    try:
+        with open(path, encoding="utf-8", errors="ignore") as handle:
+            words.update(line.strip().lower() for line in handle if line.strip().isalpha())
+    except OSError as e:
+        logger.warning(f"Could not read spelling dictionary {path}: {e}")
+    return words
+
+# ============================================================================
+# CORRECTOR
+# ============================================================================
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """Every string reachable from word by deleting up to max_distance characters"""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {term[:i] + term[i + 1:] for term in frontier for i in range(len(term))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Damerau-Levenshtein distance (optimal string alignment)"""
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+
+class SpellingCorrector:
+    """
+    Symmetric-delete index: each vocabulary word is stored under all of its
+    deletions, so a misspelling finds candidates by looking up its own
+    deletions instead of comparing against the whole vocabulary.
+    Candidates are ranked by edit distance, then word frequency.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Counter,
+        max_distance: int = MAX_EDIT_DISTANCE,
+        dictionary: Optional[Set[str]] = None
+    ):
+        self.vocabulary = vocabulary
+        self.max_distance = max_distance
+        self.dictionary = load_dictionary() if dictionary is None else dictionary
+        self._deletes: Dict[str, List[str]] = {}
+        self._memo: Dict[str, Optional[Tuple[str, bool]]] = {}
+
+        for word in vocabulary:
+            if len(word) < MIN_CORRECTABLE_LENGTH - max_distance:
+                continue
+            for deletion in _deletes(word, max_distance):
+                self._deletes.setdefault(deletion, []).append(word)
+
+        logger.info(f"Spelling index built: {len(vocabulary)} words, {len(self._deletes)} delete keys")
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: Iterable[str],
+        max_distance: int = MAX_EDIT_DISTANCE,
+        dictionary: Optional[Set[str]] = None
+    ) -> "SpellingCorrector":
+        """Build from free text (product names, categories, colours, ...)"""
+        vocabulary = Counter(
+            word.lower() for text in texts if isinstance(text, str) for word in _WORD.findall(text)
+        )
+        return cls(vocabulary, max_distance, dictionary)
+
+    def is_known(self, word: str) -> bool:
+        if word in self.vocabulary or word in COMMON_QUERY_WORDS:
+            return True
+        # Plural/singular forms of known words are fine as typed
+        return (word.endswith("s") and word[:-1] in self.vocabulary) or f"{word}s" in self.vocabulary
+
+    def suggest_word(self, word: str) -> Optional[Tuple[str, bool]]:
+        """
+        Best vocabulary replacement for an unknown word as (candidate,
+        confident), or None to keep it. Only confident candidates should
+        rewrite a query.
+        """
+        word = word.lower()
+        if len(word) < MIN_CORRECTABLE_LENGTH or self.is_known(word):
+            return None
+        if word in self._memo:
+            return self._memo[word]
+
+        # Allow one edit for short words, two for longer ones; first letters are
+        # rarely mistyped, so candidates must share it
+        max_distance = 1 if len(word) <= 5 else self.max_distance
+        ranked: List[Tuple[int, int, str]] = []
+        for deletion in _deletes(word, max_distance):
+            for candidate in self._deletes.get(deletion, ()):
+                if candidate[0] != word[0] or abs(len(candidate) - len(word)) > max_distance:
+                    continue
+                distance = edit_distance(word, candidate)
+                if distance <= max_distance:
+                    ranked.append((distance, -self.vocabulary[candidate], candidate))
+
+        suggestion = None
+        if ranked:
+            ranked = sorted(set(ranked))
+            distance, negative_count, candidate = ranked[0]
+            count = -negative_count
+            runner_up = next((-other_count for d, other_count, _ in ranked[1:] if d == distance), 0)
+            if distance == 1:
+                clear_winner = count >= MIN_CANDIDATE_COUNT and count >= MIN_CANDIDATE_MARGIN * runner_up
+            else:
+                clear_winner = (
+                    len(ranked) == 1
+                    and count >= MIN_DISTANT_CANDIDATE_COUNT
+                    and candidate[:MIN_DISTANT_SHARED_PREFIX] == word[:MIN_DISTANT_SHARED_PREFIX]
+                )
+            confident = clear_winner and len(word) >= MIN_AUTOCORRECT_LENGTH and word not in self.dictionary
+            suggestion = (candidate, confident)
+
+        if len(self._memo) >= MAX_MEMO_ENTRIES:
+            self._memo.clear()
+        self._memo[word] = suggestion
+        return suggestion
+
+    def correct_word(self, word: str, confident_only: bool = True) -> Optional[str]:
+        """Replacement for an unknown word, or None to keep it as typed"""
+        suggestion = self.suggest_word(word)
+        if suggestion is None or (confident_only and not suggestion[1]):
+            return None
+        return suggestion[0]
+
+    def correct(self, text: str, confident_only: bool = True) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Correct unknown words in text.
+        Returns (corrected text, [{"from", "to", "applied"}, ...]). With
+        confident_only, low-confidence suggestions are listed with
+        applied=False but left out of the text, so it stays as typed.
+        """
+        corrections: List[Dict[str, Any]] = []
+
+        def replace(match: "re.Match") -> str:
+            suggestion = self.suggest_word(match.group(0))
+            if suggestion is None:
+                return match.group(0)
+            candidate, confident = suggestion
+            applied = confident or not confident_only
+            corrections.append({"from": match.group(0), "to": candidate, "applied": applied})
+            return candidate if applied else match.group(0)
+
+        corrected = _WORD.sub(replace, text)
+        return corrected, corrections
+
+    def did_you_mean(self, text: str) -> Optional[str]:
+        """text with every suggestion applied, or None when there is nothing to suggest"""
+        suggested, corrections = self.correct(text, confident_only=False)
+        return suggested if corrections else None
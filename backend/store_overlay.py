@@ -0,0 +1,131 @@
+"""
+RetailNext Smart Stylist - Per-Store Inventory Overlays
+Compact per-store stock and shelf arrays aligned to catalog row positions, so
+one shared embedding index can serve many stores: a store's availability is
+a boolean mask applied during scoring
+"""
+
+import os
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import numpy as np
+
+from caching import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# The default store keeps the stock levels items have always been enriched with
+DEFAULT_STORE_ID = os.getenv("DEFAULT_STORE_ID", "flagship")
+STORE_OVERLAY_CACHE_SIZE = int(os.getenv("STORE_OVERLAY_CACHE_SIZE", "128"))
+
+# ============================================================================
+# OVERLAYS
+# ============================================================================
+
+def store_seed(store_id: str) -> int:
+    return int(hashlib.md5(store_id.encode()).hexdigest()[:16], 16)
+
+
+def _mix(values: np.ndarray, seed: int) -> np.ndarray:
+    """splitmix64 finalizer over item seeds, folded back to 32 bits"""
+    x = values.astype(np.uint64) ^ np.uint64(seed)
+    with np.errstate(over="ignore"):
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x = x ^ (x >> np.uint64(31))
+    return x & np.uint64(0xFFFFFFFF)
+
+
+@dataclass
+class StoreOverlay:
+    """One store's stock count, rack and shelf per catalog row (3 bytes/row)"""
+    store_id: str
+    stock: np.ndarray
+    rack: np.ndarray
+    shelf: np.ndarray
+
+    @classmethod
+    def build(cls, store_id: str, item_seeds: np.ndarray) -> "StoreOverlay":
+        """
+        Deterministic mock stock for a store: 70% in stock, 20% low, 10% out.
+        The default store uses the item seeds directly, matching the
+        single-store enrichment.
+        """
+        seeds = item_seeds if store_id == DEFAULT_STORE_ID else _mix(item_seeds, store_seed(store_id))
+        bucket = (seeds >> np.uint64(8)) % np.uint64(100)
+        stock = np.where(
+            bucket < 70, 5 + seeds % np.uint64(20),
+            np.where(bucket < 90, 1 + seeds % np.uint64(4), 0)
+        )
+        return cls(
+            store_id=store_id,
+            stock=stock.astype(np.uint8),
+            rack=(seeds % np.uint64(12) + np.uint64(1)).astype(np.uint8),
+            shelf=(seeds % np.uint64(4) + np.uint64(1)).astype(np.uint8)
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self.stock.nbytes + self.rack.nbytes + self.shelf.nbytes
+
+    def available(self, min_quantity: int = 1) -> np.ndarray:
+        """Boolean mask of catalog rows this store can sell"""
+        return self.stock >= min_quantity
+
+    def item_fields(self, row: int, aisle: str) -> Dict[str, Any]:
+        """storeLocation and stock entries for an enriched item"""
+        quantity = int(self.stock[row])
+        if quantity >= 5:
+            status, label = 'in_stock', 'In Stock'
+        elif quantity > 0:
+            status, label = 'low_stock', f'Only {quantity} left'
+        else:
+            status, label = 'out_of_stock', 'Out of Stock'
+
+        rack, shelf = int(self.rack[row]), int(self.shelf[row])
+        return {
+            'storeLocation': {
+                'aisle': f"Aisle {aisle}",
+                'rack': f"Rack {rack}",
+                'shelf': f"Shelf {shelf}",
+                'display': f"Aisle {aisle}, Rack {rack}",
+                'storeId': self.store_id
+            },
+            'stock': {
+                'quantity': quantity,
+                'status': status,
+                'label': label
+            }
+        }
+
+
+class StoreOverlays:
+    """LRU of per-store overlays over one catalog's item seeds"""
+
+    def __init__(self, item_seeds: np.ndarray, max_stores: int = STORE_OVERLAY_CACHE_SIZE):
+        self.item_seeds = item_seeds.astype(np.uint64)
+        self._overlays = TTLCache(max_entries=max_stores)
+
+    @property
+    def size(self) -> int:
+        return len(self.item_seeds)
+
+    def get(self, store_id: str) -> StoreOverlay:
+        overlay = self._overlays.get(store_id)
+        if overlay is None:
+            overlay = StoreOverlay.build(store_id, self.item_seeds)
+            self._overlays.set(store_id, overlay)
+            logger.info(f"Store overlay built for '{store_id}': {overlay.nbytes} bytes, {int(overlay.available().sum())} rows available")
+        return overlay
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._overlays.stats()
+        stats["bytes_per_store"] = self.size * 3
+        return stats
@@ -0,0 +1,129 @@
+"""
+RetailNext Smart Stylist - Typeahead Suggestions
+Sorted-array prefix index over product names, article types, colours and
+brands, ranked by a static popularity prior. Answers keystroke-level
+autocomplete locally, with no embedding or network calls
+"""
+
+import math
+import bisect
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Ranking tier per suggestion type, so broad terms lead specific products
+# (larger than any log-count popularity difference within a tier)
+SUGGESTION_TYPE_BOOST = {
+    "category": 30.0,
+    "colour": 20.0,
+    "brand": 10.0,
+    "product": 0.0,
+}
+
+MAX_PRODUCT_SUFFIX_WORDS = 6  # Match product names from any of their first words
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+def normalize_prefix(text: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join(str(text).lower().split())
+
+
+class PrefixIndex:
+    """
+    Suggestions stored once, reachable through one or more sorted keys.
+
+    A lookup bisects the sorted key array for the prefix range and takes
+    the highest-weighted distinct suggestions in that range.
+    """
+
+    def __init__(self, entries: List[Tuple[str, str, float, int]], keys: List[Tuple[str, int]]):
+        # entries: (text, type, weight, count); keys: (normalized key, entry index)
+        self.entries = entries
+        keys.sort()
+        self.keys = [key for key, _ in keys]
+        self.entry_ids = np.array([entry for _, entry in keys], dtype=np.int32)
+        self.weights = np.array([entries[entry][2] for _, entry in keys], dtype=np.float64)
+        logger.info(f"Suggest index built: {len(entries)} suggestions, {len(self.keys)} keys")
+
+    @classmethod
+    def from_catalog(cls, df: pd.DataFrame) -> "PrefixIndex":
+        """Build from catalog columns; popularity prior = how many items share a term"""
+        entries: List[Tuple[str, str, float, int]] = []
+        keys: List[Tuple[str, int]] = []
+
+        def add_terms(values, kind: str) -> Counter:
+            counts = Counter(value for value in values if isinstance(value, str) and value.strip())
+            for value, count in counts.items():
+                keys.append((normalize_prefix(value), len(entries)))
+                entries.append((value, kind, math.log1p(count) + SUGGESTION_TYPE_BOOST[kind], count))
+            return counts
+
+        names = df['productDisplayName'].fillna('')
+        type_counts = add_terms(df['articleType'], "category")
+        add_terms(df['baseColour'], "colour")
+        add_terms(names.str.split().str[0], "brand")  # Brand is the leading word of the product name
+
+        # One suggestion per distinct normalized name (SKUs often share one);
+        # products inherit their article type's popularity plus their SKU count
+        products: Dict[str, List[Any]] = {}
+        for name, article_type in zip(names, df['articleType']):
+            normalized = normalize_prefix(name)
+            if not normalized:
+                continue
+            if normalized in products:
+                products[normalized][2] += 1
+            else:
+                products[normalized] = [name, article_type, 1]
+
+        for normalized, (name, article_type, count) in products.items():
+            words = normalized.split()
+            entry = len(entries)
+            entries.append((name, "product", math.log1p(type_counts.get(article_type, 0)) + math.log1p(count), count))
+            for start in range(min(len(words), MAX_PRODUCT_SUFFIX_WORDS)):
+                keys.append((" ".join(words[start:]), entry))
+
+        return cls(entries, keys)
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """Top suggestions whose text (or a word-aligned suffix of it) starts with prefix"""
+        prefix = normalize_prefix(prefix)
+        if not prefix or limit <= 0:
+            return []
+
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\uffff", lo)
+        if lo == hi:
+            return []
+
+        # A product can own several keys in range, so over-fetch before de-duplicating
+        weights = self.weights[lo:hi]
+        take = min(len(weights), limit * MAX_PRODUCT_SUFFIX_WORDS)
+        top = np.argpartition(-weights, take - 1)[:take] if take < len(weights) else np.arange(len(weights))
+        top = top[np.argsort(-weights[top], kind="stable")]
+
+        suggestions, seen, seen_texts = [], set(), set()
+        for position in top:
+            entry = int(self.entry_ids[lo + position])
+            if entry in seen:
+                continue
+            seen.add(entry)
+            text, kind, _, count = self.entries[entry]
+            if normalize_prefix(text) in seen_texts:  # e.g. a brand that is also a category
+                continue
+            seen_texts.add(normalize_prefix(text))
+            suggestions.append({"text": text, "type": kind, "count": count})
+            if len(suggestions) >= limit:
+                break
+        return suggestions
@@ -0,0 +1,30 @@
+"""
+Shared fixtures for the backend unit tests
+"""
+
+import os
+import sys
+import copy
+
+import pandas as pd
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope="session")
+def styles_df() -> pd.DataFrame:
+    """The sample catalog the server loads at startup"""
+    return pd.read_csv(os.path.join(BACKEND_DIR, "sample_styles.csv"))
+
+
+@pytest.fixture
+def inventory():
+    """MOCK_INVENTORY, restored (and its indexes invalidated) after the test"""
+    import backend
+
+    saved = copy.deepcopy(backend.MOCK_INVENTORY)
+    yield backend.MOCK_INVENTORY
+    backend.MOCK_INVENTORY[:] = saved
+    backend.invalidate_inventory_index()
@@ -0,0 +1,128 @@
+"""
+Speech delivery: range handling and streaming while synthesis is running
+"""
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+import speech_stream
+from server import audio_range_response, is_open_ended_range
+
+AUDIO = bytes(range(100))
+
+
+class _RunningJob:
+    """A job still synthesizing: streaming works, buffering would block"""
+    audio_id = "running"
+    done = False
+
+    def iter_audio(self):
+        yield AUDIO[:40]
+        yield AUDIO[40:]
+
+    def audio_bytes(self):
+        raise AssertionError("buffered the whole job before responding")
+
+
+class _FinishedJob(_RunningJob):
+    audio_id = "finished"
+    done = True
+
+    def audio_bytes(self):
+        return AUDIO
+
+
+@pytest.fixture
+def client(monkeypatch):
+    jobs = {"running": _RunningJob(), "finished": _FinishedJob()}
+    monkeypatch.setattr(server, "get_speech_job", jobs.get)
+    return TestClient(server.app)
+
+
+def test_full_response_without_range():
+    response = audio_range_response(AUDIO, None)
+    assert response.status_code == 200
+    assert response.body == AUDIO
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+@pytest.mark.parametrize("range_header, expected, content_range", [
+    ("bytes=0-9", AUDIO[:10], "bytes 0-9/100"),
+    ("bytes=90-", AUDIO[90:], "bytes 90-99/100"),
+    ("bytes=-5", AUDIO[95:], "bytes 95-99/100"),
+    ("bytes=95-500", AUDIO[95:], "bytes 95-99/100"),
+])
+def test_partial_ranges(range_header, expected, content_range):
+    response = audio_range_response(AUDIO, range_header)
+    assert response.status_code == 206
+    assert response.body == expected
+    assert response.headers["content-range"] == content_range
+
+
+@pytest.mark.parametrize("range_header", ["bytes=100-", "bytes=50-10"])
+def test_unsatisfiable_ranges(range_header):
+    response = audio_range_response(AUDIO, range_header)
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */100"
+
+
+@pytest.mark.parametrize("range_header", ["bytes=0-1,5-6", "items=0-5", "bytes=a-b"])
+def test_unsupported_ranges_return_everything(range_header):
+    response = audio_range_response(AUDIO, range_header)
+    assert response.status_code == 200
+    assert response.body == AUDIO
+
+
+@pytest.mark.parametrize("range_header, open_ended", [
+    (None, True), ("bytes=0-", True), ("bytes=512-", True),
+    ("bytes=0-99", False), ("bytes=-5", False), ("bytes=0-1,5-", False),
+])
+def test_open_ended_ranges(range_header, open_ended):
+    assert is_open_ended_range(range_header) is open_ended
+
+
+@pytest.mark.parametrize("headers", [{}, {"Range": "bytes=0-"}])
+def test_running_job_streams_open_ended_requests(client, headers):
+    response = client.get("/api/audio/running", headers=headers)
+    assert response.status_code == 200
+    assert response.content == AUDIO
+    assert "content-range" not in response.headers
+
+
+def test_running_job_buffers_bounded_ranges(client, monkeypatch):
+    monkeypatch.setattr(_RunningJob, "audio_bytes", lambda self: AUDIO)
+    response = client.get("/api/audio/running", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == AUDIO[10:20]
+
+
+def test_finished_job_honours_ranges(client):
+    response = client.get("/api/audio/finished", headers={"Range": "bytes=0-"})
+    assert response.status_code == 206
+    assert response.content == AUDIO
+    assert response.headers["content-range"] == "bytes 0-99/100"
+
+
+def test_unknown_audio_id(client):
+    assert client.get("/api/audio/missing").status_code == 404
+
+
+def test_first_sentence_is_yielded_before_the_rest_finish(monkeypatch):
+    release = threading.Event()
+
+    def fake_synthesize(sentence, voice, instructions):
+        if sentence != "First.":
+            assert release.wait(5)
+        return sentence.encode()
+
+    monkeypatch.setattr(speech_stream, "synthesize_speech", fake_synthesize)
+    job = speech_stream.SpeechJob(["First.", "Second."], "voice", "")
+    chunks = job.iter_audio()
+
+    assert next(chunks) == b"First."
+    assert not job.done
+    release.set()
+    assert list(chunks) == [b"Second."]
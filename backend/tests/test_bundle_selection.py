@@ -0,0 +1,120 @@
+"""
+Inventory outfit bundles: joint selection across slots under a budget
+"""
+
+import pytest
+
+import backend
+
+# Words the fake embedding space is built on; texts score by shared words and
+# texts with none of them score zero
+_VOCABULARY = ["wedding", "beach", "office", "silk", "linen", "leather", "gold", "navy"]
+
+
+def _embed(text):
+    words = text.lower().split()
+    return [float(word in words) for word in _VOCABULARY]
+
+
+def _item(item_id, category, price, name="plain", gender="women", style="formal", stock=5):
+    return {
+        "id": item_id, "name": name, "category": category, "gender": gender, "price": price,
+        "colors": ["black"], "sizes": ["M"], "description": name, "stock": stock,
+        "aisle": "A1", "bin": "B1", "material": "cotton", "style": style
+    }
+
+
+@pytest.fixture
+def bundle_inventory(inventory, monkeypatch):
+    """Replace the inventory and use a deterministic word-overlap embedding"""
+    monkeypatch.setattr(backend, "get_embedding", _embed)
+    monkeypatch.setattr(backend, "embed_batch_with_status", lambda texts: ([_embed(text) for text in texts], True))
+
+    def stock(*items):
+        inventory[:] = list(items)
+        backend.invalidate_inventory_index()
+
+    return stock
+
+
+def _bundle(**kwargs):
+    bundle = backend.get_outfit_bundle(occasion="wedding", gender="women", formality="formal", **kwargs)
+    return bundle, [item["id"] for item in bundle["items"]]
+
+
+def test_fills_every_slot_when_affordable(bundle_inventory):
+    bundle_inventory(
+        _item("top", "tops", 50), _item("pants", "pants", 50),
+        _item("shoes", "shoes", 50), _item("bag", "accessories", 50)
+    )
+    bundle, ids = _bundle()
+    assert sorted(ids) == ["bag", "pants", "shoes", "top"]
+    assert bundle["total_price"] == 200
+
+
+def test_budget_drops_a_slot_rather_than_overspend(bundle_inventory):
+    bundle_inventory(
+        _item("top", "tops", 50), _item("pants", "pants", 50),
+        _item("shoes", "shoes", 50), _item("bag", "accessories", 50)
+    )
+    bundle, ids = _bundle(budget_max=160)
+    assert len(ids) == 3
+    assert bundle["total_price"] <= 160
+
+
+def test_budget_prefers_cheaper_alternatives_over_empty_slots(bundle_inventory):
+    bundle_inventory(
+        _item("silk-top", "tops", 120, name="wedding silk"), _item("top", "tops", 30),
+        _item("pants", "pants", 40), _item("shoes", "shoes", 40), _item("bag", "accessories", 40)
+    )
+    bundle, ids = _bundle(budget_max=160)
+    assert sorted(ids) == ["bag", "pants", "shoes", "top"]
+    assert bundle["total_price"] <= 160
+
+
+def test_items_over_budget_are_never_picked(bundle_inventory):
+    bundle_inventory(_item("gown", "dresses", 900, name="wedding silk"), _item("top", "tops", 60))
+    _, ids = _bundle(budget_max=100)
+    assert ids == ["top"]
+
+
+def test_dress_fills_the_bottoms_slot(bundle_inventory):
+    bundle_inventory(
+        _item("dress", "dresses", 80, name="wedding silk"), _item("top", "tops", 40),
+        _item("skirt", "skirts", 40), _item("shoes", "shoes", 40)
+    )
+    # Dress + shoes covers as many slots as top + skirt + shoes, and scores higher
+    _, ids = _bundle()
+    assert sorted(ids) == ["dress", "shoes"]
+
+
+def test_top_keeps_the_bottoms_slot(bundle_inventory):
+    bundle_inventory(
+        _item("top", "tops", 40, name="wedding silk"), _item("dress", "dresses", 80),
+        _item("skirt", "skirts", 40), _item("shoes", "shoes", 40)
+    )
+    _, ids = _bundle()
+    assert sorted(ids) == ["shoes", "skirt", "top"]
+
+
+def test_no_item_appears_twice(bundle_inventory):
+    bundle_inventory(*[
+        _item(f"{category}-{n}", category, 20 + n, name="wedding" if n == 0 else "plain")
+        for category in ["tops", "dresses", "pants", "skirts", "shoes", "accessories"]
+        for n in range(6)
+    ])
+    bundle, ids = _bundle(budget_max=150)
+    assert len(ids) == len(set(ids))
+    assert len(ids) >= 3
+    categories = [item["category"] for item in bundle["items"]]
+    assert not ("dresses" in categories and {"pants", "skirts"} & set(categories))
+
+
+def test_out_of_stock_and_other_gender_items_are_skipped(bundle_inventory):
+    bundle_inventory(
+        _item("sold-out", "tops", 40, name="wedding silk", stock=0),
+        _item("mens", "tops", 40, name="wedding silk", gender="men"),
+        _item("top", "tops", 40)
+    )
+    _, ids = _bundle()
+    assert ids == ["top"]
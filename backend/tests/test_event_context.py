@@ -0,0 +1,60 @@
+"""
+Event-context caching: the semantic tier must not cross occasion or formality
+"""
+
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import backend
+
+
+class _FakeClient:
+    """Structured-outputs stand-in that echoes the request it parsed"""
+
+    def __init__(self):
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, **kwargs):
+        request = messages[-1]["content"]
+        self.calls.append(request)
+        content = json.dumps({"event_type": "wedding", "style_notes": request})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = _FakeClient()
+    monkeypatch.setattr(backend, "get_client", lambda: client)
+    monkeypatch.setattr(backend, "DEMO_MODE", False)
+    # Every request embeds identically, so only the guard keeps entries apart
+    monkeypatch.setattr(backend._event_context_cache, "embed", lambda text: np.ones(8).tolist())
+    backend._event_context_cache.clear()
+    yield client
+    backend._event_context_cache.clear()
+
+
+def test_guard_includes_formality_and_occasion():
+    assert backend.event_context_guard("casual wedding outfit") != backend.event_context_guard("formal wedding outfit")
+    assert backend.event_context_guard("formal wedding outfit") != backend.event_context_guard("formal funeral outfit")
+    assert backend.event_context_guard("wedding outfit") == backend.event_context_guard("outfit for a wedding")
+
+
+def test_casual_and_formal_wedding_do_not_share_cache_entry(fake_client):
+    formal, formal_meta = backend.parse_event_context_with_meta("formal wedding outfit")
+    casual, casual_meta = backend.parse_event_context_with_meta("casual wedding outfit")
+
+    assert formal_meta["path"] == casual_meta["path"] == "llm"
+    assert len(fake_client.calls) == 2
+    assert "casual" in casual["style_notes"]
+
+
+def test_similar_request_reuses_cached_context(fake_client):
+    backend.parse_event_context_with_meta("formal wedding outfit")
+    _, meta = backend.parse_event_context_with_meta("formal outfit for a wedding")
+
+    assert meta["path"] == "semantic_cache"
+    assert len(fake_client.calls) == 1
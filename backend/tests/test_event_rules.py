@@ -0,0 +1,50 @@
+"""
+Rule-based event extraction: when the rules may skip the LLM
+"""
+
+import pytest
+
+from backend import EVENT_RULES_MIN_CONFIDENCE
+from event_rules import extract_event_context
+
+
+@pytest.mark.parametrize("text", [
+    "I need a dress for my boyfriend's graduation",
+    "Can you help with my husband's office party? I want a nice skirt",
+    "gift for her birthday, I'm a guy looking for a shirt",
+])
+def test_pronoun_and_relationship_cues_defer_to_llm(text):
+    extraction = extract_event_context(text)
+    assert extraction.confidence["gender"] < EVENT_RULES_MIN_CONFIDENCE
+    assert not extraction.is_confident(EVENT_RULES_MIN_CONFIDENCE)
+
+
+def test_negated_formality_is_not_trusted():
+    extraction = extract_event_context("I'm not going formal, something casual for a wedding for women")
+    assert extraction.context["formality_level"] == "casual"
+    assert extraction.confidence["formality_level"] < EVENT_RULES_MIN_CONFIDENCE
+    assert not extraction.is_confident(EVENT_RULES_MIN_CONFIDENCE)
+
+
+def test_negated_formality_falls_back_to_event_as_hint():
+    extraction = extract_event_context("nothing formal, just a wedding outfit for men")
+    assert extraction.context["formality_level"] == "semi-formal"
+    assert not extraction.is_confident(EVENT_RULES_MIN_CONFIDENCE)
+
+
+def test_conflicting_formality_levels_are_not_trusted():
+    extraction = extract_event_context("formal or casual look for a dinner for women")
+    assert extraction.context["formality_level"] == "formal"
+    assert not extraction.is_confident(EVENT_RULES_MIN_CONFIDENCE)
+
+
+@pytest.mark.parametrize("text, formality, gender", [
+    ("men's formal shirt for an interview", "formal", "men"),
+    ("semi-formal wedding outfit for women", "semi-formal", "women"),
+    ("smart casual dinner for men", "smart-casual", "men"),
+])
+def test_clear_requests_skip_llm(text, formality, gender):
+    extraction = extract_event_context(text)
+    assert extraction.context["formality_level"] == formality
+    assert extraction.context["gender"] == gender
+    assert extraction.is_confident(EVENT_RULES_MIN_CONFIDENCE)
@@ -0,0 +1,34 @@
+"""
+Inventory lookup index: rebuilt only when indexed fields change
+"""
+
+import backend
+
+
+def test_stock_and_price_updates_reuse_the_index(inventory):
+    index = backend.get_inventory_lookup()
+
+    backend.update_inventory_item("M001", stock=0, price=199.99)
+
+    assert backend.get_inventory_lookup() is index
+    assert index.get("M001")["stock"] == 0
+    assert backend.check_inventory("Navy Blue Blazer")["items"][0]["available"] is False
+
+
+def test_indexed_field_updates_rebuild_the_index(inventory):
+    index = backend.get_inventory_lookup()
+
+    backend.update_inventory_item("M001", name="Midnight Velvet Blazer")
+
+    assert backend.get_inventory_lookup() is not index
+    assert backend.check_inventory("Midnight Velvet")["found"]
+
+
+def test_added_items_are_indexed(inventory):
+    index = backend.get_inventory_lookup()
+    item = dict(inventory[0], id="T999", name="Tangerine Linen Scarf")
+
+    backend.add_inventory_item(item)
+
+    assert backend.get_inventory_lookup() is not index
+    assert backend.get_inventory_lookup().get("T999") is item
@@ -0,0 +1,72 @@
+"""
+MMR diversity re-ranking: the relevance / redundancy blend
+"""
+
+import numpy as np
+import pytest
+
+from clothing_rag import mmr_rerank
+
+
+def _naive_mmr(rows, scores, vectors, diversity, pool):
+    """Textbook MMR loop, recomputing every similarity at every step"""
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    remaining, picked = list(range(min(pool, len(rows)))), []
+    while remaining:
+        def marginal(i):
+            if not picked:
+                return scores[i]
+            redundancy = max(unit[rows[i]] @ unit[rows[j]] for j in picked)
+            return (1 - diversity) * scores[i] - diversity * redundancy
+        best = max(remaining, key=lambda i: (marginal(i), -i))
+        picked.append(best)
+        remaining.remove(best)
+    return np.concatenate([rows[picked], rows[len(picked):]])
+
+
+@pytest.fixture
+def near_duplicates():
+    # Rows 0 and 1 are the same product; row 2 is different but less relevant
+    vectors = np.array([[1.0, 0.0], [0.99, 0.14], [0.0, 1.0]])
+    return np.arange(3), np.array([0.9, 0.85, 0.6]), vectors
+
+
+def test_zero_diversity_keeps_relevance_order(near_duplicates):
+    rows, scores, vectors = near_duplicates
+    reranked, reranked_scores = mmr_rerank(rows, scores, vectors, diversity=0.0)
+    assert reranked.tolist() == [0, 1, 2]
+    assert reranked_scores.tolist() == scores.tolist()
+
+
+def test_diversity_promotes_a_different_item(near_duplicates):
+    rows, scores, vectors = near_duplicates
+    reranked, reranked_scores = mmr_rerank(rows, scores, vectors, diversity=0.5)
+    assert reranked.tolist() == [0, 2, 1]
+    # Scores travel with their rows
+    assert reranked_scores.tolist() == [0.9, 0.6, 0.85]
+
+
+def test_low_diversity_still_prefers_relevance(near_duplicates):
+    rows, scores, vectors = near_duplicates
+    reranked, _ = mmr_rerank(rows, scores, vectors, diversity=0.05)
+    assert reranked.tolist() == [0, 1, 2]
+
+
+def test_rows_beyond_the_pool_keep_their_order():
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(20, 8))
+    rows = np.arange(20)[::-1].copy()
+    scores = np.linspace(1.0, 0.5, 20)
+    reranked, _ = mmr_rerank(rows, scores, vectors, diversity=0.7, pool_size=8)
+    assert sorted(reranked[:8].tolist()) == sorted(rows[:8].tolist())
+    assert reranked[8:].tolist() == rows[8:].tolist()
+
+
+@pytest.mark.parametrize("diversity", [0.2, 0.5, 0.9])
+def test_matches_naive_mmr(diversity):
+    rng = np.random.default_rng(7)
+    vectors = rng.normal(size=(60, 16))
+    rows = rng.permutation(60)
+    scores = np.sort(rng.uniform(0.3, 0.9, size=60))[::-1]
+    reranked, _ = mmr_rerank(rows, scores, vectors, diversity=diversity, pool_size=40)
+    assert reranked.tolist() == _naive_mmr(rows, scores, vectors, diversity, 40).tolist()
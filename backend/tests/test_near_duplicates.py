@@ -0,0 +1,54 @@
+"""
+Near-duplicate grouping: only the same product in minor variations collapses
+"""
+
+import numpy as np
+import pandas as pd
+
+from near_duplicates import colour_family, group_near_duplicates
+
+
+def _catalog(rows):
+    """Catalog rows with identical embeddings, so only blocking and names decide"""
+    df = pd.DataFrame(rows, columns=["productDisplayName", "baseColour", "articleType", "gender"])
+    embeddings = np.ones((len(df), 4)) / 2.0
+    return df, embeddings
+
+
+def test_different_brands_stay_separate():
+    df, embeddings = _catalog([
+        ("Diva Women Printed Blue Kurta", "Blue", "Kurtas", "Women"),
+        ("W Women Printed Blue Kurta", "Blue", "Kurtas", "Women"),
+        ("Alayna Women Printed Blue Kurta", "Blue", "Kurtas", "Women"),
+        ("BIBA Women Printed Blue Kurta", "Blue", "Kurtas", "Women"),
+    ])
+    assert len(set(group_near_duplicates(df, embeddings))) == 4
+
+
+def test_different_colour_families_stay_separate():
+    df, embeddings = _catalog([
+        ("Locomotive Men Grey Tshirt", "Grey", "Tshirts", "Men"),
+        ("Locomotive Men Blue Tshirt", "Blue", "Tshirts", "Men"),
+        ("Mr.Men Men Blue Tshirt", "Blue", "Tshirts", "Men"),
+    ])
+    assert len(set(group_near_duplicates(df, embeddings))) == 3
+
+
+def test_minor_colour_naming_still_groups():
+    df, embeddings = _catalog([
+        ("U.S. Polo Assn. Men Navy Blue Flip Flops", "Navy Blue", "Flip Flops", "Men"),
+        ("U.S. Polo Assn. Men Blue Flip Flops", "Blue", "Flip Flops", "Men"),
+    ])
+    assert list(group_near_duplicates(df, embeddings)) == [0, 0]
+    assert colour_family("Navy Blue") == colour_family("Blue") == "blue"
+    assert colour_family("Grey Melange") == "grey"
+
+
+def test_members_must_match_the_representative():
+    # Each neighbouring pair overlaps by at least 0.7, but the first and last don't
+    df, embeddings = _catalog([
+        ("Roadster Men Blue Slim Fit Checked Casual Shirt", "Blue", "Shirts", "Men"),
+        ("Roadster Men Blue Slim Fit Checked Shirt", "Blue", "Shirts", "Men"),
+        ("Roadster Men Blue Slim Fit Shirt", "Blue", "Shirts", "Men"),
+    ])
+    assert list(group_near_duplicates(df, embeddings, min_jaccard=0.7)) == [0, 0, 2]
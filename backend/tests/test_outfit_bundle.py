@@ -0,0 +1,36 @@
+"""
+Outfit bundle caching: the cache key and the bundle search see the same request
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+
+@pytest.fixture
+def bundle_calls(monkeypatch):
+    calls = []
+
+    def fake_bundle(**kwargs):
+        calls.append(kwargs)
+        return {"occasion": kwargs["occasion"], "items": []}
+
+    monkeypatch.setattr(server, "create_outfit_bundle", fake_bundle)
+    server.OUTFIT_BUNDLES.clear()
+    yield calls
+    server.OUTFIT_BUNDLES.clear()
+
+
+def test_equivalent_requests_share_one_bundle(bundle_calls):
+    client = TestClient(server.app)
+    first = {"occasion": "Beach  Wedding", "gender": " Women ", "formality": "Semi-Formal", "color_preference": "navy and white"}
+    second = {"occasion": "beach wedding", "gender": "women", "formality": "semi-formal", "color_preference": "white navy"}
+
+    assert client.post("/api/outfit-bundle", json=first).status_code == 200
+    assert client.post("/api/outfit-bundle", json=second).status_code == 200
+
+    assert len(bundle_calls) == 1
+    call = bundle_calls[0]
+    assert (call["occasion"], call["gender"], call["formality"]) == ("beach wedding", "women", "semi-formal")
+    assert call["color_preference"] == "navy white"
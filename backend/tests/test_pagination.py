@@ -0,0 +1,107 @@
+"""
+Cursor pagination: cursor round-trips, rejection and result-set expiry
+"""
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import caching
+import server
+from pagination import ResultSetCache, decode_cursor, encode_cursor, next_cursor, query_fingerprint
+
+
+def test_fingerprint_ignores_parameter_order():
+    assert query_fingerprint("search", {"a": 1, "b": [2]}) == query_fingerprint("search", {"b": [2], "a": 1})
+    assert query_fingerprint("search", {"a": 1}) != query_fingerprint("inventory", {"a": 1})
+
+
+@pytest.mark.parametrize("offset", [0, 1, 50, 12345])
+def test_cursor_round_trip(offset):
+    fingerprint = query_fingerprint("search", {"query": "navy blazer"})
+    assert decode_cursor(encode_cursor(fingerprint, offset), fingerprint) == offset
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor!", "", "%%%", encode_cursor("abc", 0)[:-2]])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, "abc")
+    assert error.value.status_code == 400
+
+
+def test_cursor_for_another_query_is_rejected():
+    cursor = encode_cursor(query_fingerprint("search", {"query": "red"}), 10)
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, query_fingerprint("search", {"query": "blue"}))
+    assert error.value.status_code == 400
+
+
+def test_negative_offset_is_rejected():
+    with pytest.raises(HTTPException):
+        decode_cursor(encode_cursor("abc", -5), "abc")
+
+
+@pytest.mark.parametrize("offset, page_size, total, expected", [
+    (0, 10, 25, 10), (10, 10, 25, 20), (20, 10, 25, None), (0, 10, 10, None), (0, 0, 25, None),
+])
+def test_next_cursor(offset, page_size, total, expected):
+    cursor = next_cursor("abc", offset, page_size, total)
+    assert (decode_cursor(cursor, "abc") if cursor else None) == expected
+
+
+def test_result_set_is_computed_once_until_it_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(caching.time, "monotonic", lambda: now[0])
+    cache = ResultSetCache(max_entries=4, ttl_seconds=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return [len(calls)]
+
+    assert cache.get_or_compute("abc", compute) == ([1], False)
+    assert cache.get_or_compute("abc", compute) == ([1], True)
+    now[0] += 61
+    assert cache.get_or_compute("abc", compute) == ([2], False)
+
+
+def _walk_pages(client, params):
+    pages, cursor = [], None
+    while True:
+        response = client.get("/api/inventory", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.json()
+        pages.append(body)
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_inventory_pages_cover_the_result_set_once():
+    client = TestClient(server.app)
+    params = {"gender": "Men", "limit": 40, "include_facets": "false"}
+    pages = _walk_pages(client, params)
+
+    ids = [item["id"] for page in pages for item in page["items"]]
+    assert len(pages) > 1
+    assert len(ids) == len(set(ids)) == pages[0]["total"]
+
+
+def test_inventory_cursor_survives_result_set_expiry():
+    client = TestClient(server.app)
+    params = {"gender": "Women", "limit": 25, "include_facets": "false"}
+    first = client.get("/api/inventory", params=params).json()
+    second = client.get("/api/inventory", params={**params, "cursor": first["next_cursor"]}).json()
+
+    server.INVENTORY_RESULTS._cache.clear()  # As if the cached result set had expired
+    recomputed = client.get("/api/inventory", params={**params, "cursor": first["next_cursor"]}).json()
+
+    assert recomputed["offset"] == second["offset"] == 25
+    assert [item["id"] for item in recomputed["items"]] == [item["id"] for item in second["items"]]
+
+
+def test_inventory_cursor_rejected_for_other_filters():
+    client = TestClient(server.app)
+    first = client.get("/api/inventory", params={"gender": "Men", "limit": 10}).json()
+    response = client.get("/api/inventory", params={"gender": "Women", "limit": 10, "cursor": first["next_cursor"]})
+    assert response.status_code == 400
@@ -0,0 +1,74 @@
+"""
+Query spelling correction: confident typo fixes vs "did you mean" hints
+"""
+
+from collections import Counter
+
+import pytest
+
+from spelling import SpellingCorrector
+
+CATALOG_COLUMNS = ["productDisplayName", "articleType", "baseColour", "subCategory", "masterCategory", "usage", "season"]
+
+
+@pytest.fixture(scope="module")
+def speller(styles_df) -> SpellingCorrector:
+    # No system word list, so results don't depend on the machine
+    return SpellingCorrector.from_texts(
+        (text for column in CATALOG_COLUMNS for text in styles_df[column]),
+        dictionary=set()
+    )
+
+
+@pytest.mark.parametrize("query, hint", [
+    ("floral maxi dress", "formal max dress"),
+    ("funeral attire", "funeral active"),
+    ("chinos", "chinook"),
+])
+def test_real_words_are_not_rewritten(speller, query, hint):
+    corrected, corrections = speller.correct(query)
+    assert corrected == query
+    assert corrections and not any(correction["applied"] for correction in corrections)
+    assert speller.did_you_mean(query) == hint
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("shrit", "shirt"),
+    ("navey blazer", "navy blazer"),
+    ("kurtha", "kurta"),
+    ("sandles", "sandals"),
+    ("blue sandles", "blue sandals"),
+    ("blakc shoes", "black shoes"),
+    ("formla shirt", "formal shirt"),
+])
+def test_confident_typos_are_fixed(speller, query, expected):
+    corrected, corrections = speller.correct(query)
+    assert corrected == expected
+    assert all(correction["applied"] for correction in corrections)
+
+
+@pytest.mark.parametrize("vocabulary", [
+    Counter({"sandals": 50, "spindles": 50}),  # Another candidate two edits away
+    Counter({"sandals": 5}),                   # Too rare to trust across two edits
+])
+def test_two_edit_corrections_need_a_sole_common_candidate(vocabulary):
+    speller = SpellingCorrector(vocabulary, dictionary=set())
+    assert speller.correct("sandles")[0] == "sandles"
+    assert speller.did_you_mean("sandles") == "sandals"
+
+
+def test_dictionary_words_block_rewrites():
+    speller = SpellingCorrector.from_texts(["Sheer Shirt"] * 5, dictionary={"shirk"})
+    assert speller.correct("shirk")[0] == "shirk"
+    assert speller.did_you_mean("shirk") == "shirt"
+
+
+def test_inventory_retry_applies_every_suggestion(speller):
+    corrected, corrections = speller.correct("funeral attire", confident_only=False)
+    assert corrected == "funeral active"
+    assert all(correction["applied"] for correction in corrections)
+
+
+def test_known_words_have_no_suggestion(speller):
+    assert speller.correct("blue shirts") == ("blue shirts", [])
+    assert speller.did_you_mean("blue shirts") is None
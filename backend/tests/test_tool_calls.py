@@ -0,0 +1,50 @@
+"""
+Function-calling tool execution: memoization within a conversation
+"""
+
+import json
+from types import SimpleNamespace
+
+import backend
+
+
+def _tool_call(name, **arguments):
+    return SimpleNamespace(function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+
+
+def test_repeated_call_is_memoized(inventory):
+    memo = {}
+    call = _tool_call("check_inventory", item_name="oxford")
+    first, = backend.execute_tool_calls([call], memo)
+    second, = backend.execute_tool_calls([call], memo)
+
+    assert not first["cached"]
+    assert second["cached"]
+    assert second["result"] == first["result"]
+
+
+def test_stock_update_invalidates_memoized_result(inventory):
+    memo = {}
+    call = _tool_call("get_item_location", item_id="M001")
+    before, = backend.execute_tool_calls([call], memo)
+    assert before["result"]["stock"] > 0
+
+    assert backend.update_inventory_item("M001", stock=0)
+    after, = backend.execute_tool_calls([call], memo)
+
+    assert not after["cached"]
+    assert after["result"]["stock"] == 0
+
+
+def test_stock_update_invalidates_inventory_check(inventory):
+    memo = {}
+    name = next(item["name"] for item in inventory if item["id"] == "M001")
+    call = _tool_call("check_inventory", item_name=name)
+    before, = backend.execute_tool_calls([call], memo)
+    assert before["result"]["items"][0]["available"]
+
+    backend.update_inventory_item("M001", stock=0)
+    after, = backend.execute_tool_calls([call], memo)
+
+    assert not after["cached"]
+    assert not after["result"]["items"][0]["available"]
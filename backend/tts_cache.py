@@ -0,0 +1,158 @@
+"""
+RetailNext Smart Stylist - Text-to-Speech Cache
+Two-tier (memory + disk) LRU cache for synthesized speech, keyed by the
+exact text, voice, model and accent instructions that produced it
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from caching import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tts_cache"))
+TTS_MEMORY_CACHE_MAX_BYTES = int(os.getenv("TTS_MEMORY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+TTS_DISK_CACHE_MAX_BYTES = int(os.getenv("TTS_DISK_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+def speech_cache_key(text: str, voice: str, model: str, instructions: str) -> str:
+    """Stable key for one synthesized utterance"""
+    payload = "\x00".join([model, voice, instructions.strip(), text.strip()])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SpeechCache:
+    """
+    Memory-first speech cache backed by a size-bounded directory of MP3 files.
+    Disk entries are evicted least-recently-used by file mtime, which is
+    refreshed on every disk hit.
+    """
+
+    def __init__(self, directory: str, memory_max_bytes: int, disk_max_bytes: int):
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self.memory = TTLCache(max_entries=4096, max_weight=memory_max_bytes, weigher=len)
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        self._disk_enabled = True
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(
+                entry.stat().st_size for entry in os.scandir(directory) if entry.name.endswith(".mp3")
+            )
+        except OSError as e:
+            logger.warning(f"TTS disk cache disabled ({directory}): {e}")
+            self._disk_enabled = False
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio, promoting disk hits into memory"""
+        audio = self.memory.get(key)
+        if audio is not None or not self._disk_enabled:
+            return audio
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)  # Mark as recently used for LRU eviction
+        except OSError:
+            self.disk_misses += 1
+            return None
+
+        self.disk_hits += 1
+        self.memory.set(key, audio)
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Store audio in memory and on disk"""
+        if not audio:
+            return
+
+        self.memory.set(key, audio)
+        if not self._disk_enabled:
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            with self._disk_lock:
+                existed = os.path.exists(path)
+                previous = os.path.getsize(path) if existed else 0
+                os.replace(tmp_path, path)
+                self._disk_bytes += len(audio) - previous
+                if self._disk_bytes > self.disk_max_bytes:
+                    self._evict_disk()
+        except OSError as e:
+            logger.warning(f"TTS disk cache write failed: {e}")
+
+    def _evict_disk(self) -> None:
+        """Delete least-recently-used files until under the disk budget (lock held)"""
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".mp3")),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in entries:
+            if self._disk_bytes <= self.disk_max_bytes * 0.9:
+                break
+            try:
+                size = entry.stat().st_size
+                os.unlink(entry.path)
+                self._disk_bytes -= size
+            except OSError:
+                continue
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "disk": {
+                "enabled": self._disk_enabled,
+                "bytes": self._disk_bytes,
+                "hits": self.disk_hits,
+                "misses": self.disk_misses
+            }
+        }
+
+
+_speech_cache: Optional[SpeechCache] = None
+
+def get_speech_cache() -> Optional[SpeechCache]:
+    """Get the process-wide speech cache, or None when caching is disabled"""
+    global _speech_cache
+    if not TTS_CACHE_ENABLED:
+        return None
+    if _speech_cache is None:
+        _speech_cache = SpeechCache(TTS_CACHE_DIR, TTS_MEMORY_CACHE_MAX_BYTES, TTS_DISK_CACHE_MAX_BYTES)
+    return _speech_cache
+
+
+# ============================================================================
+# MP3 SEGMENT JOINING
+# ============================================================================
+
+def strip_id3v2(audio: bytes) -> bytes:
+    """Drop a leading ID3v2 tag so joined segments form one clean frame stream"""
+    if len(audio) < 10 or audio[:3] != b"ID3":
+        return audio
+    size = (audio[6] << 21) | (audio[7] << 14) | (audio[8] << 7) | audio[9]
+    footer = 10 if audio[5] & 0x10 else 0
+    return audio[10 + size + footer:]
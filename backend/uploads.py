@@ -0,0 +1,87 @@
+"""
+RetailNext Smart Stylist - Bounded Upload Handling
+Reads uploaded files and base64 fields in chunks with hard size limits so a
+single large request can't spike a worker's memory
+"""
+
+import os
+import base64
+import binascii
+import logging
+
+from fastapi import HTTPException, UploadFile
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+MAX_IMAGE_UPLOAD_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_AUDIO_UPLOAD_BYTES = int(os.getenv("MAX_AUDIO_UPLOAD_BYTES", str(25 * 1024 * 1024)))  # Transcription API limit
+
+# Base64 inflates by 4/3, plus a little room for a data URI prefix
+MAX_IMAGE_BASE64_CHARS = (MAX_IMAGE_UPLOAD_BYTES + 2) // 3 * 4 + 256
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+BASE64_CHUNK_CHARS = 64 * 1024  # Multiple of 4 so each slice decodes on its own
+
+# ============================================================================
+# READERS
+# ============================================================================
+
+def _too_large(kind: str, limit: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"{kind} too large (limit {limit / (1024 * 1024):.1f} MB)"
+    )
+
+
+async def read_upload_limited(upload: UploadFile, max_bytes: int, kind: str = "Upload") -> bytes:
+    """
+    Read an UploadFile in chunks, rejecting it with 413 as soon as it
+    exceeds max_bytes instead of buffering the whole body first.
+    """
+    # Multipart parsing already knows the size for spooled uploads
+    if upload.size is not None and upload.size > max_bytes:
+        raise _too_large(kind, max_bytes)
+
+    buffer = bytearray()
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if len(buffer) + len(chunk) > max_bytes:
+            raise _too_large(kind, max_bytes)
+        buffer.extend(chunk)
+
+    return bytes(buffer)
+
+
+def decode_base64_limited(data: str, max_bytes: int, kind: str = "Image") -> bytes:
+    """
+    Decode a base64 string (optionally a data URI) in fixed-size slices,
+    checking the decoded size before allocating anything.
+    """
+    if data.startswith("data:"):
+        data = data.split(",", 1)[-1]
+
+    if len(data) // 4 * 3 > max_bytes + 2:
+        raise _too_large(kind, max_bytes)
+
+    try:
+        buffer = bytearray()
+        for start in range(0, len(data), BASE64_CHUNK_CHARS):
+            buffer.extend(base64.b64decode(data[start:start + BASE64_CHUNK_CHARS], validate=True))
+        decoded = bytes(buffer)
+    except (binascii.Error, ValueError):
+        # Line-wrapped or unpadded input - let the lenient decoder normalise it
+        try:
+            decoded = base64.b64decode(data + "=" * (-len(data) % 4))
+        except (binascii.Error, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid base64 data: {e}")
+
+    if len(decoded) > max_bytes:
+        raise _too_large(kind, max_bytes)
+
+    return decoded
@@ -14,6 +14,8 @@ const ENABLE_AUDIO_RESPONSES = true;
 const state = {
     conversationHistory: [],
     currentImage: null,
+    currentImageId: null,
+    imageToken: 0,  // Bumped on every image selection/removal so stale async results are dropped
     recommendedItems: [],
     isConnected: false,
     isProcessing: false,
@@ -173,7 +175,9 @@ async function sendMessage() {
     const requestPayload = {
         message: message || "What do you think about this item?",
         conversation_history: state.conversationHistory,
-        image_base64: state.currentImage,
+        // Uploaded images are referenced by ID; base64 is only a fallback
+        image_id: state.currentImageId,
+        image_base64: state.currentImageId ? null : state.currentImage,
         return_audio: ENABLE_AUDIO_RESPONSES
     };
 
@@ -196,50 +200,49 @@ async function sendMessage() {
     showLoading('Finding perfect items for you...');
 
     try {
-        const response = await fetch(`${API_BASE_URL}/api/chat`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
+        // Render each stage as soon as the server streams it
+        await streamChat(requestPayload, {
+            intent: (data) => {
+                // Display event context
+                if (data.event_context) {
+                    displayEventContext(data.event_context);
+                }
             },
-            body: JSON.stringify(requestPayload)
-        });
-
-        if (!response.ok) {
-            throw new Error(`API error: ${response.status}`);
-        }
-
-        const data = await response.json();
-
-        // Remove typing indicator
-        removeTypingIndicator(typingId);
-
-        // Add assistant response
-        addAssistantMessage(data.text_response);
-
-        // Store in conversation history
-        state.conversationHistory.push({
-            role: 'assistant',
-            content: data.text_response
-        });
-
-        // Display event context
-        if (data.event_context) {
-            displayEventContext(data.event_context);
-        }
-
-        // Display recommended items with REAL IMAGES
-        if (data.recommended_items && data.recommended_items.length > 0) {
-            displayRecommendedItems(data.recommended_items);
-        }
-
-        // Play audio response
-        if (data.audio_response_base64 && ENABLE_AUDIO_RESPONSES) {
-            playAudioResponse(data.audio_response_base64);
-        }
-
-        console.log('✅ Chat response received:', {
-            items: data.recommended_items?.length || 0,
-            apis: data.apis_used
+            items: (data) => {
+                // Display recommended items with REAL IMAGES
+                if (data.recommended_items && data.recommended_items.length > 0) {
+                    displayRecommendedItems(data.recommended_items);
+                }
+            },
+            text: (data) => {
+                // Remove typing indicator
+                removeTypingIndicator(typingId);
+                hideLoading();
+
+                // Add assistant response
+                addAssistantMessage(data.text_response);
+
+                // Store in conversation history
+                state.conversationHistory.push({
+                    role: 'assistant',
+                    content: data.text_response
+                });
+            },
+            audio: (data) => {
+                // Play audio response
+                if (data.audio_url && ENABLE_AUDIO_RESPONSES) {
+                    playAudioResponse(data.audio_url);
+                }
+            },
+            done: (data) => {
+                console.log('✅ Chat response received:', {
+                    items: data.item_count || 0,
+                    apis: data.apis_used
+                });
+            },
+            error: (data) => {
+                throw new Error(data.detail || 'Stream error');
+            }
         });
 
     } catch (error) {
@@ -257,6 +260,49 @@ async function sendMessage() {
     }
 }
 
+async function streamChat(payload, handlers) {
+    // POST to the SSE chat endpoint and dispatch each "event: <stage>" block
+    const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(payload)
+    });
+
+    if (!response.ok) {
+        throw new Error(`API error: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            });
+
+            if (handlers[event] && data) {
+                handlers[event](JSON.parse(data));
+            }
+        }
+    }
+}
+
 function addUserMessage(text, imageBase64 = null) {
     const container = document.getElementById('messagesContainer');
     const messageDiv = document.createElement('div');
@@ -367,8 +413,10 @@ function handleImageUpload(e) {
         return;
     }
 
+    const token = ++state.imageToken;
     const reader = new FileReader();
     reader.onload = (event) => {
+        if (token !== state.imageToken) return;  // Image was removed or replaced meanwhile
         const base64 = event.target.result.split(',')[1];
         state.currentImage = base64;
 
@@ -379,10 +427,45 @@ function handleImageUpload(e) {
         preview.style.display = 'block';
     };
     reader.readAsDataURL(file);
+
+    uploadImage(file, token);
+}
+
+async function uploadImage(file, token) {
+    // Store the image server-side once so chat turns can send just its ID
+    state.currentImageId = null;
+
+    try {
+        const formData = new FormData();
+        formData.append('image', file);
+
+        const response = await fetch(`${API_BASE_URL}/api/upload-image`, {
+            method: 'POST',
+            body: formData
+        });
+
+        if (!response.ok) {
+            throw new Error(`Upload failed: ${response.status}`);
+        }
+
+        const data = await response.json();
+        if (token !== state.imageToken) {
+            // Upload (with vision analysis) finished after the image was removed or replaced
+            console.log('🖼️ Dropping stale image upload:', data.image_id);
+            return;
+        }
+        state.currentImageId = data.image_id;
+        console.log('🖼️ Image uploaded:', data.image_id);
+    } catch (error) {
+        // Chat falls back to sending the base64 image inline
+        console.warn('⚠️ Image upload failed, will send inline:', error);
+    }
 }
 
 function removeImage() {
+    state.imageToken++;
     state.currentImage = null;
+    state.currentImageId = null;
     document.getElementById('imagePreview').style.display = 'none';
     document.getElementById('fileInput').value = '';
 }
@@ -563,10 +646,11 @@ async function processRecording() {
 // Audio Playback
 // ============================================================================
 
-function playAudioResponse(base64Audio) {
+function playAudioResponse(audioUrl) {
     try {
+        // The server streams MP3 sentence by sentence, so playback starts early
         const audioPlayer = document.getElementById('audioPlayer');
-        audioPlayer.src = `data:audio/mp3;base64,${base64Audio}`;
+        audioPlayer.src = `${API_BASE_URL}${audioUrl}`;
         audioPlayer.play();
         console.log('🔊 Playing audio response');
     } catch (error) {